@@ -0,0 +1,163 @@
+"""
+Admin API endpoints.
+Runtime inspection of service internals (cache statistics, etc.).
+Only registered when ADMIN_TOKEN is set, and every request must carry it.
+"""
+import asyncio
+import secrets
+from typing import Optional
+from xml.etree.ElementTree import ParseError
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from api.translate import stream_ttfb
+from config import settings
+from services.cache import translation_cache
+from services.cascade import model_cascade
+from services.glossary import glossary
+from services.keywords import keyword_extractor
+from services.jobs import job_queue
+from services.llm_client import llm_client
+from services.near_duplicate import near_duplicate_index
+from services.translation_memory import translation_memory
+from services.translator import translator
+from services.usage import usage_tracker
+from utils.loop_monitor import loop_monitor
+
+
+async def require_admin_token(authorization: Optional[str] = Header(default=None)):
+    """Reject requests without `Authorization: Bearer <ADMIN_TOKEN>`."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if (
+        not settings.admin_token
+        or scheme.lower() != "bearer"
+        or not secrets.compare_digest(token.strip().encode(), settings.admin_token.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"error": {"code": "UNAUTHORIZED", "message": "A valid admin token is required"}},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Get translation cache hit/miss counters and tier sizes."""
+    return {**translation_cache.stats(), "near_duplicate": near_duplicate_index.stats()}
+
+
+@router.delete("/cache")
+async def clear_cache():
+    """Clear all translation cache tiers."""
+    await translation_cache.clear()
+    near_duplicate_index.clear()
+    return {"status": "cleared"}
+
+
+@router.get("/glossary")
+async def glossary_stats():
+    """Get glossary size and exact-match / in-text term counters."""
+    return glossary.stats()
+
+
+@router.get("/keywords")
+async def keyword_stats():
+    """Get the local keyword extractor's method, IDF table size and usage counters."""
+    return keyword_extractor.stats()
+
+
+@router.get("/inflight")
+async def inflight_stats():
+    """Get single-flight coalescing counters for identical concurrent requests."""
+    return translator.inflight.stats()
+
+
+@router.get("/stream")
+async def stream_stats():
+    """Get time-to-first-byte percentiles for the streaming endpoint."""
+    return {"ttfb": stream_ttfb.summary()}
+
+
+@router.get("/backends")
+async def backend_stats():
+    """Get per-backend health, latency/error estimates and selection counts."""
+    return llm_client.router.stats()
+
+
+@router.get("/cascade")
+async def cascade_stats():
+    """Get model cascade thresholds, routing decisions, escalations and fast-tier backend health."""
+    return {
+        **model_cascade.stats(),
+        "fast_backends": llm_client.fast_router.stats()["backends"] if llm_client.fast_router else [],
+    }
+
+
+@router.get("/limiter")
+async def limiter_stats():
+    """Get the adaptive upstream concurrency limit, queue occupancy and rejections."""
+    return llm_client.limiter.stats()
+
+
+@router.get("/hedging")
+async def hedging_stats():
+    """Get request hedging counters (fired, won, skipped by the load cap) and delay."""
+    return llm_client.hedging.stats()
+
+
+@router.get("/usage")
+async def usage_stats(client: Optional[str] = None):
+    """Get token usage per client and model, recent windows and remaining budgets."""
+    return usage_tracker.snapshot(client)
+
+
+@router.get("/jobs")
+async def job_stats():
+    """Get asynchronous jobs by status and the job workers running in this process."""
+    return await asyncio.to_thread(job_queue.stats)
+
+
+@router.get("/loop")
+async def loop_stats():
+    """Get event loop lag percentiles (blocking work on the loop shows up here)."""
+    return loop_monitor.stats()
+
+
+@router.get("/tm")
+async def tm_stats():
+    """Get translation memory size and segment reuse counters."""
+    return await asyncio.to_thread(translation_memory.stats)
+
+
+@router.delete("/tm")
+async def clear_tm():
+    """Remove all translation memory segments."""
+    await asyncio.to_thread(translation_memory.clear)
+    return {"status": "cleared"}
+
+
+@router.post("/tm/import")
+async def import_tm(request: Request):
+    """Seed the translation memory from a TMX document sent as the request body."""
+    data = await request.body()
+    try:
+        return await asyncio.to_thread(translation_memory.import_tmx, data)
+    except ParseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": {"code": "INVALID_TMX", "message": f"Could not parse TMX: {e}"}},
+        )
+
+
+@router.get("/tm/export")
+async def export_tm():
+    """Download the translation memory as a TMX 1.4 document."""
+    return StreamingResponse(
+        translation_memory.export_tmx(),
+        media_type="application/x-tmx+xml",
+        headers={"Content-Disposition": 'attachment; filename="translation_memory.tmx"'},
+    )
@@ -0,0 +1,227 @@
+"""
+Asynchronous job API endpoints.
+Submit large translation workloads, then poll, subscribe to progress or fetch results.
+"""
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from api.translate import _count_error, _sse, parse_cache_control
+from models.schemas import (
+    BatchTranslateItem,
+    ErrorDetail,
+    ErrorResponse,
+    JobCreateRequest,
+    JobResultsResponse,
+    JobStatus,
+)
+from services.jobs import FINAL_STATUSES, job_queue
+from services.usage import set_client_id
+from config import settings
+from utils.logging import get_logger, set_request_id
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+def _job_status(job: dict) -> JobStatus:
+    return JobStatus(
+        id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        priority=job["priority"],
+        total=job["total"],
+        completed=job["completed"],
+        failed=job["failed"],
+        progress=round((job["completed"] + job["failed"]) / job["total"], 4),
+        error=job["error"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+    )
+
+
+def _bad_request(code: str, message: str) -> HTTPException:
+    _count_error(code)
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"error": {"code": code, "message": message}},
+    )
+
+
+def _require_enabled():
+    if not job_queue.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": {"code": "JOBS_DISABLED", "message": "Asynchronous jobs are disabled"}},
+        )
+
+
+async def _get_job(job_id: str) -> dict:
+    _require_enabled()
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": {"code": "JOB_NOT_FOUND", "message": f"Job {job_id} not found"}},
+        )
+    return job
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobStatus,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        503: {"model": ErrorResponse, "description": "Jobs disabled"},
+    },
+)
+async def create_job(
+    request: JobCreateRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None),
+):
+    """
+    Queue a text or a batch of texts for background translation.
+
+    Job LLM calls run at background priority and are charged to the client's
+    budget; the job survives restarts and resumes where it stopped.
+
+    Args:
+        request: JobCreateRequest with text or texts, and a priority
+        cache_control: Optional Cache-Control header (no-cache / no-store bypass the cache)
+        x_client_id: Optional client key for usage accounting and budgets
+
+    Returns:
+        JobStatus of the queued job (poll GET /api/jobs/{id} for progress)
+
+    Raises:
+        HTTPException: On validation errors
+    """
+    set_request_id()
+    _require_enabled()
+    client_id = set_client_id(x_client_id)
+    texts = request.texts if request.texts is not None else [request.text]
+
+    if len(texts) > settings.jobs_max_items:
+        raise _bad_request("JOB_TOO_LARGE", f"Job exceeds maximum of {settings.jobs_max_items} texts")
+    if any(len(text) > settings.max_document_length for text in texts):
+        raise _bad_request(
+            "TEXT_TOO_LONG", f"Text exceeds maximum length of {settings.max_document_length} characters"
+        )
+
+    read_cache, write_cache = parse_cache_control(cache_control)
+    job = await job_queue.submit(
+        "text" if request.text is not None else "batch",
+        texts,
+        priority=request.priority,
+        client_id=client_id,
+        read_cache=read_cache,
+        write_cache=write_cache,
+    )
+    return _job_status(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    responses={404: {"model": ErrorResponse, "description": "Job not found"}},
+)
+async def get_job(job_id: str):
+    """Return a job's status and progress."""
+    return _job_status(await _get_job(job_id))
+
+
+@router.get(
+    "/jobs/{job_id}/results",
+    response_model=JobResultsResponse,
+    responses={404: {"model": ErrorResponse, "description": "Job not found"}},
+)
+async def get_job_results(job_id: str):
+    """Return the results translated so far, in input order."""
+    job = await _get_job(job_id)
+    items = []
+    for row in await job_queue.results(job_id):
+        if row["status"] == "done":
+            items.append(
+                BatchTranslateItem(
+                    index=row["idx"], translation=row["translation"], keywords=json.loads(row["keywords"])
+                )
+            )
+        elif row["status"] == "error":
+            items.append(
+                BatchTranslateItem(
+                    index=row["idx"],
+                    error=ErrorDetail(
+                        code=row["error_code"], message="Failed to translate text. Please try again."
+                    ),
+                )
+            )
+        else:
+            items.append(BatchTranslateItem(index=row["idx"]))
+    return JobResultsResponse(job=_job_status(job), results=items)
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Server-sent events"},
+        404: {"model": ErrorResponse, "description": "Job not found"},
+    },
+)
+async def job_events(job_id: str):
+    """
+    Subscribe to a job's progress as server-sent events.
+
+    Events:
+        progress: JobStatus whenever the job's progress or status changes
+        done: JobStatus once the job is completed, failed or cancelled
+    """
+    job = await _get_job(job_id)
+
+    async def events() -> AsyncIterator[str]:
+        current = job
+        last = None
+        while True:
+            state = _job_status(current).model_dump()
+            if current["status"] in FINAL_STATUSES:
+                yield _sse("done", state)
+                return
+            if state != last:
+                yield _sse("progress", state)
+                last = state
+            # Woken by progress in this process; polling picks up other workers' jobs
+            await job_queue.wait_for_progress(job_queue.poll_interval)
+            current = await job_queue.get(job_id)
+            if current is None:
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=JobStatus,
+    responses={
+        404: {"model": ErrorResponse, "description": "Job not found"},
+        409: {"model": ErrorResponse, "description": "Job already finished"},
+    },
+)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; texts already translated stay available."""
+    await _get_job(job_id)
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error": {"code": "JOB_FINISHED", "message": f"Job {job_id} has already finished"}},
+        )
+    logger.info(f"Job {job_id} cancelled")
+    return _job_status(await job_queue.get(job_id))
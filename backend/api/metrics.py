@@ -0,0 +1,221 @@
+"""
+Metrics endpoint and request instrumentation.
+Serves GET /metrics in the Prometheus text format and times every HTTP request.
+"""
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from services.cache import translation_cache
+from services.glossary import glossary
+from services.keywords import keyword_extractor
+from services.llm_client import llm_client
+from services.llm_router import answered_by_var, answered_labels
+from services.near_duplicate import near_duplicate_index
+from services.shared_state import shared_path
+from services.translation_memory import translation_memory
+from services.translator import translator
+from utils import metrics
+from utils.logging import log_stats
+from utils.tracing import request_start_var, tracer
+
+router = APIRouter()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request duration and in-flight gauges."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # In flight before any backend is chosen, so counted under the primary
+        labels = {"provider": settings.llm_provider, "model": settings.llm_model}
+        status_code = 500
+        request_start_var.set(time.time_ns())
+        answered_by_var.set([])
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.requests_in_flight.inc(**labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.requests_in_flight.dec(**labels)
+            # Label by route template to keep cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            # Labelled by the backend that answered (after failover or cascade routing)
+            metrics.request_duration.observe(
+                time.perf_counter() - start,
+                method=scope.get("method", ""),
+                path=path,
+                status=str(status_code),
+                **answered_labels(),
+            )
+
+
+def _component_stats():
+    """Expose counters owned by the cache, coalescing, hedging and routing components."""
+    cache = translation_cache.stats()
+    yield (
+        "translation_cache_lookups_total",
+        "counter",
+        "Translation cache lookups by result",
+        [
+            ({"result": "memory_hit"}, cache["memory_hits"]),
+            ({"result": "persistent_hit"}, cache["persistent_hits"]),
+            ({"result": "miss"}, cache["misses"]),
+        ],
+    )
+    near_duplicate = near_duplicate_index.stats()
+    yield (
+        "near_duplicate_lookups_total",
+        "counter",
+        "Near-duplicate index lookups after an exact cache miss, by result",
+        [({"result": "hit"}, near_duplicate["hits"]), ({"result": "miss"}, near_duplicate["misses"])],
+    )
+    yield (
+        "translation_memory_segments_total",
+        "counter",
+        "Input sentences served from the translation memory or sent to the LLM",
+        [
+            ({"result": "reused"}, translation_memory.reused),
+            ({"result": "translated"}, translation_memory.translated),
+        ],
+    )
+    if glossary.enabled:
+        terms = glossary.stats()
+        yield (
+            "glossary_lookups_total",
+            "counter",
+            "Exact glossary lookups of short inputs, by result",
+            [({"result": "hit"}, terms["exact_hits"]), ({"result": "miss"}, terms["exact_misses"])],
+        )
+        yield (
+            "glossary_prompt_terms_total",
+            "counter",
+            "Glossary terms added to prompts as required translations",
+            [({}, terms["terms_injected"])],
+        )
+    yield (
+        "llm_keyword_fallbacks_total",
+        "counter",
+        "LLM keyword lists completed by local extraction because they were invalid",
+        [({}, keyword_extractor.fallbacks)],
+    )
+    yield (
+        "translation_cache_entries",
+        "gauge",
+        "Entries in the in-memory translation cache",
+        [({}, cache["memory_entries"])],
+    )
+
+    inflight = translator.inflight.stats()
+    yield (
+        "singleflight_coalesced_total",
+        "counter",
+        "Requests that awaited an identical in-flight translation",
+        [({}, inflight["coalesced"])],
+    )
+
+    hedging = llm_client.hedging.stats()
+    yield (
+        "llm_hedges_total",
+        "counter",
+        "Hedged LLM requests by outcome",
+        [
+            ({"result": "fired"}, hedging["hedges_fired"]),
+            ({"result": "won"}, hedging["hedges_won"]),
+            ({"result": "skipped"}, hedging["hedges_skipped"]),
+        ],
+    )
+
+    limiter = llm_client.limiter.stats()
+    yield (
+        "llm_concurrency_limit",
+        "gauge",
+        "Current adaptive limit on concurrent upstream LLM calls",
+        [({}, limiter["limit"])],
+    )
+    yield (
+        "llm_concurrency_queued",
+        "gauge",
+        "Upstream LLM calls waiting for a concurrency slot",
+        [({}, limiter["queued_now"])],
+    )
+    yield (
+        "llm_concurrency_rejections_total",
+        "counter",
+        "Upstream LLM calls rejected by the concurrency limiter",
+        [({"reason": "queue_full"}, limiter["rejected"]), ({"reason": "timeout"}, limiter["timed_out"])],
+    )
+
+    logs = log_stats()
+    yield (
+        "log_records_dropped_total",
+        "counter",
+        "Log records dropped because the writer queue was full",
+        [({}, logs["dropped"])],
+    )
+    yield (
+        "log_queue_depth",
+        "gauge",
+        "Log records waiting for the background writer",
+        [({}, logs["queued"])],
+    )
+
+    if tracer.enabled:
+        traces = tracer.stats()
+        yield (
+            "tracing_spans_total",
+            "counter",
+            "Finished tracing spans by export result",
+            [({"result": "exported"}, traces["exported"]), ({"result": "dropped"}, traces["dropped"])],
+        )
+
+    backends = llm_client.router.stats()
+    all_backends = [backend.stats() for backend in llm_client.backends]
+    yield (
+        "llm_failovers_total",
+        "counter",
+        "LLM requests that failed over to another backend",
+        [({}, backends["failovers"])],
+    )
+    yield (
+        "llm_backend_healthy",
+        "gauge",
+        "Whether a routed backend (cascade fast tier included) is outside its failure cooldown",
+        [
+            ({"backend": b["name"], "provider": b["provider"], "model": b["model"]}, int(b["healthy"]))
+            for b in all_backends
+        ],
+    )
+
+
+metrics.registry.register_collector(_component_stats)
+
+# Per-worker snapshots merged at scrape time when running several workers
+snapshot_exporter = (
+    metrics.SnapshotExporter(metrics.registry, shared_path("metrics"), settings.metrics_flush_interval)
+    if settings.shared_state_dir
+    else None
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (merged across workers in multi-worker mode)."""
+    text = snapshot_exporter.render() if snapshot_exporter is not None else metrics.registry.render()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -2,34 +2,141 @@
 Translation API endpoint.
 Handles POST /translate requests with validation and error handling.
 """
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
+import json
+import math
+import time
+from typing import AsyncIterator, Optional
 
-from models.schemas import TranslateRequest, TranslateResponse, ErrorResponse, ErrorDetail
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from models.schemas import (
+    TranslateRequest,
+    TranslateResponse,
+    SegmentReuse,
+    ErrorResponse,
+    ErrorDetail,
+    BatchTranslateRequest,
+    BatchTranslateResponse,
+    BatchTranslateItem,
+)
+from services.concurrency import OverloadedError
+from services.keywords import keyword_extractor, keyword_source_var
+from services.llm_router import answered_labels
+from services.translation_memory import segment_reuse_var
 from services.translator import translator, TranslationError
+from services.retry import set_deadline
+from services.usage import BudgetExceededError, set_client_id
 from config import settings
-from utils.logging import get_logger, set_request_id, Timer
+from utils import metrics
+from utils.logging import get_logger, set_request_id, Timer, LatencyWindow
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+# Time to first translation byte on the streaming endpoint
+stream_ttfb = LatencyWindow()
+
+
+def _count_error(code: str):
+    """Count an API error by code for the /metrics endpoint."""
+    metrics.errors_total.inc(code=code, **answered_labels())
+
+
+def _rate_limited(e: BudgetExceededError) -> HTTPException:
+    """Build the 429 response for a client over its request/token budget."""
+    logger.warning(f"Budget exceeded: {str(e)}")
+    _count_error("RATE_LIMITED")
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error": {
+                "code": "RATE_LIMITED",
+                "message": "Request or token budget exceeded. Please retry later.",
+            }
+        },
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+def _overloaded(e: OverloadedError) -> HTTPException:
+    """Build the fast 503 response when no upstream concurrency slot is available."""
+    logger.warning(f"Upstream overloaded: {str(e)}")
+    _count_error("OVERLOADED")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error": {
+                "code": "OVERLOADED",
+                "message": "Translation service is at capacity. Please retry later.",
+            }
+        },
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+def set_keyword_source(keyword_source: Optional[str]):
+    """Set the request's keyword source, rejecting local keywords when no IDF table is loaded."""
+    keyword_source = keyword_source or settings.keywords_source
+    if keyword_source == "local" and not keyword_extractor.available:
+        _count_error("KEYWORDS_UNAVAILABLE")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": {
+                    "code": "KEYWORDS_UNAVAILABLE",
+                    "message": "Local keyword extraction needs KEYWORDS_IDF_PATH to be configured",
+                }
+            },
+        )
+    keyword_source_var.set(keyword_source)
+
+
+def parse_cache_control(cache_control: Optional[str]) -> tuple[bool, bool]:
+    """
+    Parse a Cache-Control request header into (read_cache, write_cache).
+
+    `no-cache` skips the cache lookup but stores the fresh result;
+    `no-store` neither reads nor writes the cache.
+    """
+    if not cache_control:
+        return True, True
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    if "no-store" in directives:
+        return False, False
+    if "no-cache" in directives:
+        return False, True
+    return True, True
+
 
 @router.post(
     "/translate",
     response_model=TranslateResponse,
     responses={
         400: {"model": ErrorResponse, "description": "Invalid request"},
+        429: {"model": ErrorResponse, "description": "Client budget exceeded"},
         502: {"model": ErrorResponse, "description": "LLM service error"},
-        503: {"model": ErrorResponse, "description": "Service unavailable"},
+        503: {"model": ErrorResponse, "description": "Service unavailable or at capacity"},
     },
 )
-async def translate(request: TranslateRequest):
+async def translate(
+    request: TranslateRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None),
+):
     """
     Translate Chinese text to English and extract keywords.
 
+    Texts longer than max_text_length are translated in document mode (chunked).
+
     Args:
         request: TranslateRequest with text field
+        cache_control: Optional Cache-Control header (no-cache / no-store bypass the cache)
+        x_client_id: Optional client key for usage accounting and budgets
+        x_request_timeout: Optional client timeout in seconds; retries stop before it
 
     Returns:
         TranslateResponse with translation and keywords
@@ -38,48 +145,358 @@ async def translate(request: TranslateRequest):
         HTTPException: On validation or service errors
     """
     req_id = set_request_id()
-    logger.info(f"Translation request received. Text length: {len(request.text)}")
+    set_client_id(x_client_id)
+    set_keyword_source(request.keyword_source)
+    set_deadline(x_request_timeout)
+    with tracer.request_span(
+        "POST /api/translate", **{"http.route": "/api/translate", "text_length": len(request.text)}
+    ):
+        logger.info("Translation request received. Text length: %d", len(request.text))
 
-    # Validate text length
-    if len(request.text) > settings.max_text_length:
-        logger.warning(f"Text too long: {len(request.text)} chars")
+        # Validate text length
+        if len(request.text) > settings.max_document_length:
+            logger.warning(f"Text too long: {len(request.text)} chars")
+            _count_error("TEXT_TOO_LONG")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": {
+                        "code": "TEXT_TOO_LONG",
+                        "message": f"Text exceeds maximum length of {settings.max_document_length} characters",
+                    }
+                },
+            )
+
+        try:
+            with Timer() as timer:
+                read_cache, write_cache = parse_cache_control(cache_control)
+                if len(request.text) > settings.max_text_length:
+                    # Long documents are chunked and translated in parallel
+                    translation, keywords = await translator.translate_document(
+                        request.text, read_cache=read_cache, write_cache=write_cache
+                    )
+                else:
+                    translation, keywords = await translator.translate(
+                        request.text, read_cache=read_cache, write_cache=write_cache
+                    )
+
+            logger.info(
+                "Translation completed in %.2fs", timer.elapsed, extra={"duration_ms": round(timer.elapsed * 1000, 1)}
+            )
+
+            reuse = segment_reuse_var.get()
+            return TranslateResponse(
+                translation=translation,
+                keywords=keywords,
+                reuse=SegmentReuse(reused=reuse[0], total=reuse[1], reuse_ratio=round(reuse[0] / reuse[1], 4))
+                if reuse
+                else None,
+            )
+
+        except BudgetExceededError as e:
+            raise _rate_limited(e)
+        except OverloadedError as e:
+            raise _overloaded(e)
+        except TranslationError as e:
+            logger.error(f"Translation error: {str(e)}")
+            _count_error("TRANSLATION_FAILED")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail={
+                    "error": {
+                        "code": "TRANSLATION_FAILED",
+                        "message": "Failed to translate text. Please try again.",
+                    }
+                },
+            )
+        except Exception as e:
+            logger.exception(f"Unexpected error: {str(e)}")
+            _count_error("SERVICE_ERROR")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={
+                    "error": {
+                        "code": "SERVICE_ERROR",
+                        "message": "Translation service is temporarily unavailable",
+                    }
+                },
+            )
+
+
+@router.post(
+    "/translate/batch",
+    response_model=BatchTranslateResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        429: {"model": ErrorResponse, "description": "Client budget exceeded"},
+        503: {"model": ErrorResponse, "description": "Service unavailable or at capacity"},
+    },
+)
+async def translate_batch(
+    request: BatchTranslateRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None),
+):
+    """
+    Translate a list of Chinese texts, returning per-item results in input order.
+
+    Short texts are packed into shared LLM prompts up to a token budget and the
+    packed prompts run concurrently. A failed item carries its own error and does
+    not fail the whole batch.
+
+    Args:
+        request: BatchTranslateRequest with texts field
+        cache_control: Optional Cache-Control header (no-cache / no-store bypass the cache)
+        x_client_id: Optional client key for usage accounting and budgets
+        x_request_timeout: Optional client timeout in seconds; retries stop before it
+
+    Returns:
+        BatchTranslateResponse with one result per input text
+
+    Raises:
+        HTTPException: On validation or service errors
+    """
+    req_id = set_request_id()
+    set_client_id(x_client_id)
+    set_keyword_source(request.keyword_source)
+    set_deadline(x_request_timeout)
+    logger.info("Batch translation request received. Items: %d", len(request.texts))
+
+    if len(request.texts) > settings.batch_max_items:
+        logger.warning(f"Batch too large: {len(request.texts)} items")
+        _count_error("BATCH_TOO_LARGE")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
                 "error": {
-                    "code": "TEXT_TOO_LONG",
-                    "message": f"Text exceeds maximum length of {settings.max_text_length} characters",
+                    "code": "BATCH_TOO_LARGE",
+                    "message": f"Batch exceeds maximum of {settings.batch_max_items} items",
                 }
             },
         )
 
+    items: list[Optional[BatchTranslateItem]] = [None] * len(request.texts)
+    valid_indices = []
+    for index, text in enumerate(request.texts):
+        if len(text) > settings.max_text_length:
+            _count_error("TEXT_TOO_LONG")
+            items[index] = BatchTranslateItem(
+                index=index,
+                error=ErrorDetail(
+                    code="TEXT_TOO_LONG",
+                    message=f"Text exceeds maximum length of {settings.max_text_length} characters",
+                ),
+            )
+        else:
+            valid_indices.append(index)
+
     try:
         with Timer() as timer:
-            translation, keywords = await translator.translate(request.text)
+            read_cache, write_cache = parse_cache_control(cache_control)
+            results = await translator.translate_batch(
+                [request.texts[index] for index in valid_indices],
+                read_cache=read_cache,
+                write_cache=write_cache,
+            )
+
+        for index, result in zip(valid_indices, results):
+            if isinstance(result, BudgetExceededError):
+                _count_error("RATE_LIMITED")
+                items[index] = BatchTranslateItem(
+                    index=index,
+                    error=ErrorDetail(
+                        code="RATE_LIMITED",
+                        message="Request or token budget exceeded. Please retry later.",
+                    ),
+                )
+            elif isinstance(result, OverloadedError):
+                _count_error("OVERLOADED")
+                items[index] = BatchTranslateItem(
+                    index=index,
+                    error=ErrorDetail(
+                        code="OVERLOADED",
+                        message="Translation service is at capacity. Please retry later.",
+                    ),
+                )
+            elif isinstance(result, TranslationError):
+                _count_error("TRANSLATION_FAILED")
+                items[index] = BatchTranslateItem(
+                    index=index,
+                    error=ErrorDetail(
+                        code="TRANSLATION_FAILED",
+                        message="Failed to translate text. Please try again.",
+                    ),
+                )
+            else:
+                translation, keywords = result
+                items[index] = BatchTranslateItem(
+                    index=index, translation=translation, keywords=keywords
+                )
 
-        logger.info(f"Translation completed in {timer.elapsed:.2f}s")
+        failed = sum(1 for item in items if item.error)
+        logger.info(
+            "Batch translation completed in %.2fs. Items: %d, failed: %d",
+            timer.elapsed,
+            len(items),
+            failed,
+            extra={"duration_ms": round(timer.elapsed * 1000, 1)},
+        )
 
-        return TranslateResponse(translation=translation, keywords=keywords)
+        return BatchTranslateResponse(results=items)
 
-    except TranslationError as e:
-        logger.error(f"Translation error: {str(e)}")
+    except Exception as e:
+        logger.exception(f"Unexpected error: {str(e)}")
+        _count_error("SERVICE_ERROR")
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={
                 "error": {
-                    "code": "TRANSLATION_FAILED",
-                    "message": "Failed to translate text. Please try again.",
+                    "code": "SERVICE_ERROR",
+                    "message": "Translation service is temporarily unavailable",
                 }
             },
         )
-    except Exception as e:
-        logger.exception(f"Unexpected error: {str(e)}")
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/translate/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Server-sent events"},
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        429: {"model": ErrorResponse, "description": "Client budget exceeded"},
+    },
+)
+async def translate_stream(
+    request: TranslateRequest,
+    cache_control: Optional[str] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None),
+):
+    """
+    Translate Chinese text, streaming the translation as server-sent events.
+
+    Events:
+        delta: {"text": "..."} translation text as it arrives
+        keywords: {"translation": "...", "keywords": [...]} final validated result
+        error: {"code": "...", "message": "..."} if translation fails mid-stream
+
+    Args:
+        request: TranslateRequest with text field
+        cache_control: Optional Cache-Control header (no-cache / no-store bypass the cache)
+        x_client_id: Optional client key for usage accounting and budgets
+
+    Raises:
+        HTTPException: On validation errors
+    """
+    req_id = set_request_id()
+    set_client_id(x_client_id)
+    set_keyword_source(request.keyword_source)
+    logger.info("Streaming translation request received. Text length: %d", len(request.text))
+    start = time.perf_counter()
+
+    if len(request.text) > settings.max_text_length:
+        logger.warning(f"Text too long: {len(request.text)} chars")
+        _count_error("TEXT_TOO_LONG")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail={
                 "error": {
-                    "code": "SERVICE_ERROR",
-                    "message": "Translation service is temporarily unavailable",
+                    "code": "TEXT_TOO_LONG",
+                    "message": f"Text exceeds maximum length of {settings.max_text_length} characters",
                 }
             },
         )
+
+    read_cache, write_cache = parse_cache_control(cache_control)
+
+    # The client's budget and the upstream concurrency slot are taken before the first
+    # event, so waiting for it here lets a rejected request get a real 429 or 503
+    # instead of an error event on a 200 response
+    stream = translator.translate_stream(request.text, read_cache=read_cache, write_cache=write_cache)
+    prefetched: list[dict] = []
+    early_error: Optional[Exception] = None
+    try:
+        prefetched.append(await anext(stream))
+    except BudgetExceededError as e:
+        raise _rate_limited(e)
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except StopAsyncIteration:
+        pass
+    except Exception as e:
+        early_error = e
+
+    async def upstream() -> AsyncIterator[dict]:
+        if early_error is not None:
+            raise early_error
+        for event in prefetched:
+            yield event
+        async for event in stream:
+            yield event
+
+    async def events() -> AsyncIterator[str]:
+        first = True
+        try:
+            async for event in upstream():
+                if first:
+                    ttfb = time.perf_counter() - start
+                    stream_ttfb.record(ttfb)
+                    metrics.stream_ttfb.observe(ttfb, **answered_labels())
+                    logger.info("Time to first byte: %.3fs", ttfb)
+                    first = False
+                if event["type"] == "delta":
+                    yield _sse("delta", {"text": event["text"]})
+                else:
+                    yield _sse(
+                        "keywords",
+                        {"translation": event["translation"], "keywords": event["keywords"]},
+                    )
+            logger.info("Streaming translation completed in %.2fs", time.perf_counter() - start)
+
+        except BudgetExceededError as e:
+            logger.warning(f"Budget exceeded: {str(e)}")
+            _count_error("RATE_LIMITED")
+            yield _sse(
+                "error",
+                {
+                    "code": "RATE_LIMITED",
+                    "message": "Request or token budget exceeded. Please retry later.",
+                    "retry_after": max(1, math.ceil(e.retry_after)),
+                },
+            )
+        except OverloadedError as e:
+            logger.warning(f"Upstream overloaded: {str(e)}")
+            _count_error("OVERLOADED")
+            yield _sse(
+                "error",
+                {
+                    "code": "OVERLOADED",
+                    "message": "Translation service is at capacity. Please retry later.",
+                    "retry_after": max(1, math.ceil(e.retry_after)),
+                },
+            )
+        except TranslationError as e:
+            logger.error(f"Translation error: {str(e)}")
+            _count_error("TRANSLATION_FAILED")
+            yield _sse(
+                "error",
+                {"code": "TRANSLATION_FAILED", "message": "Failed to translate text. Please try again."},
+            )
+        except Exception as e:
+            logger.exception(f"Unexpected error: {str(e)}")
+            _count_error("SERVICE_ERROR")
+            yield _sse(
+                "error",
+                {"code": "SERVICE_ERROR", "message": "Translation service is temporarily unavailable"},
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Request-ID": req_id},
+    )
@@ -2,16 +2,30 @@
 FastAPI application entry point.
 Main application setup with middleware, CORS, and route registration.
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from api.translate import router as translate_router
+from api.admin import router as admin_router
+from api.jobs import router as jobs_router
+from api.metrics import router as metrics_router, MetricsMiddleware, snapshot_exporter
 from config import settings
-from utils.logging import setup_logging, get_logger
+from services.jobs import job_queue
+from services.llm_client import llm_client
+from utils.logging import setup_logging, get_logger, flush_logging
+from utils.loop_monitor import loop_monitor
+from utils.tracing import tracer
 
 # Setup logging
-setup_logging(settings.log_level)
+setup_logging(
+    settings.log_level,
+    log_format=settings.log_format,
+    queue_size=settings.log_queue_size,
+    info_sample_rate=settings.log_info_sample_rate,
+)
 logger = get_logger(__name__)
 
 
@@ -21,8 +35,21 @@ async def lifespan(app: FastAPI):
     logger.info("Starting AI Translation Assistant API")
     logger.info(f"LLM Provider: {settings.llm_provider}")
     logger.info(f"LLM Model: {settings.llm_model}")
+    llm_client.warmup()
+    loop_monitor.start()
+    if snapshot_exporter is not None:
+        snapshot_exporter.start()
+    job_queue.start()
     yield
     logger.info("Shutting down AI Translation Assistant API")
+    await job_queue.stop()
+    await loop_monitor.stop()
+    if snapshot_exporter is not None:
+        await snapshot_exporter.stop()
+    await llm_client.aclose()
+    if tracer.enabled:
+        tracer.exporter.flush()
+    await asyncio.to_thread(flush_logging)
 
 
 # Create FastAPI app
@@ -42,8 +69,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request duration and in-flight gauges
+app.add_middleware(MetricsMiddleware)
+
 # Register routers
 app.include_router(translate_router, prefix="/api", tags=["Translation"])
+app.include_router(jobs_router, prefix="/api", tags=["Jobs"])
+if settings.admin_token:
+    app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
+else:
+    logger.info("ADMIN_TOKEN not set; admin endpoints disabled")
+app.include_router(metrics_router, tags=["Metrics"])
 
 
 @app.get("/")
@@ -0,0 +1,140 @@
+"""
+Model cascade benchmark: routing mix, classification cost and expected latency.
+Classifies a text corpus (built in, or one text per line with --corpus), reports the
+share of texts per tier and reason and the classification time, and estimates mean
+LLM latency with and without the cascade from per-tier latencies. With --live N,
+the texts routed to the fast tier are sent to both configured models and the
+measured latencies are reported instead (needs CASCADE_ENABLED and CASCADE_FAST_MODEL).
+
+Usage:
+    python benchmarks/bench_cascade.py [--corpus texts.txt] [--fast-ms 300 --strong-ms 1200] [--live 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("CASCADE_ENABLED", "true")
+os.environ.setdefault("CASCADE_FAST_MODEL", "mock-fast")
+
+from services.cascade import model_cascade
+
+BUILTIN_TEXTS = [
+    "设置",
+    "保存",
+    "取消",
+    "登录失败",
+    "你好,欢迎使用翻译助手。",
+    "请稍后再试。",
+    "文件已成功上传。",
+    "人工智能正在改变我们的工作方式。",
+    "新模型在保持准确率不变的情况下将推理延迟降低了40%。",
+    "错误代码 E1024",
+    "打开 Settings > Advanced > Proxy",
+    "固件更新完成后请重启设备。如果问题仍然存在,请联系客服。",
+    "调用 client.chat.completions.create(model=\"gpt-4o\") 时返回 HTTP 429。",
+    "CPU 使用率超过 90% 时,Kubernetes HPA 会将副本数扩展到 max_replicas。",
+    "机器学习和深度学习是人工智能的核心技术,二者都依赖大量高质量的训练数据,"
+    "而数据的采集、清洗和标注往往占据了项目的大部分时间与成本。",
+    "本协议自双方签字盖章之日起生效,有效期为三年。任何一方如需提前终止本协议,"
+    "应至少提前三十日以书面形式通知对方,并承担由此给对方造成的直接经济损失。",
+]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_classify(texts: list[str], runs: int) -> float:
+    """Print the routing mix; return the share of texts routed to the fast tier."""
+    decisions = Counter(model_cascade.classify(text) for text in texts)
+    print(f"Routing of {len(texts)} texts (CASCADE_MAX_CHARS={model_cascade.max_chars})")
+    print(f"{'tier':>8} {'reason':>14} {'share':>7}")
+    for (tier, reason), count in sorted(decisions.items()):
+        print(f"{tier:>8} {reason:>14} {count / len(texts):>7.0%}")
+
+    timings = []
+    for _ in range(runs):
+        for text in texts:
+            start = time.perf_counter()
+            model_cascade.classify(text)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        f"Classification: avg {statistics.mean(timings) * 1e6:.1f} us, "
+        f"p99 {percentile(timings, 0.99) * 1e6:.1f} us per text"
+    )
+    return sum(count for (tier, _), count in decisions.items() if tier == "fast") / len(texts)
+
+
+def estimate(fast_share: float, fast_ms: float, strong_ms: float, escalation_rate: float):
+    # An escalated text pays for its fast call and then a strong one
+    cascade_ms = fast_share * (fast_ms + escalation_rate * strong_ms) + (1 - fast_share) * strong_ms
+    print(f"\nEstimated mean LLM latency (fast {fast_ms:.0f} ms, strong {strong_ms:.0f} ms, "
+          f"{escalation_rate:.0%} of fast answers escalated)")
+    print(f"  strong model only: {strong_ms:.0f} ms")
+    print(f"  with cascade:      {cascade_ms:.0f} ms  ({(strong_ms - cascade_ms) / strong_ms:.0%} lower)")
+
+
+async def bench_live(texts: list[str], samples: int):
+    from services.llm_client import llm_client
+    from services.translator import translator
+
+    if llm_client.fast_router is None:
+        print("\n--live needs CASCADE_ENABLED=true and CASCADE_FAST_MODEL")
+        return
+    llm_client.warmup()
+    fast_texts = [text for text in texts if model_cascade.classify(text)[0] == "fast"]
+    if not fast_texts:
+        print("\nNo texts routed to the fast tier")
+        return
+    print(f"\nLive calls: {samples} fast-tier texts sent to each model")
+    print(f"{'tier':>8} {'model':>20} {'p50(ms)':>9} {'p95(ms)':>9} {'invalid':>8}")
+    for tier in ("fast", "strong"):
+        latencies, invalid = [], 0
+        for i in range(samples):
+            text = fast_texts[i % len(fast_texts)]
+            start = time.perf_counter()
+            response = await llm_client.chat(translator._build_messages(text), tier=tier)
+            latencies.append(time.perf_counter() - start)
+            try:
+                translator._parse_response(response.content, text)
+            except Exception:
+                invalid += 1
+        latencies.sort()
+        print(
+            f"{tier:>8} {llm_client.tier_backend(tier).model:>20} {percentile(latencies, 0.5) * 1000:>9.0f} "
+            f"{percentile(latencies, 0.95) * 1000:>9.0f} {invalid / samples:>8.0%}"
+        )
+
+
+def main(args):
+    texts = BUILTIN_TEXTS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    fast_share = bench_classify(texts, args.runs)
+    estimate(fast_share, args.fast_ms, args.strong_ms, args.escalation_rate)
+    if args.live:
+        asyncio.run(bench_live(texts, args.live))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default="", help="Texts to classify, one per line")
+    parser.add_argument("--runs", type=int, default=1000, help="Classification passes over the texts")
+    parser.add_argument("--fast-ms", type=float, default=300.0, help="Fast model latency for the estimate")
+    parser.add_argument("--strong-ms", type=float, default=1200.0, help="Strong model latency for the estimate")
+    parser.add_argument("--escalation-rate", type=float, default=0.02, help="Fast answers failing validation")
+    parser.add_argument("--live", type=int, default=0, help="Calls per tier against the configured models")
+    main(parser.parse_args())
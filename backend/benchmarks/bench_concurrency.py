@@ -0,0 +1,82 @@
+"""
+Concurrency benchmark for POST /api/translate.
+Starts a local fake OpenAI-compatible upstream with a fixed latency, points the
+OpenAI provider at it, and measures throughput at increasing client concurrency.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--latency 0.2] [--requests 64]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+from benchmarks.fake_upstream import configure_env, free_port, start_fake_upstream
+
+
+async def _run_level(client, concurrency: int, total: int) -> dict:
+    """Send `total` requests with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            # Unique texts and no-store keep the cache and coalescing out of the measurement
+            response = await client.post(
+                "/api/translate",
+                json={"text": f"第{concurrency}-{i}次：你好，世界。"},
+                headers={"Cache-Control": "no-store"},
+            )
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+    }
+
+
+async def main(latency: float, total: int, levels: list[int]):
+    import httpx
+    from app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = [await _run_level(client, level, total) for level in levels]
+
+    print(f"Fake upstream latency: {latency * 1000:.0f} ms, requests per level: {total}")
+    print(f"{'concurrency':>12} {'elapsed(s)':>12} {'req/s':>10} {'failures':>10}")
+    for r in results:
+        print(
+            f"{r['concurrency']:>12} {r['elapsed_s']:>12} "
+            f"{r['throughput_rps']:>10} {r['failures']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake upstream latency (s)")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    parser.add_argument(
+        "--levels", type=str, default="1,4,16,64", help="Comma-separated concurrency levels"
+    )
+    args = parser.parse_args()
+
+    port = free_port()
+    configure_env(port)
+    start_fake_upstream(port, args.latency)
+    asyncio.run(
+        main(args.latency, args.requests, [int(x) for x in args.levels.split(",")])
+    )
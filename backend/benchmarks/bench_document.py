@@ -0,0 +1,84 @@
+"""
+Long-document translation benchmark.
+Translates a ~100k-character document through POST /api/translate against a
+local fake upstream and reports throughput at increasing DOCUMENT_CONCURRENCY.
+
+Usage:
+    python benchmarks/bench_document.py [--chars 100000] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+from benchmarks.fake_upstream import configure_env, free_port, start_fake_upstream
+
+
+def build_document(chars: int) -> str:
+    """Build a synthetic Chinese document of roughly the given length."""
+    sentences, paragraph, total = [], [], 0
+    i = 0
+    while total < chars:
+        sentence = f"这是第{i}句测试文本，用于评估长文档翻译的吞吐量。"
+        paragraph.append(sentence)
+        total += len(sentence)
+        i += 1
+        if len(paragraph) == 8:
+            sentences.append("".join(paragraph))
+            paragraph = []
+    if paragraph:
+        sentences.append("".join(paragraph))
+    return "\n\n".join(sentences)
+
+
+async def main(chars: int, latency: float, levels: list[int]):
+    import httpx
+    from app import app
+    from config import settings
+    from services.chunker import chunk_text
+
+    document = build_document(chars)
+    chunks = len(chunk_text(document, settings.document_chunk_tokens))
+    print(f"Document: {len(document)} chars, {chunks} chunks, fake latency {latency * 1000:.0f} ms")
+    print(f"{'parallelism':>12} {'elapsed(s)':>12} {'chars/s':>12} {'status':>8}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        for level in levels:
+            settings.document_concurrency = level
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/translate",
+                json={"text": document},
+                headers={"Cache-Control": "no-store"},
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"{level:>12} {elapsed:>12.3f} {len(document) / elapsed:>12.0f} "
+                f"{response.status_code:>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chars", type=int, default=100000, help="Document length")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake upstream latency (s)")
+    parser.add_argument(
+        "--levels", type=str, default="1,4,16,64", help="Comma-separated parallelism levels"
+    )
+    args = parser.parse_args()
+
+    port = free_port()
+    configure_env(port)
+    # Measure the chunked path; with the translation memory documents go sentence by sentence
+    os.environ["TM_ENABLED"] = "false"
+    start_fake_upstream(port, args.latency)
+    asyncio.run(main(args.chars, args.latency, [int(x) for x in args.levels.split(",")]))
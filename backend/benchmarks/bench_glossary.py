@@ -0,0 +1,116 @@
+"""
+Glossary benchmark: index build/load cost and lookup latency at millions of terms.
+Writes a synthetic term file, compiles and maps it, then measures exact lookups of
+short inputs (a mix of known terms and unknown labels, reporting the hit rate) and
+term scans of longer sentences that embed a few glossary terms.
+
+Usage:
+    python benchmarks/bench_glossary.py [--entries 2000000] [--lookups 50000] [--term-share 0.6]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from services.glossary import Glossary
+
+
+def random_term(rng: random.Random) -> str:
+    """2-6 characters from a few thousand common CJK ideographs."""
+    return "".join(chr(0x4E00 + rng.randrange(3000)) for _ in range(rng.randint(2, 6)))
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name: str, timings: list[float]):
+    timings.sort()
+    print(
+        f"{name:>22} {sum(timings) / len(timings) * 1e6:>9.1f} "
+        f"{percentile(timings, 0.5) * 1e6:>9.1f} {percentile(timings, 0.99) * 1e6:>9.1f}"
+    )
+
+
+def main(entries: int, lookups: int, term_share: float, sentence_chars: int):
+    rng = random.Random(0)
+    workdir = tempfile.mkdtemp(prefix="glossary-bench-")
+    term_path = os.path.join(workdir, "terms.tsv")
+
+    sample = []
+    with open(term_path, "w", encoding="utf-8") as f:
+        for i in range(entries):
+            term = random_term(rng)
+            f.write(f"{term}\tterm {i}\n")
+            if i % max(1, entries // lookups) == 0:
+                sample.append(term)
+
+    start = time.perf_counter()
+    Glossary(term_path)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    glossary = Glossary(term_path, max_exact_chars=32)
+    load_ms = (time.perf_counter() - start) * 1000
+    index_mb = os.path.getsize(glossary.index_path) / 1e6
+
+    print(f"Terms: {len(glossary)} ({entries} lines), index {index_mb:.0f} MB")
+    print(f"Build {build_s:.1f}s, load (map only) {load_ms:.1f} ms")
+
+    # Short inputs: term_share known terms, the rest unknown labels
+    queries = [
+        rng.choice(sample) if rng.random() < term_share else random_term(rng) + "键" for _ in range(lookups)
+    ]
+    exact = []
+    for query in queries:
+        start = time.perf_counter()
+        glossary.lookup(query)
+        exact.append(time.perf_counter() - start)
+
+    # Longer inputs: random text with a few glossary terms embedded
+    sentences = []
+    for _ in range(max(1, lookups // 20)):
+        parts = []
+        while sum(map(len, parts)) < sentence_chars:
+            parts.append(rng.choice(sample) if rng.random() < 0.2 else random_term(rng))
+        sentences.append("，".join(parts) + "。")
+    scan = []
+    found = 0
+    for sentence in sentences:
+        start = time.perf_counter()
+        found += len(glossary.find_terms(sentence))
+        scan.append(time.perf_counter() - start)
+
+    stats = glossary.stats()
+    print(f"Exact hit rate: {stats['exact_hit_ratio']:.1%} of {lookups} short inputs (expected ~{term_share:.0%})")
+    print(
+        f"Term scans: {len(sentences)} sentences of ~{sentence_chars} chars, "
+        f"{found / len(sentences):.1f} terms found per sentence"
+    )
+    print(f"\n{'lookup':>22} {'avg(us)':>9} {'p50(us)':>9} {'p99(us)':>9}")
+    report("exact (short input)", exact)
+    report(f"scan ({sentence_chars} chars)", scan)
+
+    os.remove(glossary.index_path)
+    os.remove(term_path)
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000000)
+    parser.add_argument("--lookups", type=int, default=50000)
+    parser.add_argument("--term-share", type=float, default=0.6, help="Fraction of short inputs that are terms")
+    parser.add_argument("--sentence-chars", type=int, default=200, help="Length of the scanned texts")
+    args = parser.parse_args()
+    main(args.entries, args.lookups, args.term_share, args.sentence_chars)
@@ -0,0 +1,124 @@
+"""
+LLM response parser benchmark.
+Parses a corpus of malformed and well-formed translation responses with strict
+json.loads and with the tolerant parser, reporting how many pass schema
+validation and the per-response parse time of each path.
+
+Usage:
+    python benchmarks/bench_json_repair.py [--corpus responses.jsonl] [--repeat 2000]
+
+A corpus file has one JSON object per line with the raw response in "content".
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from services.json_repair import loads_tolerant
+from services.translator import Translator
+
+VALID = '{"translation": "Artificial intelligence is changing how we work.", "keywords": ["artificial intelligence", "work", "change"]}'
+
+# Failure modes seen in provider responses without a JSON response_format
+BUILTIN_CORPUS = [
+    VALID,
+    '{"translation": "The weather is nice today.", "keywords": ["weather", "today", "nice"]}',
+    '```json\n' + VALID + '\n```',
+    '```\n' + VALID + '\n```',
+    'Here is the translation and keywords:\n\n```json\n' + VALID + '\n```\n\nLet me know if you need anything else.',
+    'Sure! ' + VALID,
+    VALID + '\n\nNote: "AI" is kept as a keyword because it is the main topic.',
+    '{\n  "translation": "Machine learning needs data.",\n  "keywords": ["machine learning", "data", "training",],\n}',
+    "{'translation': 'Deep learning is a subfield of machine learning.', 'keywords': ['deep learning', 'subfield', 'machine learning']}",
+    '{translation: "Cloud computing lowers costs.", keywords: ["cloud computing", "cost", "infrastructure"]}',
+    '{"translation": "He said "this is important" at the meeting.", "keywords": ["meeting", "importance", "statement"]}',
+    '{"translation": "First line.\nSecond line.", "keywords": ["line", "first", "second"]}',
+    '{"translation": "Data privacy matters." // translated\n, "keywords": ["data privacy", "regulation", "users"]}',
+    '{"translation": "Open source grows."\n "keywords": ["open source" "growth" "community"]}',
+    '{"translation": "Quantum computers are fast.", "keywords": ["quantum computing", "speed", "hardware", "qubi',
+    '{"translation": "Electric cars are popular.", "keywords": "electric cars, popularity, market"}',
+    '{"translation": "Robots assist surgeons.", "keywords": ["robots", "surgery", "assistance"], "confidence": None}',
+    '{"items": [{"index": 0, "translation": "Hello.", "keywords": ["greeting", "hello", "politeness"]}, '
+    '{"index": 1, "translation": "Good morning.", "keywords": ["morning", "greeting", "time"]},]}',
+    '{"translation": "The market fell.", "keywords": ["market"]}',
+    'I cannot translate this text because it appears to be empty.',
+    '{"translation": "The report was publis',
+]
+
+
+def load_corpus(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["content"] for line in f if line.strip()]
+
+
+def validate(translator: Translator, data) -> bool:
+    try:
+        if isinstance(data, dict) and "items" in data:
+            return all(translator._validate_result(item) for item in data["items"])
+        translator._validate_result(data)
+        return True
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return False
+
+
+def time_per_call(parse, content: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            parse(content)
+        except json.JSONDecodeError:
+            pass
+    return (time.perf_counter() - start) / repeat
+
+
+def main(corpus: list[str], repeat: int):
+    translator = Translator()
+    strict_ok = tolerant_ok = repaired = 0
+    strict_times, repaired_times, failed_times = [], [], []
+
+    for content in corpus:
+        try:
+            if validate(translator, json.loads(content)):
+                strict_ok += 1
+        except json.JSONDecodeError:
+            pass
+        try:
+            data, was_repaired = loads_tolerant(content)
+        except json.JSONDecodeError:
+            failed_times.append(time_per_call(loads_tolerant, content, repeat))
+            continue
+        if validate(translator, data):
+            tolerant_ok += 1
+        if was_repaired:
+            repaired += 1
+            repaired_times.append(time_per_call(loads_tolerant, content, repeat))
+        else:
+            strict_times.append(time_per_call(loads_tolerant, content, repeat))
+
+    def avg_us(times: list[float]) -> str:
+        return f"{sum(times) / len(times) * 1e6:.1f}" if times else "-"
+
+    print(f"Responses: {len(corpus)}")
+    print(f"Valid with strict json.loads:   {strict_ok}")
+    print(f"Valid with tolerant parsing:    {tolerant_ok} ({repaired} repaired locally)")
+    print(f"Remaining LLM repair retries:   {len(corpus) - tolerant_ok}")
+    print(f"{'path':>18} {'responses':>10} {'avg(us)':>10}")
+    for name, times in (("strict fast path", strict_times), ("local repair", repaired_times), ("unrepairable", failed_times)):
+        print(f"{name:>18} {len(times):>10} {avg_us(times):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default="", help="JSONL file of captured responses (default: built-in corpus)")
+    parser.add_argument("--repeat", type=int, default=2000, help="Parses per response for timing")
+    args = parser.parse_args()
+    main(load_corpus(args.corpus) if args.corpus else BUILTIN_CORPUS, args.repeat)
@@ -0,0 +1,187 @@
+"""
+Keyword extraction benchmark: local extraction latency and LLM output-token savings.
+Times TF-IDF and TextRank extraction on texts of several lengths (with a synthetic
+IDF table, or --idf), then compares the output tokens of translation responses with
+and without the keyword list, estimated from a response corpus or, with --live,
+measured from the configured provider's usage data.
+
+Usage:
+    python benchmarks/bench_keywords.py [--idf idf.txt] [--corpus responses.jsonl] [--live 10]
+
+A corpus file has one JSON object per line with the raw response in "content".
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from services.chunker import estimate_tokens
+from services.keywords import KeywordExtractor
+
+BUILTIN_RESPONSES = [
+    {"translation": "Hello, welcome to the translation assistant.", "keywords": ["welcome", "translation", "assistant"]},
+    {"translation": "Settings", "keywords": ["settings", "configuration", "menu"]},
+    {
+        "translation": "Artificial intelligence is changing the way we work.",
+        "keywords": ["artificial intelligence", "work", "change"],
+    },
+    {
+        "translation": "The new model reduces inference latency by 40% while keeping accuracy unchanged.",
+        "keywords": ["model", "inference latency", "accuracy", "optimization"],
+    },
+    {
+        "translation": "Please restart the device after the firmware update is complete. "
+        "If the problem persists, contact customer support.",
+        "keywords": ["device restart", "firmware update", "customer support", "troubleshooting"],
+    },
+    {
+        "translation": "Machine learning and deep learning are the core technologies of artificial intelligence, "
+        "and both depend on large amounts of high-quality training data.",
+        "keywords": ["machine learning", "deep learning", "artificial intelligence", "training data", "core technology"],
+    },
+]
+
+LIVE_TEXTS = [
+    "你好,欢迎使用翻译助手。",
+    "设置",
+    "人工智能正在改变我们的工作方式。",
+    "新模型在保持准确率不变的情况下将推理延迟降低了40%。",
+    "固件更新完成后请重启设备。如果问题仍然存在,请联系客服。",
+    "机器学习和深度学习是人工智能的核心技术,二者都依赖大量高质量的训练数据。",
+]
+
+FUNCTION_CHARS = "的了是在和与也都就被把从对为"
+
+
+def synthetic_idf(rng: random.Random, words: int) -> tuple[str, list[str]]:
+    """Write a Zipf-weighted vocabulary of 2-4 character words as an IDF table; return (path, vocabulary)."""
+    vocabulary = list(
+        dict.fromkeys(
+            "".join(chr(0x4E00 + rng.randrange(3000)) for _ in range(rng.randint(2, 4))) for _ in range(words)
+        )
+    )
+    path = os.path.join(tempfile.mkdtemp(prefix="keywords-bench-"), "idf.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for rank, word in enumerate(vocabulary, start=1):
+            f.write(f"{word} {math.log(rank + 1) + 1:.4f}\n")
+    return path, vocabulary
+
+
+def synthetic_text(rng: random.Random, vocabulary: list[str], chars: int) -> str:
+    parts = []
+    length = 0
+    while length < chars:
+        # Zipf-like: frequent words come from the head of the vocabulary
+        word = vocabulary[min(len(vocabulary) - 1, int(rng.paretovariate(1.2)) - 1)]
+        parts.append(word + (rng.choice(FUNCTION_CHARS) if rng.random() < 0.5 else ""))
+        length += len(parts[-1])
+        if rng.random() < 0.1:
+            parts.append("。")
+    return "".join(parts)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench_extraction(idf_path: str, vocabulary: list[str], lengths: list[int], runs: int):
+    rng = random.Random(1)
+    extractors = {method: KeywordExtractor(method=method, idf_path=idf_path) for method in ("tfidf", "textrank")}
+    print(f"IDF table: {len(extractors['tfidf'].idf)} words")
+    print(f"{'method':>9} {'chars':>6} {'avg(us)':>9} {'p99(us)':>9}  example keywords")
+    for chars in lengths:
+        texts = [synthetic_text(rng, vocabulary, chars) for _ in range(runs)] if vocabulary else LIVE_TEXTS * runs
+        for method, extractor in extractors.items():
+            timings = []
+            for text in texts:
+                start = time.perf_counter()
+                keywords = extractor.extract(text)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(
+                f"{method:>9} {chars:>6} {statistics.mean(timings) * 1e6:>9.1f} "
+                f"{percentile(timings, 0.99) * 1e6:>9.1f}  {', '.join(keywords[:3])}"
+            )
+
+
+def bench_tokens(responses: list[dict], tpot_ms: float):
+    with_keywords = []
+    translation_only = []
+    for response in responses:
+        with_keywords.append(estimate_tokens(json.dumps(response, ensure_ascii=False)))
+        translation_only.append(estimate_tokens(json.dumps({"translation": response["translation"]}, ensure_ascii=False)))
+    full, short = statistics.mean(with_keywords), statistics.mean(translation_only)
+    print(f"\nEstimated output tokens over {len(responses)} responses (~4 characters per token)")
+    print(f"  with keywords:    {full:.1f}")
+    print(f"  translation only: {short:.1f}  ({(full - short) / full:.0%} fewer)")
+    print(f"  decode time saved at {tpot_ms:.0f} ms/token: {(full - short) * tpot_ms:.0f} ms per call")
+
+
+async def bench_live(samples: int):
+    from services.llm_client import llm_client
+    from services.translator import translator
+
+    llm_client.warmup()
+    print(f"\nLive calls to {os.environ.get('LLM_PROVIDER')} ({samples} per mode)")
+    print(f"{'keywords':>10} {'completion tokens':>18} {'latency p50(ms)':>16}")
+    for source in ("llm", "local"):
+        tokens, latencies = [], []
+        for i in range(samples):
+            messages = translator._build_messages(LIVE_TEXTS[i % len(LIVE_TEXTS)], keyword_source=source)
+            start = time.perf_counter()
+            response = await llm_client.chat(messages)
+            latencies.append(time.perf_counter() - start)
+            tokens.append(response.usage()[1])
+        print(f"{source:>10} {statistics.mean(tokens):>18.1f} {statistics.median(latencies) * 1000:>16.0f}")
+
+
+def load_corpus(path: str) -> list[dict]:
+    responses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(json.loads(line)["content"])
+                if isinstance(data, dict) and isinstance(data.get("translation"), str):
+                    responses.append(data)
+    return responses
+
+
+def main(args):
+    vocabulary: list[str] = []
+    idf_path = args.idf
+    if not idf_path:
+        idf_path, vocabulary = synthetic_idf(random.Random(0), args.words)
+    bench_extraction(idf_path, vocabulary, [int(n) for n in args.lengths.split(",")], args.runs)
+    if not args.idf:
+        os.remove(idf_path)
+        os.rmdir(os.path.dirname(idf_path))
+
+    bench_tokens(load_corpus(args.corpus) if args.corpus else BUILTIN_RESPONSES, args.tpot_ms)
+    if args.live:
+        asyncio.run(bench_live(args.live))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--idf", default="", help="IDF table (word idf lines); default: synthetic")
+    parser.add_argument("--words", type=int, default=300000, help="Synthetic vocabulary size")
+    parser.add_argument("--lengths", default="20,200,1000,4000", help="Text lengths in characters")
+    parser.add_argument("--runs", type=int, default=200, help="Texts per length")
+    parser.add_argument("--corpus", default="", help="JSONL of captured responses for the token estimate")
+    parser.add_argument("--tpot-ms", type=float, default=20.0, help="Provider time per output token")
+    parser.add_argument("--live", type=int, default=0, help="Calls per mode against the configured provider")
+    main(parser.parse_args())
@@ -0,0 +1,133 @@
+"""
+Logging overhead benchmark: time the request path spends in logging calls.
+Replays the INFO/DEBUG lines of one /api/translate request against an output
+stream with a configurable write latency (a slow terminal or a full pipe). It
+compares the former synchronous text handler with eager f-strings against the
+queued JSON pipeline with lazy formatting, with and without sampling.
+
+Usage:
+    python benchmarks/bench_logging.py [--requests 20000] [--sink-latency-us 50]
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+from utils.logging import (
+    TEXT_FORMAT,
+    RequestIdFilter,
+    flush_logging,
+    log_stats,
+    set_request_id,
+    setup_logging,
+    stop_logging,
+)
+
+RESPONSE = '{"translation": "Artificial intelligence is changing how we work.", "keywords": ["AI", "work", "change"]}' * 3
+
+
+class SlowSink:
+    """Output stream whose writes block for latency seconds, like a slow stdout."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text: str):
+        if self.latency:
+            time.sleep(self.latency)  # Blocking I/O releases the GIL, as a real write does
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def eager_request(logger: logging.Logger, elapsed: float):
+    """Log lines of one request as the hot path wrote them before (f-strings)."""
+    logger.info(f"Translation request received. Text length: {42}")
+    logger.info(f"Sending translation request for text length: {42}")
+    logger.debug(f"LLM response received: {RESPONSE[:200]}...")
+    logger.info(f"Translation successful. Keywords count: {3}")
+    logger.info(f"Translation memory reused {0}/{1} segments")
+    logger.info(f"Translation completed in {elapsed:.2f}s")
+
+
+def lazy_request(logger: logging.Logger, elapsed: float):
+    """The same lines with deferred %-formatting."""
+    logger.info("Translation request received. Text length: %d", 42)
+    logger.info("Sending translation request for text length: %d", 42)
+    logger.debug("LLM response received: %.200s...", RESPONSE)
+    logger.info("Translation successful. Keywords count: %d", 3)
+    logger.info("Translation memory reused %d/%d segments", 0, 1)
+    logger.info("Translation completed in %.2fs", elapsed, extra={"duration_ms": round(elapsed * 1000, 1)})
+
+
+def configure_sync(sink: SlowSink):
+    """The previous setup: a StreamHandler writing text on the caller's thread."""
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(RequestIdFilter())
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def configure_queued(sink: SlowSink, sample_rate: float, queue_size: int):
+    stdout = sys.stdout
+    sys.stdout = sink  # setup_logging writes to the stdout of the moment
+    try:
+        setup_logging("INFO", log_format="json", queue_size=queue_size, info_sample_rate=sample_rate)
+    finally:
+        sys.stdout = stdout
+
+
+def measure(run_request, requests: int) -> list[float]:
+    logger = logging.getLogger("bench")
+    times = []
+    for i in range(requests):
+        set_request_id(f"req-{i}")
+        start = time.perf_counter()
+        run_request(logger, 0.123)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(requests: int, sink_latency_us: float, queue_size: int):
+    print(f"{requests} requests, 6 log calls each (5 at INFO), sink write latency {sink_latency_us:.0f} us")
+    print(f"{'pipeline':>30} {'avg(us)':>9} {'p99(us)':>9} {'written':>9} {'dropped':>8}")
+
+    scenarios = [
+        ("sync text, f-strings", lambda sink: configure_sync(sink), eager_request),
+        ("queued json, lazy", lambda sink: configure_queued(sink, 1.0, queue_size), lazy_request),
+        ("queued json, lazy, 10% sample", lambda sink: configure_queued(sink, 0.1, queue_size), lazy_request),
+    ]
+    for name, configure, run_request in scenarios:
+        sink = SlowSink(sink_latency_us / 1e6)
+        configure(sink)
+        times = measure(run_request, requests)
+        dropped = log_stats()["dropped"] if name.startswith("queued") else 0
+        flush_logging(timeout=60)
+        stop_logging()
+        times.sort()
+        print(
+            f"{name:>30} {statistics.mean(times) * 1e6:>9.1f} "
+            f"{times[int(len(times) * 0.99)] * 1e6:>9.1f} {sink.lines:>9} {dropped:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=50.0, help="Simulated cost of one stdout write")
+    parser.add_argument("--queue-size", type=int, default=10000, help="LOG_QUEUE_SIZE for the queued pipeline")
+    args = parser.parse_args()
+    main(args.requests, args.sink_latency_us, args.queue_size)
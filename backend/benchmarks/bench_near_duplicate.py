@@ -0,0 +1,99 @@
+"""
+Near-duplicate index benchmark.
+Fills a NearDuplicateIndex with synthetic Chinese sentences and measures lookup
+latency for near-duplicate and unseen texts, plus index memory per entry.
+
+Usage:
+    python benchmarks/bench_near_duplicate.py [--entries 1000000] [--lookups 20000]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from services.near_duplicate import NearDuplicateIndex
+
+PUNCTUATION = "，。！？、；：,.!? "
+
+
+def random_sentence(rng: random.Random) -> str:
+    """Synthetic sentence from a few thousand common CJK ideographs plus punctuation."""
+    chars = []
+    for _ in range(rng.randint(20, 60)):
+        chars.append(chr(0x4E00 + rng.randrange(3000)))
+        if rng.random() < 0.1:
+            chars.append(rng.choice(PUNCTUATION))
+    return "".join(chars)
+
+
+def near_duplicate(text: str, rng: random.Random) -> str:
+    """Same text with punctuation swapped and full-width/half-width changes."""
+    return "".join(rng.choice(PUNCTUATION) if c in PUNCTUATION else c for c in text) + "。"
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main(entries: int, lookups: int, threshold: float):
+    rng = random.Random(0)
+    index = NearDuplicateIndex(threshold=threshold, max_entries=entries)
+    texts = []
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    for i in range(entries):
+        text = random_sentence(rng)
+        if i % max(1, entries // lookups) == 0:
+            texts.append(text)
+        index.add(text, f"{i:064x}")
+    build_s = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    def measure(queries: list[str]) -> tuple[list[float], int]:
+        timings = []
+        found = 0
+        for query in queries:
+            start = time.perf_counter()
+            if index.lookup(query) is not None:
+                found += 1
+            timings.append(time.perf_counter() - start)
+        return sorted(timings), found
+
+    near, near_found = measure([near_duplicate(t, rng) for t in texts[:lookups]])
+    unseen, unseen_found = measure([random_sentence(rng) for _ in range(lookups)])
+
+    print(f"Entries: {len(index)}, build {build_s:.1f}s ({build_s / entries * 1e6:.1f} us/add)")
+    print(f"Index memory: ~{rss_after - rss_before:.0f} MB RSS (~{(rss_after - rss_before) * 1024 * 1024 / entries:.0f} B/entry)")
+    print(f"{'lookup':>16} {'found':>8} {'p50(us)':>10} {'p99(us)':>10} {'max(us)':>10}")
+    for name, timings, found in (
+        ("near-duplicate", near, near_found),
+        ("unseen", unseen, unseen_found),
+    ):
+        print(
+            f"{name:>16} {found:>8} {percentile(timings, 0.5) * 1e6:>10.1f} "
+            f"{percentile(timings, 0.99) * 1e6:>10.1f} {timings[-1] * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000, help="Indexed texts")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per query kind")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Similarity threshold")
+    args = parser.parse_args()
+    main(args.entries, args.lookups, args.threshold)
@@ -0,0 +1,93 @@
+"""
+Cold-start benchmark: import and startup time of a fresh worker process.
+Each sample runs in a new interpreter, timing `import config`, `import
+services.llm_client`, `import app`, and import plus application startup (SDK
+client construction) up to ready, and lists which provider SDKs were loaded.
+
+Usage:
+    python benchmarks/bench_startup.py [--provider mock] [--runs 5] [--budget-ms 2000]
+
+Exits with status 1 when the median time to ready exceeds --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+backend_path = Path(__file__).resolve().parent.parent
+
+# Run in a fresh interpreter; prints one JSON line with the elapsed milliseconds
+STAGES = {
+    "import config": "import config",
+    "import llm_client": "import services.llm_client",
+    "import app": "import app",
+    "ready": (
+        "import asyncio, app\n"
+        "async def ready():\n"
+        "    async with app.app.router.lifespan_context(app.app):\n"
+        "        pass\n"
+        "asyncio.run(ready())"
+    ),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = (time.perf_counter() - start) * 1000
+sdks = [m for m in ("openai", "anthropic") if m in sys.modules]
+print(json.dumps({{"ms": elapsed, "sdks": sdks}}))
+"""
+
+
+def run_stage(code: str, env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=code)],
+        cwd=backend_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(provider: str, runs: int, budget_ms: float) -> int:
+    env = dict(
+        os.environ,
+        LLM_PROVIDER=provider,
+        LLM_API_KEY=os.environ.get("LLM_API_KEY", "sk-benchmark"),
+        LOG_LEVEL="WARNING",
+        JOBS_ENABLED="false",
+        LOOP_LAG_INTERVAL="0",
+    )
+    print(f"Provider: {provider}, {runs} fresh interpreters per stage")
+    print(f"{'stage':>18} {'median(ms)':>11} {'min(ms)':>9}  SDKs loaded")
+
+    ready_ms = 0.0
+    for name, code in STAGES.items():
+        samples = [run_stage(code, env) for _ in range(runs)]
+        times = [sample["ms"] for sample in samples]
+        median = statistics.median(times)
+        sdks = ", ".join(samples[0]["sdks"]) or "-"
+        print(f"{name:>18} {median:>11.0f} {min(times):>9.0f}  {sdks}")
+        if name == "ready":
+            ready_ms = median
+
+    if budget_ms and ready_ms > budget_ms:
+        print(f"FAIL: time to ready {ready_ms:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+        return 1
+    print(f"OK: time to ready {ready_ms:.0f} ms within the {budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--provider", default="mock", help="LLM_PROVIDER for the measured process")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per stage")
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Max median time to ready (0 disables)")
+    args = parser.parse_args()
+    sys.exit(main(args.provider, args.runs, args.budget_ms))
@@ -0,0 +1,67 @@
+"""
+Time-to-first-byte benchmark: POST /api/translate vs. POST /api/translate/stream.
+Serves the app with uvicorn (the in-process ASGI transport buffers whole bodies)
+against a local fake upstream whose latency is spread over streamed chunks.
+
+Usage:
+    python benchmarks/bench_stream.py [--latency 1.0] [--requests 20]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+from benchmarks.fake_upstream import (
+    configure_env,
+    free_port,
+    serve_in_thread,
+    start_fake_upstream,
+)
+
+
+async def _ttfb(client, path: str, text: str) -> tuple[float, float]:
+    """Return (time to first body byte, total time) for one request."""
+    start = time.perf_counter()
+    first = None
+    async with client.stream(
+        "POST", path, json={"text": text}, headers={"Cache-Control": "no-store"}
+    ) as response:
+        async for _ in response.aiter_bytes():
+            if first is None:
+                first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+async def main(latency: float, total: int):
+    import httpx
+    from app import app
+
+    port = free_port()
+    serve_in_thread(app, port)
+
+    print(f"Fake upstream latency: {latency * 1000:.0f} ms, requests: {total}")
+    print(f"{'endpoint':>24} {'ttfb p50(ms)':>14} {'total p50(ms)':>14}")
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        for path in ["/api/translate", "/api/translate/stream"]:
+            samples = [await _ttfb(client, path, f"你好，世界。{i}") for i in range(total)]
+            ttfb = statistics.median(s[0] for s in samples) * 1000
+            elapsed = statistics.median(s[1] for s in samples) * 1000
+            print(f"{path:>24} {ttfb:>14.1f} {elapsed:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake upstream latency (s)")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    port = free_port()
+    configure_env(port)
+    start_fake_upstream(port, args.latency)
+    asyncio.run(main(args.latency, args.requests))
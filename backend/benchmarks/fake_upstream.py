@@ -0,0 +1,95 @@
+"""
+Fake OpenAI-compatible upstream for benchmarks.
+Serves /v1/chat/completions with a fixed latency from a background thread.
+With "stream": true the latency is spread over the streamed content chunks.
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+
+def free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_upstream(port: int, latency: float):
+    """Run a fake OpenAI chat completions server in a background thread."""
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    fake = FastAPI()
+
+    async def stream_chunks(model: str, content: str):
+        pieces = [content[i:i + 4] for i in range(0, len(content), 4)]
+        for piece in pieces:
+            await asyncio.sleep(latency / len(pieces))
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @fake.post("/v1/chat/completions")
+    async def completions(body: dict):
+        content = json.dumps(
+            {
+                "translation": "Hello, world. This is a fake translation from the benchmark upstream.",
+                "keywords": ["hello", "world", "greeting"],
+            }
+        )
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(body.get("model", "fake-model"), content),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70},
+        }
+
+    return serve_in_thread(fake, port)
+
+
+def serve_in_thread(app, port: int):
+    """Serve an ASGI app with uvicorn on 127.0.0.1 in a background thread."""
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def configure_env(port: int):
+    """Point the OpenAI provider at the fake upstream (call before importing the app)."""
+    os.environ["LLM_PROVIDER"] = "openai"
+    os.environ["LLM_API_KEY"] = "bench-key"
+    os.environ["LLM_MODEL"] = "fake-model"
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
@@ -0,0 +1,311 @@
+"""
+Load test for the translation API.
+Drives /api/translate, /api/translate/batch and /api/translate/stream at fixed
+concurrency (closed loop) or fixed arrival rate (open loop) and reports
+throughput, p50/p95/p99 latency, errors and server event loop lag.
+
+By default the app is served in-process with the mock LLM provider, so only the
+service itself is measured. Results are written as JSON for comparing commits.
+
+Usage:
+    python benchmarks/loadtest.py [--endpoints translate,batch,stream]
+        [--concurrency 1,8,32] [--rps 20,50] [--duration 10]
+        [--mock-latency-ms 200] [--mock-distribution lognormal]
+        [--url http://host:8000] [--output results.json] [--compare old.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+LAG_METRIC = "event_loop_lag_seconds"
+
+_counter = itertools.count()
+
+
+def configure_mock_env(args):
+    """Select the mock provider (call before importing the app)."""
+    os.environ["LLM_PROVIDER"] = "mock"
+    os.environ["LLM_MODEL"] = "mock-model"
+    os.environ["MOCK_LATENCY_MS"] = str(args.mock_latency_ms)
+    os.environ["MOCK_LATENCY_STDDEV_MS"] = str(args.mock_stddev_ms)
+    os.environ["MOCK_LATENCY_DISTRIBUTION"] = args.mock_distribution
+    os.environ["MOCK_ERROR_RATE"] = str(args.mock_error_rate)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, with a marker for local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=backend_path, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=backend_path, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def parse_histogram(text: str, name: str) -> tuple[list[tuple[float, float]], float, float]:
+    """Parse an unlabeled Prometheus histogram into (cumulative buckets, sum, count)."""
+    buckets: list[tuple[float, float]] = []
+    total = count = 0.0
+    for line in text.splitlines():
+        if line.startswith(f'{name}_bucket{{le="'):
+            bound = line.split('le="', 1)[1].split('"', 1)[0]
+            buckets.append((math.inf if bound == "+Inf" else float(bound), float(line.rsplit(" ", 1)[1])))
+        elif line.startswith(f"{name}_sum "):
+            total = float(line.rsplit(" ", 1)[1])
+        elif line.startswith(f"{name}_count "):
+            count = float(line.rsplit(" ", 1)[1])
+    return buckets, total, count
+
+
+def lag_delta(before: str, after: str) -> dict:
+    """Event loop lag observed between two /metrics scrapes (p99 is a bucket upper bound)."""
+    buckets_before, sum_before, count_before = parse_histogram(before, LAG_METRIC)
+    buckets_after, sum_after, count_after = parse_histogram(after, LAG_METRIC)
+    count = count_after - count_before
+    if count <= 0:
+        return {"samples": 0, "mean_ms": None, "p99_le_ms": None}
+    previous = dict(buckets_before)
+    p99 = math.inf
+    for bound, cumulative in buckets_after:
+        if cumulative - previous.get(bound, 0.0) >= 0.99 * count:
+            p99 = bound
+            break
+    return {
+        "samples": int(count),
+        "mean_ms": round((sum_after - sum_before) / count * 1000, 3),
+        "p99_le_ms": None if p99 == math.inf else round(p99 * 1000, 3),
+    }
+
+
+def make_request(endpoint: str, batch_size: int) -> tuple[str, dict]:
+    """Build a unique request so caching and coalescing stay out of the measurement."""
+    n = next(_counter)
+    if endpoint == "batch":
+        return "/api/translate/batch", {
+            "texts": [f"第{n}-{i}次：今天天气很好，我们去公园散步。" for i in range(batch_size)]
+        }
+    path = "/api/translate/stream" if endpoint == "stream" else "/api/translate"
+    return path, {"text": f"第{n}次：今天天气很好，我们去公园散步。"}
+
+
+async def send(client, endpoint: str, batch_size: int) -> tuple[bool, Optional[float]]:
+    """Send one request; return (ok, time to first byte for streams)."""
+    path, body = make_request(endpoint, batch_size)
+    headers = {"Cache-Control": "no-store"}
+    if endpoint != "stream":
+        response = await client.post(path, json=body, headers=headers)
+        return response.status_code == 200, None
+
+    start = time.perf_counter()
+    ttfb = None
+    ok = False
+    async with client.stream("POST", path, json=body, headers=headers) as response:
+        async for line in response.aiter_lines():
+            if ttfb is None and line.startswith("event: delta"):
+                ttfb = time.perf_counter() - start
+            if line.startswith("event: keywords"):
+                ok = response.status_code == 200
+            elif line.startswith("event: error"):
+                ok = False
+    return ok, ttfb
+
+
+async def run_level(client, endpoint: str, mode: str, level: float, duration: float, batch_size: int) -> dict:
+    """Run one endpoint at one concurrency (closed loop) or arrival rate (open loop)."""
+    latencies: list[float] = []
+    ttfbs: list[float] = []
+    errors = 0
+
+    async def one(scheduled: float):
+        nonlocal errors
+        try:
+            ok, ttfb = await send(client, endpoint, batch_size)
+        except Exception:
+            ok, ttfb = False, None
+        # Open loop measures from the scheduled arrival, so queueing is not hidden
+        latencies.append(time.perf_counter() - scheduled)
+        if ttfb is not None:
+            ttfbs.append(ttfb)
+        if not ok:
+            errors += 1
+
+    metrics_before = (await client.get("/metrics")).text
+    start = time.perf_counter()
+    deadline = start + duration
+
+    if mode == "concurrency":
+        async def worker():
+            while time.perf_counter() < deadline:
+                await one(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(int(level))))
+    else:
+        tasks = []
+        interval = 1 / level
+        scheduled = start
+        while scheduled < deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(scheduled)))
+            scheduled += interval
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - start
+    metrics_after = (await client.get("/metrics")).text
+
+    ordered = sorted(latencies)
+    ordered_ttfb = sorted(ttfbs)
+    result = {
+        "endpoint": endpoint,
+        "mode": mode,
+        "level": level,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(percentile(ordered, 0.99) * 1000, 2),
+        },
+        "event_loop_lag": lag_delta(metrics_before, metrics_after),
+    }
+    if endpoint == "stream":
+        result["ttfb_ms"] = {
+            "p50": round(percentile(ordered_ttfb, 0.50) * 1000, 2),
+            "p95": round(percentile(ordered_ttfb, 0.95) * 1000, 2),
+            "p99": round(percentile(ordered_ttfb, 0.99) * 1000, 2),
+        }
+    return result
+
+
+def print_results(results: list[dict]):
+    print(
+        f"{'endpoint':>10} {'mode':>12} {'level':>7} {'reqs':>7} {'err':>5} {'req/s':>9} "
+        f"{'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'lag p99':>9}"
+    )
+    for r in results:
+        lag = r["event_loop_lag"]["p99_le_ms"]
+        print(
+            f"{r['endpoint']:>10} {r['mode']:>12} {r['level']:>7g} {r['requests']:>7} {r['errors']:>5} "
+            f"{r['throughput_rps']:>9} {r['latency_ms']['p50']:>9} {r['latency_ms']['p95']:>9} "
+            f"{r['latency_ms']['p99']:>9} {'-' if lag is None else f'<={lag:g}':>9}"
+        )
+
+
+def compare(results: list[dict], baseline_path: str):
+    """Print throughput and p99 changes against a previous results file."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    old = {(r["endpoint"], r["mode"], r["level"]): r for r in baseline["results"]}
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    print(f"{'endpoint':>10} {'mode':>12} {'level':>7} {'req/s':>10} {'p99':>10}")
+    for r in results:
+        previous = old.get((r["endpoint"], r["mode"], r["level"]))
+        if previous is None:
+            continue
+
+        def change(new: float, before: float) -> str:
+            return f"{(new - before) / before * 100:+.1f}%" if before else "n/a"
+
+        print(
+            f"{r['endpoint']:>10} {r['mode']:>12} {r['level']:>7g} "
+            f"{change(r['throughput_rps'], previous['throughput_rps']):>10} "
+            f"{change(r['latency_ms']['p99'], previous['latency_ms']['p99']):>10}"
+        )
+
+
+async def main(args, base_url: str):
+    import httpx
+
+    endpoints = args.endpoints.split(",")
+    plan = [("concurrency", float(x)) for x in args.concurrency.split(",") if x]
+    plan += [("rps", float(x)) for x in args.rps.split(",") if x]
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        results = []
+        for endpoint in endpoints:
+            for mode, level in plan:
+                results.append(
+                    await run_level(client, endpoint, mode, level, args.duration, args.batch_size)
+                )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoints", default="translate,batch,stream", help="Comma-separated: translate,batch,stream")
+    parser.add_argument("--concurrency", default="1,8,32", help="Closed-loop concurrency levels")
+    parser.add_argument("--rps", default="", help="Open-loop arrival rates (requests/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--batch-size", type=int, default=10, help="Texts per batch request")
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mock-stddev-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--mock-distribution", default="lognormal",
+        choices=["fixed", "uniform", "normal", "lognormal", "exponential"],
+    )
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--url", default="", help="Target a running server instead of an in-process mock")
+    parser.add_argument("--output", default="", help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", default="", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        configure_mock_env(args)
+        from app import app
+        from benchmarks.fake_upstream import free_port, serve_in_thread
+
+        port = free_port()
+        serve_in_thread(app, port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    results = asyncio.run(main(args, base_url))
+    print_results(results)
+
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "target": args.url or "in-process mock",
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"loadtest-{commit}-{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -39,6 +39,9 @@ try:
     else:
         print(f"LLM Base URL:  [Using default]")
 
+    for backend in settings.llm_backends:
+        print(f"Backend:       {backend.name} ({backend.provider}, {backend.model}, weight {backend.weight})")
+
     print()
     print(f"Max Text Len:  {settings.max_text_length}")
     print(f"CORS Origins:  {settings.cors_origins}")
@@ -51,12 +54,14 @@ try:
 
     issues = []
 
-    if not settings.llm_api_key or settings.llm_api_key.strip() == "":
+    if settings.llm_provider == "mock":
+        print("✓ Mock provider needs no API key")
+    elif not settings.llm_api_key or settings.llm_api_key.strip() == "":
         issues.append("❌ LLM_API_KEY is empty or not set!")
     else:
         print("✓ API key is configured")
 
-    if settings.llm_provider not in ["openai", "claude", "deepseek", "qwen"]:
+    if settings.llm_provider not in ["openai", "claude", "deepseek", "qwen", "mock"]:
         issues.append(f"❌ Invalid LLM provider: {settings.llm_provider}")
     else:
         print(f"✓ Valid LLM provider: {settings.llm_provider}")
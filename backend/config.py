@@ -3,31 +3,189 @@ Configuration management for AI Translation Assistant.
 Loads settings from environment variables with sensible defaults.
 """
 from pydantic_settings import BaseSettings
-from pydantic import field_validator, ValidationInfo
-from typing import Literal
+from pydantic import BaseModel, field_validator, ValidationInfo
+from typing import Literal, Optional
+
+ProviderName = Literal["openai", "claude", "deepseek", "qwen", "mock"]
+
+
+class BackendConfig(BaseModel):
+    """An additional LLM backend for the multi-provider router."""
+
+    name: str
+    provider: ProviderName
+    api_key: str
+    model: str
+    base_url: str = ""
+    timeout: int = 30
+    weight: float = 1.0  # Relative share of traffic
+
+    @field_validator("weight")
+    @classmethod
+    def validate_weight(cls, v: float) -> float:
+        """A backend with no weight would never be selected first."""
+        if not v > 0:
+            raise ValueError("Backend weight must be greater than 0")
+        return v
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     # LLM Provider Configuration
-    llm_provider: Literal["openai", "claude", "deepseek", "qwen"] = "openai"
+    llm_provider: ProviderName = "openai"
     llm_api_key: str = ""
     llm_model: str = "gpt-3.5-turbo"
     llm_timeout: int = 30
     llm_base_url: str = ""  # Optional custom base URL for compatible providers
+    llm_weight: float = 1.0  # Traffic weight of the primary backend above
+    prompt_cache_enabled: bool = True  # Mark the static prompt prefix cacheable (Anthropic cache_control)
+
+    # Multi-backend routing (JSON list of BackendConfig, used alongside the primary backend)
+    llm_backends: list[BackendConfig] = []
+    router_max_attempts: int = 3  # Backends tried per request (failover)
+    router_failure_threshold: int = 3  # Consecutive failures before a backend cools down
+    router_cooldown_seconds: float = 30.0
+
+    # Request hedging (second attempt when the first is slower than the percentile delay)
+    hedge_enabled: bool = False
+    hedge_percentile: float = 0.95  # Hedge delay = this percentile of recent LLM latencies
+    hedge_min_delay: float = 0.5  # Seconds; lower bound and value until enough samples
+    hedge_max_extra_ratio: float = 0.1  # Max hedges as a fraction of requests
+
+    # Adaptive upstream concurrency limit (AIMD) with a bounded wait queue
+    limiter_enabled: bool = True
+    limiter_initial_limit: int = 20
+    limiter_min_limit: int = 1
+    limiter_max_limit: int = 200
+    limiter_backoff_ratio: float = 0.9  # Limit multiplier on 429s, timeouts and slow calls
+    limiter_latency_tolerance: float = 3.0  # Slow call = this x baseline latency (0 disables)
+    limiter_max_queue: int = 100  # Calls waiting for a slot before rejecting with 503
+    limiter_queue_timeout: float = 5.0  # Max seconds a call waits for a slot
+    limiter_background_share: float = 0.5  # Fraction of the limit background jobs may hold
+
+    # Retry policy (attempts per error class include the first call)
+    retry_transport_attempts: int = 3  # Timeouts, connection errors and 5xx
+    retry_rate_limit_attempts: int = 4  # 429s; waits at least the Retry-After hint
+    retry_malformed_attempts: int = 2  # Unparseable responses, retried with a repair prompt
+    retry_base_delay: float = 0.5  # Seconds; backoff doubles per retry, with full jitter
+    retry_max_delay: float = 8.0  # Cap on a single backoff delay
+    retry_deadline_seconds: float = 60.0  # Overall time budget per request, including retries
+
+    # Upstream HTTP connection pool (shared by all providers)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 30.0
 
     # API Configuration
     max_text_length: int = 4000
     cors_origins: list[str] = ["*"]
+    admin_token: str = ""  # Bearer token for /api/admin/*; empty disables the admin endpoints
+
+    # Batch Translation
+    batch_max_items: int = 500  # Max texts per batch request
+    batch_group_max_items: int = 20  # Max texts packed into one LLM prompt
+    batch_token_budget: int = 800  # Estimated input tokens per packed prompt
+    batch_max_output_tokens: int = 4096
+    batch_concurrency: int = 4  # Packed prompts sent concurrently
+
+    # Long-document Translation
+    max_document_length: int = 200000  # Texts above max_text_length are chunked up to this size
+    document_chunk_tokens: int = 600  # Estimated input tokens per chunk
+    document_overlap_sentences: int = 1  # Preceding sentences sent as context (0 disables)
+    document_concurrency: int = 8  # Chunks translated in parallel
+
+    # Usage accounting and per-client budgets (0 = unlimited)
+    budget_requests_per_minute: int = 0  # Upstream LLM calls per client per minute
+    budget_tokens_per_minute: int = 0  # Prompt + completion tokens per client per minute
+    usage_window_minutes: int = 60  # Per-minute usage history kept for the admin endpoint
+
+    # Mock provider (LLM_PROVIDER=mock, for load testing without a paid API)
+    mock_latency_ms: float = 200.0
+    mock_latency_stddev_ms: float = 50.0
+    mock_latency_distribution: Literal["fixed", "uniform", "normal", "lognormal", "exponential"] = "lognormal"
+    mock_error_rate: float = 0.0  # Fraction of calls failing with a 503
+    mock_completion_tokens: int = 40
+    mock_seed: int = 0
+
+    # Near-duplicate cache (serves results for texts differing only slightly)
+    near_dup_enabled: bool = False  # Opt-in: a similar text is not always the same sentence
+    near_dup_threshold: float = 0.9  # Minimum estimated n-gram Jaccard similarity
+    near_dup_max_entries: int = 100000
+    near_dup_ngram: int = 3
+    near_dup_num_perm: int = 64
+    near_dup_bands: int = 8
+    near_dup_variant_map: str = ""  # Optional traditional->simplified table (OpenCC format)
+
+    # Translation memory (sentence-level reuse across requests)
+    tm_enabled: bool = True
+    tm_path: str = "tm.sqlite"  # SQLite file; empty keeps the memory in-process only
+    tm_source_lang: str = "zh-CN"
+    tm_target_lang: str = "en-US"
+
+    # Glossary (fixed term translations from a user-provided term file)
+    glossary_path: str = ""  # "source<TAB>target[<TAB>keywords]" lines; empty disables
+    glossary_index_path: str = ""  # Compiled index; defaults to <glossary_path>.idx
+    glossary_max_exact_chars: int = 32  # Inputs up to this length are answered by exact match
+    glossary_max_prompt_terms: int = 20  # Matched terms added to a prompt as required translations
+    glossary_min_term_chars: int = 2  # Shorter terms are not matched inside longer texts
+
+    # Keywords (from the LLM, or extracted locally so the LLM only translates)
+    keywords_source: Literal["llm", "local"] = "llm"  # Default for requests that do not choose
+    keywords_method: Literal["tfidf", "textrank"] = "tfidf"  # Local ranking
+    keywords_idf_path: str = ""  # "word idf" lines (jieba idf.txt format); required for local keywords
+    keywords_fallback: bool = True  # Complete invalid LLM keyword lists locally instead of retrying (needs the IDF table)
+
+    # Model cascade (easy inputs go to a fast model, hard ones and failed answers to LLM_MODEL)
+    cascade_enabled: bool = False
+    cascade_fast_model: str = ""  # Fast tier model; the cascade stays off while empty
+    cascade_fast_provider: Optional[ProviderName] = None  # Defaults to llm_provider
+    cascade_fast_api_key: str = ""  # Defaults to llm_api_key
+    cascade_fast_base_url: str = ""  # Defaults to llm_base_url when the provider is the same
+    cascade_max_chars: int = 40  # Longer texts (glossary terms not counted) use the strong model
+    cascade_max_latin_ratio: float = 0.3  # Texts with a larger share of Latin letters/digits use the strong model
+    cascade_escalation_memory: int = 10000  # Escalated texts remembered and sent straight to the strong model
+
+    # Asynchronous jobs (persistent queue for bulk workloads)
+    jobs_enabled: bool = True
+    jobs_path: str = "jobs.sqlite"  # SQLite queue file; jobs resume from it after a restart
+    jobs_workers: int = 2  # Jobs processed concurrently per process
+    jobs_chunk_size: int = 20  # Texts translated (and checkpointed) per step
+    jobs_max_items: int = 10000  # Max texts per job
+    jobs_lease_seconds: float = 60.0  # A running job whose worker stops renewing is picked up again
+    jobs_retention_hours: float = 24.0  # Finished jobs are purged after this long
+
+    # Multi-worker serving (serve.py sets SHARED_STATE_DIR to a temp dir if unset)
+    shared_state_dir: str = ""  # Shared cache/TM/budget files and metric snapshots
+    metrics_flush_interval: float = 1.0  # Seconds between per-worker metric snapshots
+
+    # Event loop lag sampling interval in seconds (0 disables)
+    loop_lag_interval: float = 0.1
+
+    # Translation Cache
+    cache_enabled: bool = True
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: int = 86400
+    cache_persistent_path: str = ""  # SQLite file path; empty disables the persistent tier
+
+    # Tracing (OpenTelemetry-compatible spans exported as OTLP/JSON)
+    tracing_sample_rate: float = 0.0  # Fraction of requests traced (0 disables)
+    tracing_exporter: Literal["file", "otlp"] = "file"
+    tracing_file: str = "traces.jsonl"  # One OTLP/JSON export request per line
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP collector
 
     # Logging
     log_level: str = "INFO"
+    log_format: Literal["json", "text"] = "json"  # JSON lines carry request_id and extra fields
+    log_queue_size: int = 10000  # Records buffered for the writer thread; overflow is dropped
+    log_info_sample_rate: float = 1.0  # Fraction of requests whose INFO lines are kept
 
     @field_validator("llm_api_key")
     @classmethod
     def validate_api_key(cls, v: str, info: ValidationInfo) -> str:
-        """Validate that API key is not empty."""
+        """Validate that API key is not empty (the mock provider needs none)."""
+        if info.data.get("llm_provider") == "mock":
+            return v.strip()
         if not v or v.strip() == "":
             raise ValueError(
                 "LLM_API_KEY is required! Please set it in your .env file.\n"
@@ -35,6 +193,30 @@ class Settings(BaseSettings):
             )
         return v.strip()
 
+    @field_validator("llm_weight")
+    @classmethod
+    def validate_llm_weight(cls, v: float) -> float:
+        """The primary backend's weight must be positive, like every backend's."""
+        if not v > 0:
+            raise ValueError("LLM_WEIGHT must be greater than 0")
+        return v
+
+    @field_validator("router_max_attempts")
+    @classmethod
+    def validate_router_max_attempts(cls, v: int) -> int:
+        """Every request needs at least one attempt."""
+        if v < 1:
+            raise ValueError("ROUTER_MAX_ATTEMPTS must be at least 1")
+        return v
+
+    @field_validator("keywords_idf_path")
+    @classmethod
+    def validate_keywords_idf_path(cls, v: str, info: ValidationInfo) -> str:
+        """Local keywords need a vocabulary to segment Chinese text into words."""
+        if info.data.get("keywords_source") == "local" and not v.strip():
+            raise ValueError("KEYWORDS_SOURCE=local requires KEYWORDS_IDF_PATH")
+        return v.strip()
+
     @field_validator("llm_base_url")
     @classmethod
     def validate_base_url(cls, v: str) -> str:
@@ -1,13 +1,18 @@
 """
 Pydantic models for request/response validation and serialization.
 """
-from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class TranslateRequest(BaseModel):
     """Request model for translation endpoint."""
 
     text: str = Field(..., min_length=1, description="Chinese text to translate")
+    keyword_source: Optional[Literal["llm", "local"]] = Field(
+        None, description="Keywords from the LLM or extracted locally (the LLM only translates); default KEYWORDS_SOURCE"
+    )
 
     @field_validator("text")
     @classmethod
@@ -19,12 +24,23 @@ class TranslateRequest(BaseModel):
         return v
 
 
+class SegmentReuse(BaseModel):
+    """Translation memory reuse for one request."""
+
+    reused: int = Field(..., description="Sentences served from the translation memory")
+    total: int = Field(..., description="Sentences in the input")
+    reuse_ratio: float = Field(..., description="reused / total")
+
+
 class TranslateResponse(BaseModel):
     """Response model for successful translation."""
 
     translation: str = Field(..., description="English translation")
     keywords: list[str] = Field(
-        ..., min_length=3, max_length=5, description="3-5 extracted keywords"
+        ..., min_length=1, max_length=5, description="3-5 extracted keywords (glossary terms may have fewer)"
+    )
+    reuse: Optional[SegmentReuse] = Field(
+        None, description="Translation memory reuse (absent when served from cache)"
     )
 
 
@@ -35,6 +51,100 @@ class ErrorDetail(BaseModel):
     message: str = Field(..., description="Human-readable error message")
 
 
+class BatchTranslateRequest(BaseModel):
+    """Request model for batch translation endpoint."""
+
+    texts: list[str] = Field(..., min_length=1, description="Chinese texts to translate")
+    keyword_source: Optional[Literal["llm", "local"]] = Field(
+        None, description="Keywords from the LLM or extracted locally (the LLM only translates); default KEYWORDS_SOURCE"
+    )
+
+    @field_validator("texts")
+    @classmethod
+    def validate_texts(cls, v: list[str]) -> list[str]:
+        """Validate and clean each text input."""
+        cleaned = [text.strip() for text in v]
+        if any(not text for text in cleaned):
+            raise ValueError("Texts cannot be empty or whitespace only")
+        return cleaned
+
+
+class BatchTranslateItem(BaseModel):
+    """Per-item result of a batch translation."""
+
+    index: int = Field(..., description="Position of the text in the request")
+    translation: Optional[str] = Field(None, description="English translation")
+    keywords: Optional[list[str]] = Field(None, description="3-5 extracted keywords")
+    error: Optional[ErrorDetail] = Field(None, description="Error if this item failed")
+
+
+class BatchTranslateResponse(BaseModel):
+    """Response model for batch translation, in input order."""
+
+    results: list[BatchTranslateItem]
+
+
+class JobCreateRequest(BaseModel):
+    """Request model for submitting an asynchronous translation job."""
+
+    text: Optional[str] = Field(None, description="Chinese text to translate")
+    texts: Optional[list[str]] = Field(None, min_length=1, description="Chinese texts to translate")
+    priority: int = Field(0, ge=0, le=9, description="Higher priority jobs run first")
+
+    @field_validator("text")
+    @classmethod
+    def validate_text(cls, v: Optional[str]) -> Optional[str]:
+        """Validate and clean text input."""
+        if v is None:
+            return v
+        v = v.strip()
+        if not v:
+            raise ValueError("Text cannot be empty or whitespace only")
+        return v
+
+    @field_validator("texts")
+    @classmethod
+    def validate_texts(cls, v: Optional[list[str]]) -> Optional[list[str]]:
+        """Validate and clean each text input."""
+        if v is None:
+            return v
+        cleaned = [text.strip() for text in v]
+        if any(not text for text in cleaned):
+            raise ValueError("Texts cannot be empty or whitespace only")
+        return cleaned
+
+    @model_validator(mode="after")
+    def validate_input(self) -> "JobCreateRequest":
+        """Require exactly one of text and texts."""
+        if (self.text is None) == (self.texts is None):
+            raise ValueError("Provide exactly one of text or texts")
+        return self
+
+
+class JobStatus(BaseModel):
+    """Status and progress of an asynchronous translation job."""
+
+    id: str = Field(..., description="Job ID")
+    kind: str = Field(..., description="text or batch")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    priority: int
+    total: int = Field(..., description="Texts in the job")
+    completed: int = Field(..., description="Texts translated")
+    failed: int = Field(..., description="Texts that failed to translate")
+    progress: float = Field(..., description="(completed + failed) / total")
+    error: Optional[str] = Field(None, description="Reason the job failed")
+    created_at: float = Field(..., description="Unix timestamp")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobResultsResponse(BaseModel):
+    """Results of a job so far, in input order (pending texts have neither translation nor error)."""
+
+    job: JobStatus
+    results: list[BatchTranslateItem]
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
 
@@ -0,0 +1,158 @@
+"""
+Production server: several pre-forked uvicorn worker processes on one listening socket.
+The application is imported once in the supervisor before forking, so workers start
+fast and share preloaded code; SIGTERM/SIGINT drain workers gracefully and crashed
+workers are replaced.
+
+Usage:
+    python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000] [--graceful-timeout 30]
+"""
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+RESTART_DELAY = 1.0  # Seconds before replacing a worker that exited unexpectedly
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        help="Worker processes (default: WEB_CONCURRENCY or the CPU count)",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--backlog", type=int, default=2048, help="Listen backlog")
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds workers get to finish in-flight requests on shutdown",
+    )
+    return parser.parse_args()
+
+
+def prepare_shared_state(workers: int) -> tuple[str, bool]:
+    """Point SHARED_STATE_DIR at a directory for state shared by workers; clear old metric snapshots."""
+    directory = os.environ.get("SHARED_STATE_DIR", "")
+    created = False
+    if not directory and workers > 1:
+        directory = tempfile.mkdtemp(prefix="translate-shared-")
+        os.environ["SHARED_STATE_DIR"] = directory
+        created = True
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        shutil.rmtree(os.path.join(directory, "metrics"), ignore_errors=True)
+    return directory, created
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    args = parse_args()
+    shared_dir, created = prepare_shared_state(args.workers)
+
+    # Preload: import the application (settings, SDKs, singletons) before forking
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import uvicorn
+    from app import app
+    from config import settings
+    from services.llm_client import llm_client
+    from utils.logging import get_logger
+
+    logger = get_logger("serve")
+    # Provider SDKs load lazily; import the configured ones once here instead of in every worker
+    preloaded = llm_client.preload()
+    if preloaded:
+        logger.info(f"Preloaded SDKs: {', '.join(preloaded)}")
+    config = uvicorn.Config(
+        app,
+        log_level=settings.log_level.lower(),
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = bind_socket(args.host, args.port, args.backlog)
+    workers: dict[int, float] = {}  # pid -> start time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Worker: uvicorn installs its own SIGINT/SIGTERM handlers for a graceful drain
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        workers[pid] = time.monotonic()
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        logger.info(f"Received signal {signum}, draining {len(workers)} workers")
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info(
+        f"Starting {args.workers} workers on {args.host}:{args.port}"
+        + (f", shared state in {shared_dir}" if shared_dir else "")
+    )
+    for _ in range(args.workers):
+        spawn()
+
+    deadline = None
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            if stopping:
+                deadline = deadline or time.monotonic() + args.graceful_timeout + 5
+                if time.monotonic() > deadline:
+                    logger.warning(f"Killing {len(workers)} workers after the graceful timeout")
+                    for pid in workers:
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+            time.sleep(0.2)
+            continue
+        workers.pop(pid, None)
+        if not stopping:
+            logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            time.sleep(RESTART_DELAY)
+            if not stopping:
+                spawn()
+
+    sock.close()
+    if created:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    main()
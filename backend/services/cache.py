@@ -0,0 +1,214 @@
+"""
+Content-addressed translation result cache.
+In-process LRU tier with size/TTL eviction, plus an optional SQLite tier that survives restarts.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from config import settings
+from services.shared_state import shared_path
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CachedResult = Tuple[str, list[str]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize input text so trivially different submissions share a cache key."""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def make_cache_key(text: str, provider: str, model: str, prompt_version: str) -> str:
+    """Build a content-addressed key from normalized text and the LLM/prompt identity."""
+    payload = "\x00".join([provider, model, prompt_version, normalize_text(text)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU cache with max-entries and TTL eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, CachedResult]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return cached value and mark it most recently used, or None if missing/expired."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if self.ttl_seconds > 0 and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: CachedResult):
+        """Store value, evicting least recently used entries beyond max_entries."""
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent cache tier backed by a local SQLite file."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connect()
+        # Connections must not be shared across fork(); workers open their own
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translation_cache ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+            "keywords TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return cached value or None if missing/expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation, keywords, created_at FROM translation_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        translation, keywords, created_at = row
+        if self.ttl_seconds > 0 and time.time() - created_at >= self.ttl_seconds:
+            return None
+        return translation, json.loads(keywords)
+
+    def set(self, key: str, value: CachedResult):
+        """Insert or replace a cached value."""
+        translation, keywords = value
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translation_cache VALUES (?, ?, ?, ?)",
+                (key, translation, json.dumps(keywords, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM translation_cache")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationCache:
+    """Two-tier translation cache with hit/miss counters."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        persistent_path: str = "",
+    ):
+        self.enabled = enabled
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self.persistent: Optional[SQLiteCache] = None
+        if enabled and persistent_path:
+            self.persistent = SQLiteCache(persistent_path, ttl_seconds)
+            logger.info(f"Persistent translation cache: {persistent_path}")
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str, record_stats: bool = True) -> Optional[CachedResult]:
+        """Look up a key in the memory tier, then the persistent tier."""
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            if record_stats:
+                self.memory_hits += 1
+            return value
+
+        if self.persistent is not None:
+            value = await asyncio.to_thread(self.persistent.get, key)
+            if value is not None:
+                if record_stats:
+                    self.persistent_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        if record_stats:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, value: CachedResult):
+        """Store a result in all enabled tiers."""
+        if not self.enabled:
+            return
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            await asyncio.to_thread(self.persistent.set, key, value)
+
+    async def clear(self):
+        """Clear all tiers and reset counters."""
+        self.memory.clear()
+        if self.persistent is not None:
+            await asyncio.to_thread(self.persistent.clear)
+        self.memory_hits = self.persistent_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and tier sizes."""
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "persistent": self.persistent is not None,
+        }
+
+
+# Global translation cache instance
+translation_cache = TranslationCache(
+    enabled=settings.cache_enabled,
+    max_entries=settings.cache_max_entries,
+    ttl_seconds=settings.cache_ttl_seconds,
+    # Workers share the persistent tier so one worker's results are hits for all
+    persistent_path=settings.cache_persistent_path or shared_path("cache.sqlite"),
+)
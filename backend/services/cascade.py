@@ -0,0 +1,124 @@
+"""
+Model cascade: routes easy inputs to a fast, cheap model and hard ones to the strong model.
+Texts are classified by length (glossary terms, whose translations are fixed, not
+counted), character mix and earlier escalations; see Translator for escalation.
+"""
+import re
+from collections import OrderedDict
+
+from config import settings
+from services.glossary import glossary
+from utils import metrics
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_LATIN_RE = re.compile(r"[A-Za-z0-9]")
+
+
+class ModelCascade:
+    """
+    Decides which model tier ("fast" or "strong") answers a text.
+
+    A text goes to the fast tier when it is at most max_chars long once glossary
+    terms are discounted, at most max_latin_ratio of it is Latin letters or
+    digits (code, identifiers, units and formulas are where small models slip),
+    and no earlier fast answer for it failed validation. Decisions for texts
+    answered without an LLM call (glossary or cache hits) are recorded too, so
+    the exported counts cover all traffic.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_chars: int = 40,
+        max_latin_ratio: float = 0.3,
+        escalation_memory: int = 10000,
+    ):
+        self.enabled = enabled
+        self.max_chars = max_chars
+        self.max_latin_ratio = max_latin_ratio
+        self.escalation_memory = escalation_memory
+        self._escalated: OrderedDict[str, None] = OrderedDict()
+        self.decisions: dict[tuple[str, str], int] = {}
+        self.escalations = 0
+
+    def classify(self, text: str) -> tuple[str, str]:
+        """Return (tier, reason) for one text without recording it."""
+        text = text.strip()
+        if text in self._escalated:
+            return "strong", "escalated"
+
+        length = len(text)
+        if length > self.max_chars and glossary.enabled and length <= 3 * self.max_chars:
+            # Fixed term translations leave less for the model to get wrong
+            length -= sum(len(entry.source) for entry in glossary.find_terms(text, record_stats=False))
+            if length <= self.max_chars:
+                return "fast", "glossary"
+        if length > self.max_chars:
+            return "strong", "length"
+
+        compact = "".join(text.split())
+        if compact and len(_LATIN_RE.findall(compact)) / len(compact) > self.max_latin_ratio:
+            return "strong", "mixed_script"
+        return "fast", "simple"
+
+    def route(self, texts: list[str]) -> str:
+        """
+        Choose the tier of one LLM call translating texts, and record the decision.
+
+        A packed call goes to the fast tier only if every text would; the reason
+        recorded is that of the first text needing the strong model.
+        """
+        if not self.enabled:
+            return "strong"
+        tier, reason = "fast", "simple"
+        for text in texts:
+            tier, reason = self.classify(text)
+            if tier == "strong":
+                break
+        self.record(tier, reason)
+        return tier
+
+    def record(self, tier: str, reason: str):
+        """Count one routing decision (tier "none" for inputs answered without an LLM call)."""
+        if not self.enabled:
+            return
+        self.decisions[(tier, reason)] = self.decisions.get((tier, reason), 0) + 1
+        metrics.route_decisions.inc(tier=tier, reason=reason)
+
+    def escalate(self, texts: list[str], operation: str):
+        """Remember texts whose fast-tier answer failed validation; they go to the strong model from now on."""
+        self.escalations += 1
+        metrics.cascade_escalations.inc(operation=operation)
+        for text in texts:
+            self._escalated[text.strip()] = None
+            self._escalated.move_to_end(text.strip())
+        while len(self._escalated) > self.escalation_memory:
+            self._escalated.popitem(last=False)
+        logger.info("Escalated %d text(s) to the strong model after an invalid %s answer", len(texts), operation)
+
+    def stats(self) -> dict:
+        """Return thresholds, decision counts and escalations."""
+        return {
+            "enabled": self.enabled,
+            "fast_model": settings.cascade_fast_model,
+            "strong_model": settings.llm_model,
+            "max_chars": self.max_chars,
+            "max_latin_ratio": self.max_latin_ratio,
+            "decisions": [
+                {"tier": tier, "reason": reason, "count": count}
+                for (tier, reason), count in sorted(self.decisions.items())
+            ],
+            "escalations": self.escalations,
+            "escalated_texts": len(self._escalated),
+        }
+
+
+# Global model cascade instance (off unless CASCADE_ENABLED and CASCADE_FAST_MODEL are set)
+model_cascade = ModelCascade(
+    enabled=settings.cascade_enabled and bool(settings.cascade_fast_model),
+    max_chars=settings.cascade_max_chars,
+    max_latin_ratio=settings.cascade_max_latin_ratio,
+    escalation_memory=settings.cascade_escalation_memory,
+)
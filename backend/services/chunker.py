@@ -0,0 +1,140 @@
+"""
+Document chunking for long-text translation.
+Splits Chinese text on sentence/paragraph boundaries into token-budgeted chunks.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uff00-\uffef]")
+
+# A sentence ends with Chinese/ASCII terminal punctuation (plus closing quotes) or a newline
+_SENTENCE_RE = re.compile(r"[^。！？!?\n]*(?:[。！？!?]+[”’」』）)]*|\n+|$)")
+
+
+@dataclass
+class Chunk:
+    """A contiguous piece of the document to translate in one LLM call."""
+
+    text: str
+    separator: str = " "  # Joins this chunk's translation to the next one
+    context: Optional[str] = None  # Preceding source text, for reference only
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate token count: ~1 token per CJK character, ~4 chars per token otherwise."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _separator(whitespace: str) -> str:
+    """Map source whitespace between chunks to the separator used in the translation."""
+    if "\n" not in whitespace:
+        return " "
+    return "\n\n" if whitespace.count("\n") > 1 else "\n"
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences, keeping terminal punctuation and newline runs."""
+    return [s for s in _SENTENCE_RE.findall(text) if s]
+
+
+def split_segments(text: str) -> list[tuple[str, str]]:
+    """
+    Split text into (sentence, separator) pairs for segment-level translation.
+
+    Sentences are stripped; the separator joins the sentence's translation to
+    the next one and reflects the source line breaks.
+    """
+    segments: list[list[str]] = []
+    for piece in split_sentences(text):
+        sentence = piece.strip()
+        if not sentence:
+            if segments:
+                segments[-1][1] += piece
+            continue
+        segments.append([sentence, piece[len(piece.rstrip()):]])
+    return [(sentence, _separator(whitespace)) for sentence, whitespace in segments]
+
+
+def _split_oversized(sentence: str, token_budget: int) -> list[str]:
+    """Hard-split a single sentence that alone exceeds the token budget."""
+    pieces, start, tokens = [], 0, 0.0
+    for i, char in enumerate(sentence):
+        cost = 1.0 if _CJK_RE.match(char) else 0.25
+        if i > start and tokens + cost > token_budget:
+            pieces.append(sentence[start:i])
+            start, tokens = i, 0.0
+        tokens += cost
+    pieces.append(sentence[start:])
+    return pieces
+
+
+def chunk_text(text: str, token_budget: int, overlap_sentences: int = 0) -> list[Chunk]:
+    """
+    Pack sentences into chunks of at most token_budget estimated tokens.
+
+    Paragraph breaks are preserved through each chunk's separator. With
+    overlap_sentences > 0, each chunk carries the last sentences of the
+    previous chunk as context for more consistent terminology.
+    """
+    sentences: list[str] = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > token_budget:
+            sentences.extend(_split_oversized(sentence, token_budget))
+        else:
+            sentences.append(sentence)
+
+    groups: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+
+    chunks: list[Chunk] = []
+    previous: list[str] = []
+    for group in groups:
+        raw = "".join(group)
+        body = raw.strip()
+        leading = raw[: len(raw) - len(raw.lstrip())]
+        trailing = raw[len(raw.rstrip()):]
+        if chunks and "\n" in leading:
+            chunks[-1].separator = _separator(leading)
+        if not body:
+            continue
+
+        context = None
+        if overlap_sentences > 0 and previous:
+            context = "".join(previous[-overlap_sentences:]).strip() or None
+        chunks.append(Chunk(text=body, separator=_separator(trailing), context=context))
+        previous = [s for s in group if s.strip()]
+
+    return chunks
+
+
+def merge_keywords(keyword_lists: list[list[str]], limit: int = 5) -> list[str]:
+    """
+    Merge per-chunk keyword lists into one ranked list.
+
+    Keywords are ranked by how many chunks produced them (case-insensitive),
+    then by their earliest position in the document.
+    """
+    scores: dict[str, list] = {}
+    for chunk_index, keywords in enumerate(keyword_lists):
+        for rank, keyword in enumerate(keywords):
+            key = keyword.strip().lower()
+            if not key:
+                continue
+            if key not in scores:
+                scores[key] = [0, (chunk_index, rank), keyword.strip()]
+            scores[key][0] += 1
+
+    ranked = sorted(scores.values(), key=lambda item: (-item[0], item[1]))
+    return [item[2] for item in ranked[:limit]]
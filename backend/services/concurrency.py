@@ -0,0 +1,257 @@
+"""
+Adaptive concurrency limiting for upstream LLM calls.
+AIMD limit driven by 429s, timeouts and latency, with a bounded FIFO wait queue
+that rejects quickly instead of letting requests pile up, and a capped share of
+the limit for background work.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Priority of upstream calls made in the current context; job workers run as "background"
+priority_var: ContextVar[str] = ContextVar("call_priority", default="interactive")
+
+
+class OverloadedError(Exception):
+    """Raised when an upstream call cannot get a concurrency slot in time."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an upstream error signals vendor congestion (429 or timeout)."""
+    if isinstance(error, asyncio.TimeoutError) or type(error).__name__ in (
+        "APITimeoutError",
+        "TimeoutException",
+        "ReadTimeout",
+        "ConnectTimeout",
+        "PoolTimeout",
+    ):
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit with a bounded wait queue.
+
+    The limit grows by one per limit's worth of successful calls while it is
+    being used, and is cut by backoff_ratio on a 429, a timeout, or a call slower
+    than latency_tolerance times the baseline latency (a slow moving average of
+    successful calls, so it follows a lasting slowdown). Cuts are at most one per
+    baseline latency, so a burst of failures from the same window counts once.
+    Callers beyond the limit wait in FIFO order, up to max_queue of them for at
+    most queue_timeout seconds.
+
+    Background calls (priority_var == "background") may hold at most
+    background_share of the limit and are admitted only while no interactive
+    caller is waiting, so bulk work never starves interactive requests. They
+    wait in their own queue without a timeout.
+    """
+
+    BASELINE_ALPHA = 0.05
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff_ratio: float = 0.9,
+        latency_tolerance: float = 2.0,
+        max_queue: int = 100,
+        queue_timeout: float = 5.0,
+        background_share: float = 0.5,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.background_share = background_share
+
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._background_waiters: deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.decreases = 0
+
+    def _retry_after(self) -> float:
+        """Rough time until a queued caller would get a slot."""
+        latency = self.baseline_latency or 1.0
+        return max(1.0, latency * (len(self._waiters) + 1) / max(self.limit, 1.0))
+
+    def _background_room(self) -> bool:
+        """Whether a background call may take a slot now."""
+        return not self._waiters and self.in_flight < max(1, int(self.limit * self.background_share))
+
+    def _wake(self):
+        """Hand free slots to waiters in FIFO order, interactive callers first."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        while self._background_waiters and self._background_room():
+            waiter = self._background_waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def _acquire_background(self):
+        """Take a slot for background work, waiting behind interactive callers."""
+        if self._background_room() and not self._background_waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._background_waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+                self._background_waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if needed; raise OverloadedError if not admitted."""
+        if priority_var.get() == "background":
+            await self._acquire_background()
+            return
+
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError("Upstream concurrency queue is full", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived just as the deadline passed; keep it
+                self.admitted += 1
+                return
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            raise OverloadedError("Timed out waiting for an upstream concurrency slot", self._retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now, without queueing (for optional calls such as hedges)."""
+        if priority_var.get() == "background":
+            free = self._background_room() and not self._background_waiters
+        else:
+            free = self.in_flight < int(self.limit) and not self._waiters
+        if free:
+            self.in_flight += 1
+            self.admitted += 1
+        return free
+
+    def release(self, latency: Optional[float], overloaded: bool = False):
+        """
+        Return a slot and adapt the limit.
+
+        Args:
+            latency: Call duration in seconds for successful calls, None otherwise
+            overloaded: The call failed with a 429 or timeout
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        slow = (
+            latency is not None
+            and self.baseline_latency is not None
+            and self.latency_tolerance > 0
+            and latency > self.latency_tolerance * self.baseline_latency
+        )
+
+        if overloaded or slow:
+            if now - self._last_decrease >= (self.baseline_latency or 0.0):
+                self._last_decrease = now
+                self.decreases += 1
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                logger.info(
+                    f"Upstream concurrency limit lowered to {int(self.limit)} "
+                    f"({'429/timeout' if overloaded else 'slow call'})"
+                )
+        elif latency is not None and self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the current limit is actually being used
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+        if latency is not None:
+            if self.baseline_latency is None:
+                self.baseline_latency = latency
+            else:
+                self.baseline_latency += self.BASELINE_ALPHA * (latency - self.baseline_latency)
+
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, acquired: bool = False) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of an upstream call, classifying its outcome.
+
+        With acquired, the slot was already taken with try_acquire().
+        """
+        if not acquired:
+            await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.release(None, overloaded=isinstance(e, Exception) and is_overload_error(e))
+            raise
+        self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        """Return the current limit, occupancy and admission counters."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued_now": len(self._waiters),
+            "background_waiting": len(self._background_waiters),
+            "max_queue": self.max_queue,
+            "baseline_latency_ms": round(self.baseline_latency * 1000, 1)
+            if self.baseline_latency is not None
+            else None,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "decreases": self.decreases,
+        }
@@ -0,0 +1,345 @@
+"""
+Glossary of fixed term translations.
+A user-provided term file is compiled once into a sorted, memory-mapped index that
+answers exact matches for short inputs and finds known terms inside longer texts.
+"""
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+from services.cache import normalize_text
+from utils import metrics
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# magic, entry count, prefix count, longest key in characters, content digest, term file size and mtime
+_HEADER = struct.Struct("<8sQQQ16sQQ")
+_MAGIC = b"GLOSIDX1"
+
+
+def term_key(text: str) -> str:
+    """Lookup key of a term: NFKC-normalized, whitespace-collapsed and case-folded."""
+    return normalize_text(unicodedata.normalize("NFKC", text)).casefold()
+
+
+def _prefix_code(key: str) -> int:
+    """Code of a key's first two characters; orders like the keys' UTF-8 bytes."""
+    return (ord(key[0]) << 21) | (ord(key[1]) if len(key) > 1 else 0)
+
+
+@dataclass
+class GlossaryEntry:
+    """A term and its required translation."""
+
+    source: str
+    target: str
+    keywords: list[str] = field(default_factory=list)
+
+
+def build_index(term_path: str, index_path: str) -> int:
+    """
+    Compile a term file into a glossary index; returns the number of entries.
+
+    Term file lines are "source<TAB>target[<TAB>keyword1,keyword2,...]"; blank
+    lines and lines starting with "#" are skipped, and later lines win for
+    duplicate terms. The index holds a header, an array of uint64 record
+    offsets, a table of the distinct two-character key prefixes with the
+    offset index where each starts, and "key<TAB>source<TAB>target<TAB>keywords"
+    records sorted by the key's UTF-8 bytes, so lookups are binary searches
+    over the mapped file.
+    """
+    terms: dict[bytes, bytes] = {}
+    with open(term_path, encoding="utf-8-sig") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = [part.strip() for part in line.rstrip("\r\n").split("\t")]
+            if len(parts) < 2 or not parts[0] or not parts[1]:
+                continue
+            key = term_key(parts[0])
+            if key:
+                keywords = parts[2] if len(parts) > 2 else ""
+                terms[key.encode("utf-8")] = "\t".join((parts[0], parts[1], keywords)).encode("utf-8")
+
+    keys = sorted(terms)
+    offsets = []
+    position = _HEADER.size + 8 * (len(keys) + 1)
+    digest = hashlib.sha256()
+    records = []
+    prefixes: list[int] = []
+    starts: list[int] = []
+    max_key_chars = 0
+    for i, key in enumerate(keys):
+        text = key.decode("utf-8")
+        max_key_chars = max(max_key_chars, len(text))
+        code = _prefix_code(text)
+        if not prefixes or prefixes[-1] != code:
+            prefixes.append(code)
+            starts.append(i)
+        record = key + b"\t" + terms[key] + b"\n"
+        offsets.append(position)
+        position += len(record)
+        digest.update(record)
+        records.append(record)
+    starts.append(len(keys))
+
+    # Record offsets are absolute, so shift them past the prefix table
+    table = 8 * (len(prefixes) + len(starts))
+    offsets = [offset + table for offset in offsets]
+    offsets.append(position + table)
+
+    stat = os.stat(term_path)
+    header = _HEADER.pack(
+        _MAGIC, len(keys), len(prefixes), max_key_chars, digest.digest()[:16], stat.st_size, stat.st_mtime_ns
+    )
+    tmp_path = f"{index_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(struct.pack(f"<{len(prefixes)}Q", *prefixes))
+        f.write(struct.pack(f"<{len(starts)}Q", *starts))
+        f.writelines(records)
+    os.replace(tmp_path, index_path)
+    return len(keys)
+
+
+class _Keys:
+    """Sequence view of the index keys for the bisect module."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data: mmap.mmap, offsets: memoryview):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offsets[i]
+        return self.data[start:self.data.find(b"\t", start)]
+
+
+class Glossary:
+    """
+    Memory-mapped term index with exact and in-text lookups.
+
+    Only the header is read at load time; lookups touch O(log n) records of the
+    mapped file, whose pages the OS shares between worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str = "",
+        index_path: str = "",
+        max_exact_chars: int = 32,
+        max_prompt_terms: int = 20,
+        min_term_chars: int = 2,
+    ):
+        self.path = path
+        self.index_path = index_path or (f"{path}.idx" if path else "")
+        self.max_exact_chars = max_exact_chars
+        self.max_prompt_terms = max_prompt_terms
+        self.min_term_chars = min_term_chars
+        self.version = ""
+        self._data: Optional[mmap.mmap] = None
+        self._keys: Optional[_Keys] = None
+        self._prefixes: Optional[memoryview] = None
+        self._starts: Optional[memoryview] = None
+        self._max_key_chars = 0
+
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.scans = 0
+        self.scan_matches = 0
+        self.terms_injected = 0
+
+        if path:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self._keys is not None
+
+    def _index_current(self) -> bool:
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) < _HEADER.size:
+            return False
+        magic, _, _, _, _, size, mtime_ns = _HEADER.unpack(header)
+        stat = os.stat(self.path)
+        return magic == _MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+    def load(self):
+        """Map the index, compiling it first if the term file changed since it was built."""
+        if not Path(self.path).exists():
+            logger.warning(f"Glossary term file not found: {self.path}")
+            return
+        if not self._index_current():
+            start = time.perf_counter()
+            count = build_index(self.path, self.index_path)
+            logger.info(f"Glossary index built: {count} terms in {time.perf_counter() - start:.1f}s")
+
+        with open(self.index_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, count, prefixes, max_key_chars, digest, _, _ = _HEADER.unpack_from(data)
+        view = memoryview(data)
+        position = _HEADER.size
+        offsets = view[position:position + 8 * (count + 1)].cast("Q")
+        position += 8 * (count + 1)
+        self._prefixes = view[position:position + 8 * prefixes].cast("Q")
+        position += 8 * prefixes
+        self._starts = view[position:position + 8 * (prefixes + 1)].cast("Q")
+
+        self._data = data
+        self._keys = _Keys(data, offsets)
+        self._max_key_chars = max_key_chars
+        self.version = digest.hex()
+        logger.info(f"Glossary: {count} terms from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._keys) if self._keys is not None else 0
+
+    def _entry(self, i: int) -> GlossaryEntry:
+        start = self._keys.offsets[i]
+        record = self._data[start:self._keys.offsets[i + 1] - 1].decode("utf-8")
+        _, source, target, keywords = record.split("\t")
+        return GlossaryEntry(source, target, [k.strip() for k in keywords.split(",") if k.strip()])
+
+    def _prefix_range(self, code: int) -> tuple[int, int]:
+        """[lo, hi) range of the keys with a prefix code (bisect over the mapped table at C speed)."""
+        j = bisect.bisect_left(self._prefixes, code)
+        if j < len(self._prefixes) and self._prefixes[j] == code:
+            return self._starts[j], self._starts[j + 1]
+        return 0, 0
+
+    def lookup(self, text: str) -> Optional[GlossaryEntry]:
+        """Exact match of a short input, or None (also for inputs over max_exact_chars)."""
+        if self._keys is None or len(text) > self.max_exact_chars:
+            return None
+        start = time.perf_counter()
+        key = term_key(text)
+        i = -1
+        if key:
+            lo, hi = self._prefix_range(_prefix_code(key))
+            key_bytes = key.encode("utf-8")
+            i = bisect.bisect_left(self._keys, key_bytes, lo, hi)
+            if i >= hi or self._keys[i] != key_bytes:
+                i = -1
+        metrics.glossary_lookup_duration.observe(time.perf_counter() - start, kind="exact")
+        if i < 0:
+            self.exact_misses += 1
+            return None
+        self.exact_hits += 1
+        return self._entry(i)
+
+    def _longest_at(self, probe: bytes, lo: int, hi: int) -> int:
+        """
+        Index of the longest key that is a prefix of probe, or -1.
+
+        The largest key <= probe is either such a prefix, or shares a common
+        prefix with probe that bounds every shorter candidate; each retry
+        searches for that common prefix and strictly shortens the probe.
+        """
+        while probe:
+            i = bisect.bisect_right(self._keys, probe, lo, hi) - 1
+            if i < lo:
+                return -1
+            key = self._keys[i]
+            if probe.startswith(key):
+                return i
+            common = 0
+            for a, b in zip(key, probe):
+                if a != b:
+                    break
+                common += 1
+            probe = probe[:common]
+        return -1
+
+    def find_terms(
+        self, text: str, limit: Optional[int] = None, record_stats: bool = True
+    ) -> list[GlossaryEntry]:
+        """
+        Glossary terms occurring in text, longest leftmost match first, without overlaps.
+
+        Terms shorter than min_term_chars are ignored; at most limit (default
+        max_prompt_terms) distinct terms are returned. Scans that do not build a
+        prompt pass record_stats=False to leave the prompt counters alone.
+        """
+        if self._keys is None:
+            return []
+        limit = self.max_prompt_terms if limit is None else limit
+        start = time.perf_counter()
+        folded = term_key(text)
+        found: dict[int, GlossaryEntry] = {}
+        position = 0
+        while position < len(folded) and len(found) < limit:
+            i = -1
+            first = ord(folded[position]) << 21
+            if position + 1 < len(folded):
+                # Keys of two or more characters sharing this position's first two
+                lo, hi = self._prefix_range(first | ord(folded[position + 1]))
+                if lo < hi:
+                    probe = folded[position:position + self._max_key_chars].encode("utf-8", "surrogatepass")
+                    i = self._longest_at(probe, lo, hi)
+            if i < 0 and self.min_term_chars <= 1:
+                # A one-character key is alone under its prefix code
+                lo, hi = self._prefix_range(first)
+                i = lo if lo < hi else -1
+            if i < 0:
+                position += 1
+                continue
+            length = len(self._keys[i].decode("utf-8"))
+            if length < self.min_term_chars:
+                position += 1
+                continue
+            if i not in found:
+                found[i] = self._entry(i)
+            position += length
+
+        metrics.glossary_lookup_duration.observe(time.perf_counter() - start, kind="scan")
+        if not record_stats:
+            return list(found.values())
+        self.scans += 1
+        if found:
+            self.scan_matches += 1
+            self.terms_injected += len(found)
+        return list(found.values())
+
+    def stats(self) -> dict:
+        """Return index size and hit counters."""
+        exact = self.exact_hits + self.exact_misses
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "terms": len(self),
+            "version": self.version,
+            "exact_hits": self.exact_hits,
+            "exact_misses": self.exact_misses,
+            "exact_hit_ratio": round(self.exact_hits / exact, 4) if exact else 0.0,
+            "scans": self.scans,
+            "scans_with_terms": self.scan_matches,
+            "terms_injected": self.terms_injected,
+        }
+
+
+# Global glossary instance (empty unless GLOSSARY_PATH is set)
+glossary = Glossary(
+    path=settings.glossary_path,
+    index_path=settings.glossary_index_path,
+    max_exact_chars=settings.glossary_max_exact_chars,
+    max_prompt_terms=settings.glossary_max_prompt_terms,
+    min_term_chars=settings.glossary_min_term_chars,
+)
@@ -0,0 +1,143 @@
+"""
+Request hedging for upstream LLM calls.
+Fires a second attempt when the first has not returned by a percentile-based
+delay, uses whichever finishes first and cancels the other.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from utils.logging import get_logger, LatencyWindow
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    Decide when to hedge and cap the extra load hedging adds.
+
+    The hedge delay is the configured percentile of recent call latencies
+    (never below min_delay). A token bucket earns max_extra_ratio tokens per
+    request and spends one per hedge, so hedges stay within that fraction of
+    traffic.
+    """
+
+    RECOMPUTE_EVERY = 50  # Samples between delay recomputations
+    MIN_SAMPLES = 20  # Use min_delay until this many samples exist
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay: float = 0.5,
+        max_extra_ratio: float = 0.1,
+        burst: float = 10.0,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_extra_ratio = max_extra_ratio
+        self.burst = burst
+
+        self.latencies = LatencyWindow()
+        self._delay = min_delay
+        self._samples_since_recompute = 0
+        self._tokens = burst
+
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0  # Delay elapsed but the load cap was exhausted or admit() refused
+
+    def delay(self) -> float:
+        """Current hedge delay in seconds."""
+        return self._delay
+
+    def record_latency(self, seconds: float):
+        """Record a completed call latency and periodically refresh the delay."""
+        self.latencies.record(seconds)
+        self._samples_since_recompute += 1
+        if (
+            self._samples_since_recompute >= self.RECOMPUTE_EVERY
+            or len(self.latencies.samples) == self.MIN_SAMPLES
+        ):
+            self._samples_since_recompute = 0
+            ordered = sorted(self.latencies.samples)
+            if len(ordered) >= self.MIN_SAMPLES:
+                index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+                self._delay = max(self.min_delay, ordered[index])
+
+    def on_request(self):
+        """Earn hedge budget for one request."""
+        self.requests += 1
+        self._tokens = min(self.burst, self._tokens + self.max_extra_ratio)
+
+    def try_acquire(self, admit: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Spend budget for one hedge; False when the extra-load cap is reached.
+
+        admit, if given, is asked last (e.g. to take a concurrency slot for the
+        hedge) and can refuse it too.
+        """
+        if self._tokens >= 1 and (admit is None or admit()):
+            self._tokens -= 1
+            return True
+        self.hedges_skipped += 1
+        return False
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+        admit: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """
+        Run primary(); if it is still pending after the hedge delay, also run
+        hedge() and return the first successful result, cancelling the other.
+
+        The hedge is skipped when admit() returns False; when it returns True,
+        hedge() runs right away and owns whatever admit() acquired.
+        """
+        self.on_request()
+        start = time.perf_counter()
+        first = asyncio.ensure_future(primary())
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.delay())
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        if done or not self.try_acquire(admit):
+            result = await first
+            self.record_latency(time.perf_counter() - start)
+            return result
+
+        self.hedges_fired += 1
+        logger.info(f"Hedging LLM request after {self.delay():.2f}s")
+        second = asyncio.ensure_future(hedge())
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedges_won += 1
+                        self.record_latency(time.perf_counter() - start)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        """Return hedging counters and the current delay."""
+        return {
+            "requests": self.requests,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped": self.hedges_skipped,
+            "delay_ms": round(self._delay * 1000, 1),
+            "latency": self.latencies.summary(),
+        }
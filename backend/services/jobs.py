@@ -0,0 +1,483 @@
+"""
+Asynchronous translation jobs for bulk workloads.
+Jobs and their texts live in a SQLite queue so they survive restarts; a pool of
+async workers translates them chunk by chunk at background priority.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+from config import settings
+from services.concurrency import OverloadedError, priority_var
+from services.translator import translator, TranslationError
+from services.usage import BudgetExceededError, set_client_id
+from utils import metrics
+from utils.logging import get_logger, set_request_id
+
+logger = get_logger(__name__)
+
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by every worker process using the same file.
+
+    A worker claims a job by taking a lease on it and renews the lease while it
+    runs; a job whose lease expires (its worker died) is claimed again and
+    resumes with the texts not yet translated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+        # Connections must not be shared across fork(); workers open their own
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, client_id TEXT NOT NULL, read_cache INTEGER NOT NULL, "
+            "write_cache INTEGER NOT NULL, total INTEGER NOT NULL, completed INTEGER NOT NULL DEFAULT 0, "
+            "failed INTEGER NOT NULL DEFAULT 0, error TEXT, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, lease_until REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, text TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', translation TEXT, keywords TEXT, "
+            "error_code TEXT, PRIMARY KEY (job_id, idx))"
+        )
+
+    def _transaction(self, work):
+        """Run work(conn) in one write transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def create(
+        self, kind: str, texts: list[str], priority: int, client_id: str, read_cache: bool, write_cache: bool
+    ) -> dict:
+        """Queue a new job for texts and return it."""
+        job_id = uuid.uuid4().hex
+
+        def insert(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, client_id, read_cache, write_cache, "
+                "total, created_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, priority, client_id, int(read_cache), int(write_cache), len(texts), time.time()),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, text) VALUES (?, ?, ?)",
+                ((job_id, index, text) for index, text in enumerate(texts)),
+            )
+
+        self._transaction(insert)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def results(self, job_id: str) -> list[dict]:
+        """Per-text rows of a job in input order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, status, translation, keywords, error_code FROM job_items "
+                "WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self, lease_seconds: float) -> Optional[dict]:
+        """Lease the highest-priority runnable job: queued, or running with an expired lease."""
+
+        def take(conn: sqlite3.Connection):
+            now = time.time()
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?), "
+                "lease_until = ? WHERE id = ?",
+                (now, now + lease_seconds, row["id"]),
+            )
+            return dict(row) | {"status": "running"}
+
+        return self._transaction(take)
+
+    def renew(self, job_id: str, lease_seconds: float) -> Optional[str]:
+        """Extend a running job's lease; return the job's status (e.g. "cancelled")."""
+
+        def extend(conn: sqlite3.Connection):
+            conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id),
+            )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row["status"] if row else None
+
+        return self._transaction(extend)
+
+    def pending_items(self, job_id: str, limit: int) -> list[tuple[int, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, text FROM job_items WHERE job_id = ? AND status = 'pending' "
+                "ORDER BY idx LIMIT ?",
+                (job_id, limit),
+            ).fetchall()
+        return [(row["idx"], row["text"]) for row in rows]
+
+    def save_items(self, job_id: str, done: list[tuple[int, str, list[str]]], errors: list[tuple[int, str]]):
+        """Record translated and failed texts and update the job's progress counters."""
+
+        def save(conn: sqlite3.Connection):
+            conn.executemany(
+                "UPDATE job_items SET status = 'done', translation = ?, keywords = ? "
+                "WHERE job_id = ? AND idx = ? AND status = 'pending'",
+                (
+                    (translation, json.dumps(keywords, ensure_ascii=False), job_id, index)
+                    for index, translation, keywords in done
+                ),
+            )
+            conn.executemany(
+                "UPDATE job_items SET status = 'error', error_code = ? "
+                "WHERE job_id = ? AND idx = ? AND status = 'pending'",
+                ((code, job_id, index) for index, code in errors),
+            )
+            conn.execute(
+                "UPDATE jobs SET "
+                "completed = (SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status = 'done'), "
+                "failed = (SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status = 'error') "
+                "WHERE id = ?",
+                (job_id, job_id, job_id),
+            )
+
+        self._transaction(save)
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        """Move a running job to a final status."""
+        self._transaction(
+            lambda conn: conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status = 'running'",
+                (status, error, time.time(), job_id),
+            )
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; return False if it had already finished."""
+
+        def cancel(conn: sqlite3.Connection):
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+            return cursor.rowcount > 0
+
+        return self._transaction(cancel)
+
+    def requeue(self, job_ids: list[str]):
+        """Return running jobs to the queue (on shutdown) so any worker resumes them at once."""
+        self._transaction(
+            lambda conn: conn.executemany(
+                "UPDATE jobs SET status = 'queued', lease_until = NULL WHERE id = ? AND status = 'running'",
+                ((job_id,) for job_id in job_ids),
+            )
+        )
+
+    def counts(self) -> dict[str, int]:
+        """Jobs by status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def purge(self, older_than: float) -> int:
+        """Delete jobs that finished before the older_than timestamp."""
+
+        def purge(conn: sqlite3.Connection):
+            ids = [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id FROM jobs WHERE finished_at < ?", (older_than,)
+                ).fetchall()
+            ]
+            conn.executemany("DELETE FROM job_items WHERE job_id = ?", ((job_id,) for job_id in ids))
+            conn.executemany("DELETE FROM jobs WHERE id = ?", ((job_id,) for job_id in ids))
+            return len(ids)
+
+        return self._transaction(purge)
+
+
+class JobQueue:
+    """
+    Pool of async workers draining the job store.
+
+    Workers make their LLM calls at background priority, so the concurrency
+    limiter keeps slots for interactive /api/translate traffic, and charge them
+    to the submitting client's budget. Progress is checkpointed after every
+    chunk of texts, so a restarted job only translates what is left.
+    """
+
+    PURGE_INTERVAL = 3600.0  # Seconds between deletions of expired finished jobs
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        path: str = "jobs.sqlite",
+        workers: int = 2,
+        chunk_size: int = 20,
+        lease_seconds: float = 60.0,
+        retention_hours: float = 24.0,
+        poll_interval: float = 1.0,
+    ):
+        self.enabled = enabled
+        self.path = path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.retention_hours = retention_hours
+        self.poll_interval = poll_interval
+
+        self._store: Optional[JobStore] = None
+        self._tasks: list[asyncio.Task] = []
+        self._active: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._progress = asyncio.Condition()
+        self._last_purge = 0.0
+
+    @property
+    def store(self) -> JobStore:
+        """The job store, opened on first use so importing the app creates no file."""
+        if self._store is None:
+            self._store = JobStore(self.path)
+            logger.info(f"Job queue: {self.path}")
+        return self._store
+
+    async def submit(
+        self,
+        kind: str,
+        texts: list[str],
+        priority: int = 0,
+        client_id: str = "anonymous",
+        read_cache: bool = True,
+        write_cache: bool = True,
+    ) -> dict:
+        """Queue a "text" (single text) or "batch" job and wake an idle worker."""
+        job = await asyncio.to_thread(
+            self.store.create, kind, texts, priority, client_id, read_cache, write_cache
+        )
+        metrics.jobs_submitted.inc(kind=kind)
+        self._wakeup.set()
+        logger.info(f"Job {job['id']} queued: {kind}, {len(texts)} texts, priority {priority}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def results(self, job_id: str) -> list[dict]:
+        return await asyncio.to_thread(self.store.results, job_id)
+
+    async def cancel(self, job_id: str) -> bool:
+        cancelled = await asyncio.to_thread(self.store.cancel, job_id)
+        if cancelled:
+            metrics.jobs_finished.inc(status="cancelled")
+            await self._notify()
+        return cancelled
+
+    async def _notify(self):
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def wait_for_progress(self, timeout: float):
+        """Wait until a job in this process makes progress, or timeout seconds pass."""
+        async with self._progress:
+            try:
+                await asyncio.wait_for(self._progress.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _translate_chunk(self, job: dict, items: list[tuple[int, str]]):
+        """Translate one chunk; return (done, errors, retry_after) for it."""
+        read_cache, write_cache = bool(job["read_cache"]), bool(job["write_cache"])
+        short = [(index, text) for index, text in items if len(text) <= settings.max_text_length]
+        long = [(index, text) for index, text in items if len(text) > settings.max_text_length]
+
+        outcomes: list[tuple[int, object]] = []
+        if short:
+            if job["kind"] == "text":
+                try:
+                    result = await translator.translate(short[0][1], read_cache=read_cache, write_cache=write_cache)
+                except (TranslationError, BudgetExceededError, OverloadedError) as e:
+                    result = e
+                outcomes.append((short[0][0], result))
+            else:
+                results = await translator.translate_batch(
+                    [text for _, text in short], read_cache=read_cache, write_cache=write_cache
+                )
+                outcomes.extend(zip((index for index, _ in short), results))
+        for index, text in long:
+            # Long documents are chunked and translated in parallel
+            try:
+                result = await translator.translate_document(text, read_cache=read_cache, write_cache=write_cache)
+            except (TranslationError, BudgetExceededError, OverloadedError) as e:
+                result = e
+            outcomes.append((index, result))
+
+        done, errors, retry_after = [], [], 0.0
+        for index, result in outcomes:
+            if isinstance(result, (BudgetExceededError, OverloadedError)):
+                # Left pending and retried once the budget or capacity frees up
+                retry_after = max(retry_after, result.retry_after)
+                metrics.job_items.inc(result="deferred")
+            elif isinstance(result, TranslationError):
+                errors.append((index, "TRANSLATION_FAILED"))
+                metrics.job_items.inc(result="failed")
+            else:
+                translation, keywords = result
+                done.append((index, translation, keywords))
+                metrics.job_items.inc(result="translated")
+        return done, errors, retry_after
+
+    async def _process(self, job: dict):
+        """Translate a job's pending texts chunk by chunk, checkpointing each chunk."""
+        while True:
+            items = await asyncio.to_thread(self.store.pending_items, job["id"], self.chunk_size)
+            if not items:
+                break
+            done, errors, retry_after = await self._translate_chunk(job, items)
+            await asyncio.to_thread(self.store.save_items, job["id"], done, errors)
+            await self._notify()
+            if retry_after:
+                logger.info(f"Job {job['id']} deferred for {retry_after:.1f}s (budget or capacity)")
+                await asyncio.sleep(min(retry_after, self.lease_seconds / 3))
+
+    async def _run_job(self, job: dict):
+        """Run one claimed job, renewing its lease and stopping if it is cancelled."""
+        set_request_id(job["id"])
+        set_client_id(job["client_id"])
+        logger.info(f"Job {job['id']} started ({job['completed'] + job['failed']}/{job['total']} already done)")
+        task = asyncio.create_task(self._process(job))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=self.lease_seconds / 3)
+                if not task.done():
+                    status = await asyncio.to_thread(self.store.renew, job["id"], self.lease_seconds)
+                    if status != "running":
+                        logger.info(f"Job {job['id']} {status}, stopping")
+                        task.cancel()
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        try:
+            task.result()
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.exception(f"Job {job['id']} failed: {str(e)}")
+            await asyncio.to_thread(self.store.finish, job["id"], "failed", str(e))
+            metrics.jobs_finished.inc(status="failed")
+        else:
+            await asyncio.to_thread(self.store.finish, job["id"], "completed")
+            metrics.jobs_finished.inc(status="completed")
+            logger.info(f"Job {job['id']} completed")
+        await self._notify()
+
+    async def _purge_expired(self):
+        now = time.time()
+        if now - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        purged = await asyncio.to_thread(self.store.purge, now - self.retention_hours * 3600)
+        if purged:
+            logger.info(f"Purged {purged} finished jobs")
+
+    async def _worker(self):
+        # Every LLM call made by this worker yields to interactive requests
+        priority_var.set("background")
+        while True:
+            try:
+                await self._purge_expired()
+                job = await asyncio.to_thread(self.store.claim, self.lease_seconds)
+            except sqlite3.Error as e:
+                logger.error(f"Job queue error: {str(e)}")
+                job = None
+            if job is None:
+                # Other processes may queue jobs too, so also poll
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._active.add(job["id"])
+            try:
+                await self._run_job(job)
+            finally:
+                self._active.discard(job["id"])
+
+    def start(self):
+        """Start the worker pool on the running loop (no-op when disabled or already running)."""
+        if self.enabled and self.workers > 0 and not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers and return their unfinished jobs to the queue."""
+        if not self._tasks:
+            return
+        active = list(self._active)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if active:
+            await asyncio.to_thread(self.store.requeue, active)
+            logger.info(f"Requeued {len(active)} unfinished jobs")
+
+    def stats(self) -> dict:
+        """Jobs by status and the jobs running in this process."""
+        return {
+            "enabled": self.enabled,
+            "workers": len(self._tasks),
+            "running_here": len(self._active),
+            "jobs": self.store.counts() if self.enabled else {},
+        }
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    enabled=settings.jobs_enabled,
+    path=settings.jobs_path,
+    workers=settings.jobs_workers,
+    chunk_size=settings.jobs_chunk_size,
+    lease_seconds=settings.jobs_lease_seconds,
+    retention_hours=settings.jobs_retention_hours,
+)
@@ -0,0 +1,201 @@
+"""
+Tolerant JSON parsing of LLM responses.
+Strict json.loads first; on failure, extracts the JSON value from markdown fences or
+surrounding prose and repairs common syntax problems locally, without another LLM call.
+"""
+import json
+import re
+from typing import Any, Optional, Tuple
+
+_FENCE_RE = re.compile(r"```[a-zA-Z]*[ \t]*\r?\n?(.*?)(?:```|$)", re.DOTALL)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_.+\-]+")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_VALUE_END = ",:}]\"/"  # Characters that may follow a closing quote
+
+MAX_CANDIDATES = 4  # Opening brackets tried as the start of the JSON value
+
+
+def _closes_string(text: str, i: int) -> bool:
+    """Whether the quote at text[i] ends a string, judged by the next non-space character."""
+    j = i + 1
+    n = len(text)
+    while j < n and text[j] in " \t\r\n":
+        j += 1
+    return j >= n or text[j] in _VALUE_END
+
+
+def repair_json(text: str, start: int = 0) -> str:
+    """
+    Rewrite the JSON value starting at text[start] into strict JSON.
+
+    Fixes trailing and missing commas, single-quoted strings and unquoted keys, Python
+    literals (True/False/None), comments, raw control characters and unescaped
+    quotes inside strings. Text after the value is dropped. A value cut off
+    mid-way (e.g. by max_tokens) is truncated to its last complete element and
+    closed.
+    """
+    out: list[str] = []
+    # Open containers: [bracket, expecting an object key]
+    stack: list[list] = []
+    # Output length and open containers after the last complete nested value
+    safe: Optional[Tuple[int, list[list]]] = None
+    pending = False  # A value just ended; the next one needs a separating comma
+    i = start
+    n = len(text)
+
+    def value_start():
+        nonlocal pending
+        if pending:
+            out.append(",")
+            if stack[-1][0] == "{":
+                stack[-1][1] = True
+            pending = False
+
+    def value_done():
+        nonlocal safe, pending
+        if stack:
+            safe = (len(out), [frame[:] for frame in stack])
+            pending = True
+
+    while i < n:
+        c = text[i]
+
+        if c in "\"'":
+            # String: keys, values, single-quoted or with stray inner quotes
+            value_start()
+            is_key = bool(stack) and stack[-1][0] == "{" and stack[-1][1]
+            chars = ['"']
+            i += 1
+            closed = False
+            while i < n:
+                ch = text[i]
+                if ch == "\\" and i + 1 < n:
+                    nxt = text[i + 1]
+                    chars.append(nxt if nxt == "'" else ch + nxt)
+                    i += 2
+                    continue
+                if ch == c and _closes_string(text, i):
+                    closed = True
+                    i += 1
+                    break
+                if ch == '"':
+                    chars.append('\\"')
+                elif ch in _ESCAPES:
+                    chars.append(_ESCAPES[ch])
+                elif ch < " ":
+                    chars.append(f"\\u{ord(ch):04x}")
+                else:
+                    chars.append(ch)
+                i += 1
+            if not closed:
+                break
+            chars.append('"')
+            out.append("".join(chars))
+            if not is_key:
+                value_done()
+            if not stack:
+                break
+            continue
+
+        if c in "{[":
+            value_start()
+            stack.append([c, c == "{"])
+            out.append(c)
+        elif c in "}]":
+            pending = False
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append("}" if c == "}" else "]")
+            value_done()
+            if not stack:
+                break
+        elif c == ",":
+            pending = False
+            out.append(c)
+            if stack and stack[-1][0] == "{":
+                stack[-1][1] = True
+        elif c == ":":
+            pending = False
+            out.append(c)
+            if stack and stack[-1][0] == "{":
+                stack[-1][1] = False
+        elif c == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        elif c == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        elif c.isspace():
+            out.append(c)
+        else:
+            match = _TOKEN_RE.match(text, i)
+            if not match:
+                # Stray character outside any string
+                i += 1
+                continue
+            token = match.group()
+            i = match.end()
+            value_start()
+            if stack and stack[-1][0] == "{" and stack[-1][1]:
+                out.append(json.dumps(token))
+            else:
+                out.append(_PYTHON_LITERALS.get(token, token))
+                value_done()
+            if not stack:
+                break
+            continue
+        i += 1
+
+    if stack:
+        # Truncated: keep complete elements only and close what is still open
+        if safe is None:
+            return "".join(out)
+        length, stack = safe
+        del out[length:]
+        out.extend("}" if frame[0] == "{" else "]" for frame in reversed(stack))
+    return "".join(out)
+
+
+def _candidates(text: str) -> list[int]:
+    """Positions of the first opening brackets, as possible starts of the JSON value."""
+    starts = []
+    for i, c in enumerate(text):
+        if c in "{[":
+            starts.append(i)
+            if len(starts) >= MAX_CANDIDATES:
+                break
+    return starts
+
+
+def loads_tolerant(content: str) -> Tuple[Any, bool]:
+    """
+    Parse JSON from an LLM response, repairing it if strict parsing fails.
+
+    Returns:
+        (parsed value, whether repair was needed)
+
+    Raises:
+        json.JSONDecodeError: The strict parser's error if no repair succeeded
+    """
+    try:
+        return json.loads(content), False
+    except json.JSONDecodeError as e:
+        error = e
+
+    fence = _FENCE_RE.search(content)
+    bodies = [fence.group(1), content] if fence else [content]
+    for body in bodies:
+        for start in _candidates(body):
+            try:
+                return json.loads(repair_json(body, start)), True
+            except json.JSONDecodeError:
+                continue
+    raise error
@@ -0,0 +1,209 @@
+"""
+Local keyword extraction for Chinese text.
+Dictionary-based segmentation (forward maximum matching over an IDF table loaded once
+at startup) with TF-IDF or TextRank ranking, so the LLM can be asked to translate only.
+"""
+import re
+import statistics
+import time
+import unicodedata
+from contextvars import ContextVar
+from typing import Optional
+
+from config import settings
+from utils import metrics
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Where the current request's keywords come from: "llm" or "local" (set by the API)
+keyword_source_var: ContextVar[str] = ContextVar("keyword_source", default=settings.keywords_source)
+
+_TOKEN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[A-Za-z][A-Za-z0-9+#\-]*|\d+(?:\.\d+)?")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+# Function characters that never start an unknown word, even without an IDF table
+_FUNCTION_CHARS = frozenset("的了是在和与及或也都就而且并被把将从对于为以之其这那你我他她它们个着过吗呢吧啊很更最又还再不没有")
+
+STOPWORDS = frozenset(
+    """
+    我们 你们 他们 她们 它们 这个 那个 这些 那些 这样 那样 一个 一些 一种 没有 可以 可能 因为 所以 但是
+    如果 虽然 然后 就是 已经 还是 以及 或者 进行 通过 什么 自己 非常 其中 之后 之前 以后 以前 目前 同时
+    the a an and or of to in on for with by from at as is are was were be been it this that these those
+    """.split()
+)
+
+
+class KeywordExtractor:
+    """
+    Ranks the words of a text by TF-IDF or TextRank.
+
+    Words are found by forward maximum matching against the IDF table's
+    vocabulary; runs of unknown characters of 2-4 characters are kept as one
+    candidate (names and new terms), longer runs as overlapping bigrams. Without
+    a table, every CJK run is unknown and comes out as bigrams that are mostly
+    not words, so local extraction is unavailable (see available).
+    """
+
+    WINDOW = 5  # TextRank co-occurrence window, in candidate words
+    DAMPING = 0.85
+    ITERATIONS = 20
+
+    def __init__(self, method: str = "tfidf", idf_path: str = "", top_k: int = 5):
+        self.method = method
+        self.top_k = top_k
+        self.idf: dict[str, float] = {}
+        self.default_idf = 1.0
+        self.max_word_chars = 1
+        self.calls = 0
+        self.fallbacks = 0
+        if idf_path:
+            self.load_idf(idf_path)
+
+    def load_idf(self, path: str):
+        """Load "word idf" lines (the jieba idf.txt format); unknown words get the median IDF."""
+        start = time.perf_counter()
+        idf: dict[str, float] = {}
+        with open(path, encoding="utf-8-sig") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    try:
+                        idf[parts[0]] = float(parts[1])
+                    except ValueError:
+                        continue
+        self.idf = idf
+        self.default_idf = statistics.median(idf.values()) if idf else 1.0
+        self.max_word_chars = max((len(word) for word in idf), default=1)
+        logger.info(f"Keyword IDF table: {len(idf)} words in {time.perf_counter() - start:.1f}s")
+
+    @property
+    def available(self) -> bool:
+        """Whether an IDF table is loaded to segment CJK text into words."""
+        return bool(self.idf)
+
+    def _cut_run(self, run: str, words: list[str]):
+        """Segment one run of CJK characters into words (unknown single characters included)."""
+        unknown = ""
+        i = 0
+        while i < len(run):
+            length = 1
+            for size in range(min(self.max_word_chars, len(run) - i), 1, -1):
+                if run[i:i + size] in self.idf:
+                    length = size
+                    break
+            char = run[i]
+            if length == 1 and char not in _FUNCTION_CHARS and char not in self.idf:
+                unknown += char
+                i += 1
+                continue
+            self._flush_unknown(unknown, words)
+            unknown = ""
+            words.append(run[i:i + length])
+            i += length
+        self._flush_unknown(unknown, words)
+
+    @staticmethod
+    def _flush_unknown(unknown: str, words: list[str]):
+        if len(unknown) <= 4:
+            if unknown:
+                words.append(unknown)
+        else:
+            words.extend(unknown[i:i + 2] for i in range(len(unknown) - 1))
+
+    def segment(self, text: str) -> list[str]:
+        """Split text into words: CJK words, Latin words and numbers, in order."""
+        words: list[str] = []
+        for token in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text)):
+            if _CJK_RE.match(token):
+                self._cut_run(token, words)
+            else:
+                words.append(token)
+        return words
+
+    def _candidates(self, words: list[str]) -> list[str]:
+        return [
+            word
+            for word in words
+            if (len(word) >= 2 or not _CJK_RE.match(word))
+            and word.casefold() not in STOPWORDS
+            and not word[0].isdigit()
+        ]
+
+    def _tfidf(self, candidates: list[str]) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        for word in candidates:
+            scores[word] = scores.get(word, 0.0) + self.idf.get(word, self.default_idf)
+        return scores
+
+    def _textrank(self, candidates: list[str]) -> dict[str, float]:
+        edges: dict[str, dict[str, float]] = {word: {} for word in candidates}
+        for i, word in enumerate(candidates):
+            for other in candidates[i + 1:i + self.WINDOW]:
+                if other != word:
+                    edges[word][other] = edges[word].get(other, 0.0) + 1.0
+                    edges[other][word] = edges[other].get(word, 0.0) + 1.0
+        if not any(edges.values()):
+            return self._tfidf(candidates)
+
+        totals = {word: sum(neighbours.values()) for word, neighbours in edges.items()}
+        rank = {word: 1.0 for word in edges}
+        for _ in range(self.ITERATIONS):
+            rank = {
+                word: (1 - self.DAMPING)
+                + self.DAMPING
+                * sum(weight / totals[other] * rank[other] for other, weight in neighbours.items())
+                for word, neighbours in edges.items()
+            }
+        return rank
+
+    def extract(self, text: str, top_k: Optional[int] = None) -> list[str]:
+        """
+        Return up to top_k keywords of text, best first (ties in order of appearance).
+
+        Never empty for a non-empty text: with no candidate words, the longest
+        tokens (or the text itself) are returned.
+        """
+        start = time.perf_counter()
+        top_k = top_k or self.top_k
+        words = self.segment(text)
+        candidates = self._candidates(words)
+        scores = self._textrank(candidates) if self.method == "textrank" else self._tfidf(candidates)
+        first = {}
+        for position, word in enumerate(candidates):
+            first.setdefault(word, position)
+        keywords = sorted(scores, key=lambda word: (-scores[word], first[word]))[:top_k]
+        if not keywords:
+            keywords = sorted(dict.fromkeys(words), key=len, reverse=True)[:top_k] or [text.strip()[:20]]
+
+        self.calls += 1
+        metrics.keyword_extraction_duration.observe(time.perf_counter() - start, method=self.method)
+        return keywords
+
+    def complete(self, keywords: list[str], text: str, minimum: int = 3) -> list[str]:
+        """Fill a keyword list shorter than minimum with locally extracted keywords of text."""
+        self.fallbacks += 1
+        seen = {keyword.casefold() for keyword in keywords}
+        completed = list(keywords)
+        for keyword in self.extract(text):
+            if len(completed) >= minimum:
+                break
+            if keyword.casefold() not in seen:
+                seen.add(keyword.casefold())
+                completed.append(keyword)
+        return completed
+
+    def stats(self) -> dict:
+        return {
+            "method": self.method,
+            "idf_words": len(self.idf),
+            "extractions": self.calls,
+            "llm_fallbacks": self.fallbacks,
+        }
+
+
+# Global keyword extractor instance (IDF table loaded at import, before workers fork)
+keyword_extractor = KeywordExtractor(
+    method=settings.keywords_method,
+    idf_path=settings.keywords_idf_path,
+)
@@ -1,14 +1,31 @@
 """
 LLM client with provider-agnostic interface and multiple provider support.
 Uses official SDKs: OpenAI SDK for OpenAI-compatible APIs, Anthropic SDK for Claude.
+All providers use the SDKs' async clients on top of one shared, pooled httpx transport,
+so in-flight LLM calls never block the event loop. SDKs are imported and clients built
+on first use (or at startup), and only for the providers actually configured.
 """
 from abc import ABC, abstractmethod
-from typing import Optional
-from openai import OpenAI
-from anthropic import Anthropic
+from contextlib import nullcontext
+from typing import AsyncIterator, Optional
+import asyncio
+import functools
+import hashlib
+import importlib
+import json
+import random
+import time
+import httpx
 
 from config import settings
+from services.concurrency import AdaptiveLimiter, OverloadedError
+from services.hedging import HedgePolicy
+from services.chunker import estimate_tokens
+from services.llm_router import Backend, ProviderRouter
+from services.usage import usage_tracker, get_client_id
+from utils import metrics
 from utils.logging import get_logger
+from utils.tracing import KIND_CLIENT, current_span_var, tracer
 
 logger = get_logger(__name__)
 
@@ -19,22 +36,135 @@ class LLMResponse:
     def __init__(self, content: str, raw_response: Optional[dict] = None):
         self.content = content
         self.raw_response = raw_response
+        self.backend: Optional[str] = None  # Name of the routed backend that answered
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+
+    def usage(self) -> tuple[int, int]:
+        """Return (prompt_tokens, completion_tokens) from the provider usage data."""
+        usage = (self.raw_response or {}).get("usage") or {}
+        if "input_tokens" in usage:
+            # Anthropic counts cache reads and writes separately from input_tokens
+            prompt = (
+                (usage.get("input_tokens") or 0)
+                + (usage.get("cache_read_input_tokens") or 0)
+                + (usage.get("cache_creation_input_tokens") or 0)
+            )
+        else:
+            prompt = usage.get("prompt_tokens", 0) or 0
+        completion = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+        return prompt, completion
+
+    def cached_tokens(self) -> int:
+        """Return prompt tokens served from the provider's prompt cache."""
+        usage = (self.raw_response or {}).get("usage") or {}
+        if "input_tokens" in usage:
+            return usage.get("cache_read_input_tokens") or 0
+        return (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+
+class _TracingTransport(httpx.AsyncHTTPTransport):
+    """Transport reporting connect, upload, time-to-first-byte and body download as spans."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        parent = current_span_var.get()
+        if parent is not None and parent.recording:
+            request.extensions["trace"] = tracer.transport_trace(parent)
+        return await super().handle_async_request(request)
+
+
+def traced_chat(chat):
+    """Wrap a provider's chat() in an "llm.chat" client span with model and token attributes."""
+
+    @functools.wraps(chat)
+    async def wrapper(self, messages: list[dict], max_tokens: Optional[int] = None) -> LLMResponse:
+        with tracer.span(
+            "llm.chat", kind=KIND_CLIENT, **{"gen_ai.system": self.system, "gen_ai.request.model": self.model}
+        ) as span:
+            response = await chat(self, messages, max_tokens=max_tokens)
+            if span.recording:
+                prompt_tokens, completion_tokens = response.usage()
+                span.set_attributes(
+                    **{
+                        "gen_ai.usage.input_tokens": prompt_tokens,
+                        "gen_ai.usage.output_tokens": completion_tokens,
+                        "gen_ai.usage.cached_input_tokens": response.cached_tokens(),
+                    }
+                )
+            return response
+
+    return wrapper
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP transport used by all providers."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        )
+        _http_client = httpx.AsyncClient(
+            timeout=float(settings.llm_timeout),
+            limits=limits,
+            # Traced requests get per-phase spans from the transport
+            transport=_TracingTransport(limits=limits) if tracer.enabled else None,
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP transport (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
 
 
 class BaseLLMProvider(ABC):
     """Base class for LLM providers."""
 
+    sdk_module: Optional[str] = None  # SDK package, imported only when the client is built
+    system = ""  # Provider name reported on tracing spans (gen_ai.system)
+
     def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
         self.base_url = base_url
+        self._client = None
+
+    def _create_client(self):
+        """Build the SDK client (providers without an SDK have none)."""
+        return None
+
+    @property
+    def client(self):
+        """SDK client, built on first use so importing this module does not load any SDK."""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def warmup(self):
+        """Import the SDK and build the client now so the first request pays for neither."""
+        return self.client
 
     @abstractmethod
-    async def chat(self, messages: list[dict]) -> LLMResponse:
+    async def chat(self, messages: list[dict], max_tokens: Optional[int] = None) -> LLMResponse:
         """Send chat request to LLM provider."""
         pass
 
+    async def chat_stream(
+        self, messages: list[dict], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream response text deltas. Providers without streaming yield the whole response."""
+        response = await self.chat(messages, max_tokens=max_tokens)
+        yield response.content
+
 
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI-compatible provider using official OpenAI SDK.
@@ -46,31 +176,58 @@ class OpenAIProvider(BaseLLMProvider):
     - Any OpenAI-compatible API
     """
 
-    def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
-        super().__init__(api_key, model, timeout, base_url)
+    sdk_module = "openai"
+    system = "openai"
+
+    def _create_client(self):
+        from openai import AsyncOpenAI
 
-        # Initialize OpenAI client
+        # Initialize async OpenAI client on the shared transport
         client_kwargs = {
-            "api_key": api_key,
-            "timeout": float(timeout),
+            "api_key": self.api_key,
+            "timeout": float(self.timeout),
+            "http_client": get_http_client(),
+            # RetryPolicy is the only retry layer (Retry-After, request deadline, failover)
+            "max_retries": 0,
         }
 
         # Use custom base URL if provided
-        if base_url:
-            client_kwargs["base_url"] = base_url
-
-        self.client = OpenAI(**client_kwargs)
-
-    async def chat(self, messages: list[dict]) -> LLMResponse:
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+
+        return AsyncOpenAI(**client_kwargs)
+
+    def _request_kwargs(self, messages: list[dict], max_tokens: Optional[int]) -> dict:
+        """Build chat completion request arguments."""
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"},
+        }
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        return kwargs
+
+    @staticmethod
+    def _cached_tokens(usage) -> int:
+        """Prompt tokens read from the automatic prefix cache (OpenAI, or DeepSeek's field)."""
+        if usage is None:
+            return 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        if cached is None:
+            cached = getattr(usage, "prompt_cache_hit_tokens", None)
+        return cached or 0
+
+    @traced_chat
+    async def chat(self, messages: list[dict], max_tokens: Optional[int] = None) -> LLMResponse:
         """Call OpenAI-compatible chat completion API using SDK."""
         try:
+            kwargs = self._request_kwargs(messages, max_tokens)
+
             # Call OpenAI API using SDK
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-                response_format={"type": "json_object"},
-            )
+            response = await self.client.chat.completions.create(**kwargs)
 
             content = response.choices[0].message.content
 
@@ -91,6 +248,7 @@ class OpenAIProvider(BaseLLMProvider):
                     "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
                     "completion_tokens": response.usage.completion_tokens if response.usage else 0,
                     "total_tokens": response.usage.total_tokens if response.usage else 0,
+                    "prompt_tokens_details": {"cached_tokens": self._cached_tokens(response.usage)},
                 },
             }
 
@@ -100,53 +258,86 @@ class OpenAIProvider(BaseLLMProvider):
             logger.error(f"OpenAI API error: {str(e)}")
             raise
 
+    async def chat_stream(
+        self, messages: list[dict], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream chat completion content deltas using SDK."""
+        try:
+            stream = await self.client.chat.completions.create(
+                **self._request_kwargs(messages, max_tokens), stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            logger.error(f"OpenAI API stream error: {str(e)}")
+            raise
+
 
 class ClaudeProvider(BaseLLMProvider):
     """Anthropic Claude provider using official Anthropic SDK."""
 
-    def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
-        super().__init__(api_key, model, timeout, base_url)
+    sdk_module = "anthropic"
+    system = "anthropic"
 
-        # Initialize Anthropic client
+    def _create_client(self):
+        from anthropic import AsyncAnthropic
+
+        # Initialize async Anthropic client on the shared transport
         client_kwargs = {
-            "api_key": api_key,
-            "timeout": float(timeout),
+            "api_key": self.api_key,
+            "timeout": float(self.timeout),
+            "http_client": get_http_client(),
+            # RetryPolicy is the only retry layer (Retry-After, request deadline, failover)
+            "max_retries": 0,
         }
 
         # Use custom base URL if provided
-        if base_url:
-            client_kwargs["base_url"] = base_url
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+
+        return AsyncAnthropic(**client_kwargs)
+
+    def _request_kwargs(self, messages: list[dict], max_tokens: Optional[int]) -> dict:
+        """Build messages request arguments (Claude expects system separately)."""
+        system_message = None
+        user_messages = []
+
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                user_messages.append({
+                    "role": msg["role"],
+                    "content": msg["content"]
+                })
+
+        kwargs = {
+            "model": self.model,
+            "max_tokens": max_tokens or 1024,
+            "messages": user_messages,
+            "temperature": 0.3,
+        }
 
-        self.client = Anthropic(**client_kwargs)
+        if system_message:
+            if settings.prompt_cache_enabled:
+                # Mark the static system prompt as a cacheable prefix; cache reads are billed at a fraction
+                kwargs["system"] = [
+                    {"type": "text", "text": system_message, "cache_control": {"type": "ephemeral"}}
+                ]
+            else:
+                kwargs["system"] = system_message
+        return kwargs
 
-    async def chat(self, messages: list[dict]) -> LLMResponse:
+    @traced_chat
+    async def chat(self, messages: list[dict], max_tokens: Optional[int] = None) -> LLMResponse:
         """Call Claude messages API using SDK."""
         try:
-            # Convert messages format (Claude expects system separately)
-            system_message = None
-            user_messages = []
-
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                else:
-                    user_messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
-
             # Call Claude API using SDK
-            kwargs = {
-                "model": self.model,
-                "max_tokens": 1024,
-                "messages": user_messages,
-                "temperature": 0.3,
-            }
-
-            if system_message:
-                kwargs["system"] = system_message
-
-            response = self.client.messages.create(**kwargs)
+            response = await self.client.messages.create(
+                **self._request_kwargs(messages, max_tokens)
+            )
 
             content = response.content[0].text
 
@@ -158,6 +349,8 @@ class ClaudeProvider(BaseLLMProvider):
                 "usage": {
                     "input_tokens": response.usage.input_tokens,
                     "output_tokens": response.usage.output_tokens,
+                    "cache_read_input_tokens": getattr(response.usage, "cache_read_input_tokens", None) or 0,
+                    "cache_creation_input_tokens": getattr(response.usage, "cache_creation_input_tokens", None) or 0,
                 },
             }
 
@@ -167,10 +360,27 @@ class ClaudeProvider(BaseLLMProvider):
             logger.error(f"Claude API error: {str(e)}")
             raise
 
+    async def chat_stream(
+        self, messages: list[dict], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream Claude message text deltas using SDK."""
+        try:
+            async with self.client.messages.stream(
+                **self._request_kwargs(messages, max_tokens)
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+        except Exception as e:
+            logger.error(f"Claude API stream error: {str(e)}")
+            raise
+
 
 class DeepSeekProvider(OpenAIProvider):
     """DeepSeek provider (OpenAI-compatible)."""
 
+    system = "deepseek"
+
     def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
         # Set default DeepSeek base URL if not provided
         if not base_url:
@@ -181,6 +391,8 @@ class DeepSeekProvider(OpenAIProvider):
 class QwenProvider(OpenAIProvider):
     """Qwen (Tongyi Qianwen) provider (OpenAI-compatible)."""
 
+    system = "qwen"
+
     def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
         # Set default Qwen base URL if not provided
         if not base_url:
@@ -188,44 +400,372 @@ class QwenProvider(OpenAIProvider):
         super().__init__(api_key, model, timeout, base_url)
 
 
+class MockProviderError(Exception):
+    """Injected upstream failure from the mock provider (treated like a 503)."""
+
+    status_code = 503
+
+
+class MockProvider(BaseLLMProvider):
+    """Local fake LLM for load testing: deterministic JSON, configurable latency and errors.
+
+    Latency follows MOCK_LATENCY_DISTRIBUTION (fixed, uniform, normal, lognormal or
+    exponential) around MOCK_LATENCY_MS; MOCK_ERROR_RATE of calls fail with a 503.
+    A system prompt seen before is reported as cached prompt tokens, like automatic
+    prefix caching.
+    """
+
+    system = "mock"
+
+    def __init__(self, api_key: str, model: str, timeout: int, base_url: str = ""):
+        super().__init__(api_key, model or "mock-model", timeout, base_url)
+        self.random = random.Random(settings.mock_seed)
+        self._seen_prefixes: set[str] = set()
+
+    def _latency(self) -> float:
+        """Draw one call latency in seconds from the configured distribution."""
+        mean = settings.mock_latency_ms / 1000
+        spread = settings.mock_latency_stddev_ms / 1000
+        distribution = settings.mock_latency_distribution
+        if distribution == "uniform":
+            value = self.random.uniform(mean - spread, mean + spread)
+        elif distribution == "normal":
+            value = self.random.gauss(mean, spread)
+        elif distribution == "lognormal" and mean > 0:
+            sigma = (spread / mean) if spread else 0.0
+            value = mean * self.random.lognormvariate(0, sigma)
+        elif distribution == "exponential" and mean > 0:
+            value = self.random.expovariate(1 / mean)
+        else:
+            value = mean
+        return max(0.0, value)
+
+    def _content(self, messages: list[dict]) -> str:
+        """Build a deterministic JSON answer for the prompt (single or packed batch)."""
+        user_prompt = messages[-1]["content"]
+        if "Chinese texts:\n" in user_prompt:
+            try:
+                items = json.loads(user_prompt.split("Chinese texts:\n", 1)[1])
+                return json.dumps({"items": [self._item(item["text"], item["index"]) for item in items]})
+            except (ValueError, KeyError, TypeError):
+                pass
+        text = user_prompt.rsplit("Chinese text:\n", 1)[-1]
+        return json.dumps(self._item(text))
+
+    @staticmethod
+    def _item(text: str, index: Optional[int] = None) -> dict:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+        item = {
+            "translation": f"Mock translation {digest} ({len(text)} chars).",
+            "keywords": ["mock", "translation", digest],
+        }
+        if index is not None:
+            item = {"index": index, **item}
+        return item
+
+    def _usage(self, messages: list[dict]) -> dict:
+        prompt_tokens = sum(len(msg["content"]) for msg in messages) // 2
+        completion_tokens = settings.mock_completion_tokens
+        cached_tokens = 0
+        if messages and messages[0]["role"] == "system":
+            prefix = messages[0]["content"]
+            if prefix in self._seen_prefixes:
+                cached_tokens = len(prefix) // 2
+            self._seen_prefixes.add(prefix)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+    @traced_chat
+    async def chat(self, messages: list[dict], max_tokens: Optional[int] = None) -> LLMResponse:
+        """Sleep for a sampled latency and return a deterministic JSON response."""
+        await asyncio.sleep(self._latency())
+        if self.random.random() < settings.mock_error_rate:
+            raise MockProviderError("Mock provider injected failure")
+
+        content = self._content(messages)
+        raw_response = {
+            "id": "mock",
+            "model": self.model,
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": self._usage(messages),
+        }
+        return LLMResponse(content=content, raw_response=raw_response)
+
+    async def chat_stream(
+        self, messages: list[dict], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream the deterministic response in small chunks spread over the sampled latency."""
+        latency = self._latency()
+        if self.random.random() < settings.mock_error_rate:
+            await asyncio.sleep(latency)
+            raise MockProviderError("Mock provider injected failure")
+
+        content = self._content(messages)
+        pieces = [content[i:i + 8] for i in range(0, len(content), 8)]
+        for piece in pieces:
+            await asyncio.sleep(latency / len(pieces))
+            yield piece
+
+
 class LLMClient:
-    """Main LLM client with provider selection."""
+    """Main LLM client routing requests across one or more configured backends."""
+
+    provider_map = {
+        "openai": OpenAIProvider,
+        "claude": ClaudeProvider,
+        "deepseek": DeepSeekProvider,
+        "qwen": QwenProvider,
+        "mock": MockProvider,
+    }
 
     def __init__(self):
-        self.provider = self._create_provider()
-
-    def _create_provider(self) -> BaseLLMProvider:
-        """Create provider instance based on configuration."""
-        provider_map = {
-            "openai": OpenAIProvider,
-            "claude": ClaudeProvider,
-            "deepseek": DeepSeekProvider,
-            "qwen": QwenProvider,
-        }
+        self.router = ProviderRouter(
+            self._create_backends(),
+            max_attempts=settings.router_max_attempts,
+            failure_threshold=settings.router_failure_threshold,
+            cooldown_seconds=settings.router_cooldown_seconds,
+        )
+        # Fast tier of the model cascade (None unless a fast model is configured)
+        self.fast_router: Optional[ProviderRouter] = None
+        if settings.cascade_enabled and settings.cascade_fast_model:
+            self.fast_router = ProviderRouter(
+                [self._create_fast_backend()],
+                max_attempts=settings.router_max_attempts,
+                failure_threshold=settings.router_failure_threshold,
+                cooldown_seconds=settings.router_cooldown_seconds,
+            )
+        elif settings.cascade_enabled:
+            logger.warning("CASCADE_ENABLED is set but CASCADE_FAST_MODEL is empty; the cascade is off")
+        self.hedging = HedgePolicy(
+            percentile=settings.hedge_percentile,
+            min_delay=settings.hedge_min_delay,
+            max_extra_ratio=settings.hedge_max_extra_ratio,
+        )
+        self.limiter = AdaptiveLimiter(
+            initial_limit=settings.limiter_initial_limit,
+            min_limit=settings.limiter_min_limit,
+            max_limit=settings.limiter_max_limit,
+            backoff_ratio=settings.limiter_backoff_ratio,
+            latency_tolerance=settings.limiter_latency_tolerance,
+            max_queue=settings.limiter_max_queue,
+            queue_timeout=settings.limiter_queue_timeout,
+            background_share=settings.limiter_background_share,
+        )
 
-        provider_class = provider_map.get(settings.llm_provider)
+    def _create_provider(
+        self, provider: str, api_key: str, model: str, timeout: int, base_url: str
+    ) -> BaseLLMProvider:
+        """Create provider instance for one backend."""
+        provider_class = self.provider_map.get(provider)
         if not provider_class:
-            raise ValueError(f"Unsupported LLM provider: {settings.llm_provider}")
+            raise ValueError(f"Unsupported LLM provider: {provider}")
 
-        logger.info(f"Initializing LLM provider: {settings.llm_provider}")
-        logger.info(f"Model: {settings.llm_model}")
-        if settings.llm_base_url:
-            logger.info(f"Base URL: {settings.llm_base_url}")
+        logger.info(f"Initializing LLM provider: {provider}")
+        logger.info(f"Model: {model}")
+        if base_url:
+            logger.info(f"Base URL: {base_url}")
 
         return provider_class(
-            api_key=settings.llm_api_key,
-            model=settings.llm_model,
-            timeout=settings.llm_timeout,
-            base_url=settings.llm_base_url,
+            api_key=api_key,
+            model=model,
+            timeout=timeout,
+            base_url=base_url,
         )
 
-    async def chat(self, messages: list[dict]) -> LLMResponse:
-        """Send chat request through configured provider."""
+    def _create_backends(self) -> list[Backend]:
+        """Create the primary backend from LLM_* settings plus any LLM_BACKENDS entries."""
+        backends = [
+            Backend(
+                name=settings.llm_provider,
+                provider=self._create_provider(
+                    settings.llm_provider,
+                    settings.llm_api_key,
+                    settings.llm_model,
+                    settings.llm_timeout,
+                    settings.llm_base_url,
+                ),
+                provider_name=settings.llm_provider,
+                weight=settings.llm_weight,
+            )
+        ]
+        for config in settings.llm_backends:
+            backends.append(
+                Backend(
+                    name=config.name,
+                    provider=self._create_provider(
+                        config.provider,
+                        config.api_key,
+                        config.model,
+                        config.timeout,
+                        config.base_url,
+                    ),
+                    provider_name=config.provider,
+                    weight=config.weight,
+                )
+            )
+        return backends
+
+    def _create_fast_backend(self) -> Backend:
+        """Create the cascade's fast-tier backend, defaulting to the primary provider's settings."""
+        provider = settings.cascade_fast_provider or settings.llm_provider
+        base_url = settings.cascade_fast_base_url
+        if not base_url and provider == settings.llm_provider:
+            base_url = settings.llm_base_url
+        return Backend(
+            name=f"fast:{provider}",
+            provider=self._create_provider(
+                provider,
+                settings.cascade_fast_api_key or settings.llm_api_key,
+                settings.cascade_fast_model,
+                settings.llm_timeout,
+                base_url,
+            ),
+            provider_name=provider,
+        )
+
+    @property
+    def backends(self) -> list[Backend]:
+        """Every configured backend, fast tier included."""
+        return self.router.backends + (self.fast_router.backends if self.fast_router else [])
+
+    def _router(self, tier: str) -> ProviderRouter:
+        """Router of a cascade tier; the strong tier (and a fast tier without a fast model) is the main one."""
+        return self.fast_router if tier == "fast" and self.fast_router else self.router
+
+    def tier_backend(self, tier: str) -> Backend:
+        """First backend of a cascade tier (the primary backend for the strong tier)."""
+        return self._router(tier).backends[0]
+
+    def preload(self) -> list[str]:
+        """
+        Import the SDKs of the configured backends without building any client.
+
+        serve.py calls this before forking so workers share the imported modules;
+        clients (and their HTTP transport) are still created in each worker.
+        """
+        modules = sorted({b.provider.sdk_module for b in self.backends if b.provider.sdk_module})
+        for module in modules:
+            importlib.import_module(module)
+        return modules
+
+    def warmup(self):
+        """Build every backend's SDK client (called on startup, off the request path)."""
+        for backend in self.backends:
+            backend.provider.warmup()
+
+    @staticmethod
+    def _estimate_usage(messages: list[dict]) -> int:
+        """Estimate total tokens of a call (prompt plus a similar-sized answer) for budgeting."""
+        return 2 * sum(estimate_tokens(msg["content"]) for msg in messages)
+
+    def _slot(self, acquired: bool = False):
+        """Concurrency slot for one upstream call (a no-op when the limiter is disabled)."""
+        return self.limiter.slot(acquired) if settings.limiter_enabled else nullcontext()
+
+    def _admit_hedge(self) -> bool:
+        """Take a concurrency slot for a hedge if one is free now; hedges never queue."""
+        return not settings.limiter_enabled or self.limiter.try_acquire()
+
+    async def chat(
+        self, messages: list[dict], max_tokens: Optional[int] = None, tier: str = "strong"
+    ) -> LLMResponse:
+        """
+        Send chat request through the router, hedging slow attempts if enabled.
+
+        tier selects the model cascade tier ("fast" or "strong").
+        """
+        # Reject quickly when the calling client is over its budget
+        client_id = get_client_id()
+        estimated = self._estimate_usage(messages)
+        await usage_tracker.reserve(client_id, estimated)
+        router = self._router(tier)
+
+        try:
+            waiting_since = time.time_ns()
+            async with self._slot():
+                tracer.child(current_span_var.get(), "llm.acquire_slot", waiting_since, time.time_ns())
+                start = time.perf_counter()
+                if not settings.hedge_enabled:
+                    response = await router.chat(messages, max_tokens=max_tokens)
+                else:
+                    # The hedge prefers a different backend than the one still pending
+                    attempted: list[str] = []
+
+                    async def hedge() -> LLMResponse:
+                        # Holds the slot _admit_hedge took; entered on the task's first step
+                        async with self._slot(acquired=True):
+                            return await router.chat(messages, max_tokens=max_tokens, avoid=set(attempted))
+
+                    response = await self.hedging.run(
+                        lambda: router.chat(messages, max_tokens=max_tokens, attempted=attempted),
+                        hedge,
+                        admit=self._admit_hedge,
+                    )
+                metrics.tier_duration.observe(time.perf_counter() - start, tier=tier)
+        except BaseException as e:
+            await usage_tracker.settle(client_id, estimated, 0)
+            if isinstance(e, Exception) and not isinstance(e, OverloadedError):
+                logger.error(f"LLM client error: {str(e)}")
+            raise
+
+        prompt_tokens, completion_tokens = response.usage()
+        await usage_tracker.settle(client_id, estimated, prompt_tokens + completion_tokens)
+        usage_tracker.record(
+            client_id,
+            response.model or settings.llm_model,
+            prompt_tokens,
+            completion_tokens,
+            response.cached_tokens(),
+        )
+        return response
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        max_tokens: Optional[int] = None,
+        tier: str = "strong",
+        answered: Optional[list[str]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text deltas through the router of a cascade tier.
+
+        The name of the backend that streams the answer is appended to answered.
+
+        Streams carry no usage data, so the reservation is settled with the estimated
+        prompt plus the estimated tokens of the streamed deltas once the stream ends,
+        fails or is cancelled; nothing is charged when no delta arrived.
+        """
+        client_id = get_client_id()
+        estimated = self._estimate_usage(messages)
+        await usage_tracker.reserve(client_id, estimated)
+        router = self._router(tier)
+
+        deltas: list[str] = []
         try:
-            return await self.provider.chat(messages)
+            async with self._slot():
+                start = time.perf_counter()
+                async for delta in router.chat_stream(messages, max_tokens=max_tokens, answered=answered):
+                    deltas.append(delta)
+                    yield delta
+                metrics.tier_duration.observe(time.perf_counter() - start, tier=tier)
         except Exception as e:
-            logger.error(f"LLM client error: {str(e)}")
+            if not isinstance(e, OverloadedError):
+                logger.error(f"LLM client stream error: {str(e)}")
             raise
+        finally:
+            prompt_tokens = estimated // 2 if deltas else 0
+            completion_tokens = estimate_tokens("".join(deltas))
+            await usage_tracker.settle(client_id, estimated, prompt_tokens + completion_tokens)
+            if deltas:
+                usage_tracker.record(client_id, self.tier_backend(tier).model, prompt_tokens, completion_tokens)
+
+    async def aclose(self):
+        """Release pooled HTTP connections."""
+        await close_http_client()
 
 
 # Global LLM client instance
@@ -0,0 +1,301 @@
+"""
+Multi-backend LLM router.
+Picks a backend per request from weighted, latency/error-aware scores and fails
+over to the next backend on timeouts, connection errors, 429s and 5xx errors.
+"""
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+import httpx
+
+from config import settings
+from utils import metrics
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from services.llm_client import BaseLLMProvider, LLMResponse
+
+logger = get_logger(__name__)
+
+_RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError", "TimeoutError"}
+
+# Backends that answered the current request's LLM calls, in order. A list set per
+# request (by the metrics middleware) and appended to, so it survives context copies.
+answered_by_var: ContextVar[Optional[list["Backend"]]] = ContextVar("answered_by", default=None)
+
+
+def answered_labels() -> dict[str, str]:
+    """Provider/model labels of the backend that last answered this request (the primary if none did)."""
+    answered = answered_by_var.get()
+    if answered:
+        return {"provider": answered[-1].provider_name, "model": answered[-1].model}
+    return {"provider": settings.llm_provider, "model": settings.llm_model}
+
+
+def _record_answer(backend: "Backend"):
+    answered = answered_by_var.get()
+    if answered is not None:
+        answered.append(backend)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether an upstream error should fail over to another backend."""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if type(error).__name__ in _RETRYABLE_ERROR_NAMES:
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+class Backend:
+    """One configured upstream (provider + model + key) with health statistics."""
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, provider: "BaseLLMProvider", provider_name: str, weight: float = 1.0):
+        self.name = name
+        self.provider = provider
+        self.provider_name = provider_name
+        self.weight = weight
+
+        self.latency_ewma: Optional[float] = None  # Seconds, successful calls only
+        self.error_rate_ewma = 0.0
+        self.in_flight = 0
+        self.selected = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def model(self) -> str:
+        return self.provider.model
+
+    def healthy(self, now: float) -> bool:
+        """Whether the backend is outside its failure cooldown."""
+        return now >= self.unhealthy_until
+
+    def record_success(self, latency: float):
+        """Update estimates after a successful call."""
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.EWMA_ALPHA * (latency - self.latency_ewma)
+        self.error_rate_ewma *= 1 - self.EWMA_ALPHA
+
+    def record_failure(self, failure_threshold: int, cooldown: float):
+        """Update estimates after a failed call; open the cooldown after repeated failures."""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate_ewma += self.EWMA_ALPHA * (1 - self.error_rate_ewma)
+        if self.consecutive_failures >= failure_threshold:
+            self.unhealthy_until = time.monotonic() + cooldown
+            logger.warning(
+                f"Backend {self.name} marked unhealthy for {cooldown:.0f}s "
+                f"after {self.consecutive_failures} consecutive failures"
+            )
+
+    def score(self, default_latency: float) -> float:
+        """Selection weight: configured weight, discounted by latency and error rate."""
+        latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+        return self.weight / (max(latency, 0.001) * (1 + 10 * self.error_rate_ewma) * (1 + self.in_flight))
+
+    def stats(self) -> dict:
+        """Return health and selection statistics."""
+        return {
+            "name": self.name,
+            "provider": self.provider_name,
+            "model": self.model,
+            "weight": self.weight,
+            "healthy": self.healthy(time.monotonic()),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "error_rate_ewma": round(self.error_rate_ewma, 4),
+            "in_flight": self.in_flight,
+            "selected": self.selected,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ProviderRouter:
+    """Route requests across backends with weighted, latency-aware selection and failover."""
+
+    def __init__(
+        self,
+        backends: list[Backend],
+        max_attempts: int = 3,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+    ):
+        if not backends:
+            raise ValueError("At least one LLM backend is required")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.backends = backends
+        self.max_attempts = max_attempts
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failovers = 0
+
+    def candidates(self, avoid: Optional[set[str]] = None) -> list[Backend]:
+        """
+        Order backends for one request.
+
+        The first backend is drawn at random in proportion to its score (so
+        weights split traffic and slow/erroring backends receive less); the rest
+        follow by descending score for failover. When no healthy backend has a
+        positive score, the first one is drawn uniformly. Backends in cooldown go
+        last, and backends named in avoid are only used when nothing else is left.
+        """
+        now = time.monotonic()
+        known = [b.latency_ewma for b in self.backends if b.latency_ewma is not None]
+        default_latency = sum(known) / len(known) if known else 1.0
+
+        healthy = [b for b in self.backends if b.healthy(now)]
+        unhealthy = [b for b in self.backends if not b.healthy(now)]
+        scores = {b.name: b.score(default_latency) for b in self.backends}
+
+        ordered: list[Backend] = []
+        if healthy:
+            weights = [scores[b.name] for b in healthy]
+            if sum(weights) > 0:
+                first = random.choices(healthy, weights=weights)[0]
+            else:
+                first = random.choice(healthy)
+            ordered.append(first)
+            ordered.extend(
+                sorted((b for b in healthy if b is not first), key=lambda b: -scores[b.name])
+            )
+        ordered.extend(sorted(unhealthy, key=lambda b: b.unhealthy_until))
+        if avoid:
+            ordered.sort(key=lambda b: b.name in avoid)
+        return ordered[: self.max_attempts]
+
+    async def call_backend(
+        self, backend: Backend, messages: list[dict], max_tokens: Optional[int] = None
+    ) -> "LLMResponse":
+        """Call one backend and record its outcome."""
+        labels = {"provider": backend.provider_name, "model": backend.model}
+        backend.selected += 1
+        backend.in_flight += 1
+        metrics.llm_in_flight.inc(**labels)
+        start = time.perf_counter()
+        try:
+            response = await backend.provider.chat(messages, max_tokens=max_tokens)
+        except asyncio.CancelledError:
+            metrics.llm_call_duration.observe(time.perf_counter() - start, outcome="cancelled", **labels)
+            raise
+        except Exception:
+            metrics.llm_call_duration.observe(time.perf_counter() - start, outcome="error", **labels)
+            backend.record_failure(self.failure_threshold, self.cooldown_seconds)
+            raise
+        finally:
+            backend.in_flight -= 1
+            metrics.llm_in_flight.dec(**labels)
+        elapsed = time.perf_counter() - start
+        metrics.llm_call_duration.observe(elapsed, outcome="success", **labels)
+        backend.record_success(elapsed)
+        _record_answer(backend)
+
+        prompt_tokens, completion_tokens = response.usage()
+        metrics.llm_tokens_total.inc(prompt_tokens, type="prompt", **labels)
+        metrics.llm_tokens_total.inc(completion_tokens, type="completion", **labels)
+        metrics.llm_tokens_total.inc(response.cached_tokens(), type="cached_prompt", **labels)
+
+        response.backend = backend.name
+        response.provider = backend.provider_name
+        response.model = backend.model
+        return response
+
+    async def chat(
+        self,
+        messages: list[dict],
+        max_tokens: Optional[int] = None,
+        avoid: Optional[set[str]] = None,
+        attempted: Optional[list[str]] = None,
+    ) -> "LLMResponse":
+        """
+        Send a chat request, failing over across backends on retryable errors.
+
+        Args:
+            messages: Chat messages
+            max_tokens: Optional output token limit
+            avoid: Backend names to try last (e.g. the one a hedged request is waiting on)
+            attempted: If given, backend names are appended as they are tried
+        """
+        last_error: Optional[BaseException] = None
+        for backend in self.candidates(avoid):
+            if attempted is not None:
+                attempted.append(backend.name)
+            try:
+                return await self.call_backend(backend, messages, max_tokens=max_tokens)
+            except Exception as e:
+                last_error = e
+                if not is_retryable_error(e):
+                    raise
+                self.failovers += 1
+                logger.warning(f"Backend {backend.name} failed ({type(e).__name__}), failing over")
+        if last_error is None:
+            raise RuntimeError("No LLM backend was tried")
+        raise last_error
+
+    async def chat_stream(
+        self, messages: list[dict], max_tokens: Optional[int] = None, answered: Optional[list[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat response; fail over only while nothing has been yielded yet.
+
+        The name of the backend that starts streaming is appended to answered.
+        """
+        last_error: Optional[BaseException] = None
+        for backend in self.candidates():
+            labels = {"provider": backend.provider_name, "model": backend.model}
+            backend.selected += 1
+            backend.in_flight += 1
+            metrics.llm_in_flight.inc(**labels)
+            start = time.perf_counter()
+            started = False
+            try:
+                async for delta in backend.provider.chat_stream(messages, max_tokens=max_tokens):
+                    if not started:
+                        started = True
+                        _record_answer(backend)
+                        if answered is not None:
+                            answered.append(backend.name)
+                    yield delta
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.llm_call_duration.observe(time.perf_counter() - start, outcome="error", **labels)
+                backend.record_failure(self.failure_threshold, self.cooldown_seconds)
+                last_error = e
+                if started or not is_retryable_error(e):
+                    raise
+                self.failovers += 1
+                logger.warning(f"Backend {backend.name} stream failed ({type(e).__name__}), failing over")
+                continue
+            finally:
+                backend.in_flight -= 1
+                metrics.llm_in_flight.dec(**labels)
+            elapsed = time.perf_counter() - start
+            metrics.llm_call_duration.observe(elapsed, outcome="success", **labels)
+            backend.record_success(elapsed)
+            return
+        if last_error is None:
+            raise RuntimeError("No LLM backend was tried")
+        raise last_error
+
+    def stats(self) -> dict:
+        """Return per-backend health and selection statistics."""
+        return {
+            "failovers": self.failovers,
+            "backends": [b.stats() for b in self.backends],
+        }
@@ -0,0 +1,263 @@
+"""
+Near-duplicate lookup for previously translated source texts.
+Folds away width, case, punctuation and (optionally) traditional/simplified
+differences, then finds similar texts with a MinHash/LSH index over character n-grams.
+"""
+import re
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+from config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+# Characters that change what a text says however similar the rest is: digits,
+# Chinese numerals and negations. Matches must contain exactly the same sequence.
+_GUARD_RE = re.compile(r"[0-9〇零一二三四五六七八九十百千万亿两不没沒无無非未别莫勿]")
+_MASK64 = (1 << 64) - 1
+_EMPTY = 0xFFFFFFFF
+
+
+def load_variant_map(path: str) -> dict[int, str]:
+    """
+    Load a character variant table (e.g. traditional -> simplified) as a str.translate map.
+
+    Lines are "source<TAB>target [alternatives...]", the format of OpenCC's
+    STCharacters.txt; only the first target is used.
+    """
+    table: dict[int, str] = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 2 and len(parts[0]) == 1 and parts[1]:
+            table[ord(parts[0])] = parts[1].split(" ")[0]
+    return table
+
+
+def fold_text(text: str, variants: Optional[dict[int, str]] = None) -> str:
+    """
+    Fold text for near-duplicate matching.
+
+    Applies NFKC (full-width/half-width and compatibility forms), case folding,
+    an optional character variant map, and drops punctuation, symbols and whitespace.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if variants:
+        text = text.translate(variants)
+    return _NON_WORD_RE.sub("", text)
+
+
+class NearDuplicateIndex:
+    """
+    Bounded MinHash/LSH index from folded source texts to translation cache keys.
+
+    Signatures use one-permutation MinHash: each character n-gram is hashed once
+    and kept as the minimum of one of num_perm bins, with empty bins filled by
+    rotation, so signing is linear in the text length. Signatures are split into
+    bands; texts sharing any band are candidates, verified by the fraction of equal
+    signature positions (an estimate of n-gram Jaccard similarity). Entries are
+    evicted least recently used beyond max_entries.
+
+    Each entry belongs to a namespace (the prompt version of its cached result);
+    lookups only match entries of their own namespace. A match must also have the
+    same digits, numerals and negations in the same order ("不能" vs "能", "3天"
+    vs "5天"), since those are the small changes that flip a translation.
+    """
+
+    MAX_BUCKET = 16  # Most recent entries kept per LSH bucket
+    MAX_CANDIDATES = 64  # Candidates verified per lookup
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold: float = 0.9,
+        max_entries: int = 100000,
+        ngram: int = 3,
+        num_perm: int = 64,
+        bands: int = 8,
+        variants: Optional[dict[int, str]] = None,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.variants = variants
+
+        # entry id -> (cache key, signature bytes, shingle count, namespace, guard characters)
+        self._entries: OrderedDict[int, tuple[str, bytes, int, str, str]] = OrderedDict()
+        self._ids_by_key: dict[str, int] = {}
+        # Band key -> entry id, or a list of ids once several entries share it
+        self._buckets: dict[int, Union[int, list[int]]] = {}
+        self._next_id = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _shingles(self, folded: str) -> set[str]:
+        n = self.ngram
+        if len(folded) <= n:
+            return {folded}
+        return {folded[i:i + n] for i in range(len(folded) - n + 1)}
+
+    def signature(self, folded: str) -> tuple[bytes, int]:
+        """Return the MinHash signature of a folded text and its n-gram count."""
+        k = self.num_perm
+        sig = [_EMPTY] * k
+        shingles = self._shingles(folded)
+        for shingle in shingles:
+            h = hash(shingle) & _MASK64
+            b = h % k
+            v = (h // k) & 0x7FFFFFFF
+            if v < sig[b]:
+                sig[b] = v
+
+        # Rotation densification: an empty bin borrows the next filled bin's value
+        if _EMPTY in sig:
+            for i in range(k):
+                if sig[i] == _EMPTY:
+                    for step in range(1, k):
+                        value = sig[(i + step) % k]
+                        if value != _EMPTY and value < 0x80000000:
+                            sig[i] = 0x80000000 | (step << 24) | (value & 0xFFFFFF)
+                            break
+        return array("I", sig).tobytes(), len(shingles)
+
+    def _band_keys(self, sig: bytes, namespace: str) -> list[int]:
+        width = self.rows * 4
+        return [hash((namespace, i, sig[i * width:(i + 1) * width])) for i in range(self.bands)]
+
+    def similarity(self, a: bytes, b: bytes) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        equal = sum(x == y for x, y in zip(array("I", a), array("I", b)))
+        return equal / self.num_perm
+
+    def lookup(self, text: str, namespace: str = "") -> Optional[tuple[str, float]]:
+        """Return (cache key, similarity) of the most similar text of a namespace above the threshold."""
+        if not self.enabled or not self._entries:
+            return None
+        folded = fold_text(text, self.variants)
+        if not folded:
+            return None
+        sig, size = self.signature(folded)
+        guard = "".join(_GUARD_RE.findall(folded))
+
+        seen: set[int] = set()
+        best: Optional[tuple[int, float]] = None
+        for key in self._band_keys(sig, namespace):
+            bucket = self._buckets.get(key, ())
+            for entry_id in (bucket,) if isinstance(bucket, int) else bucket:
+                if entry_id in seen or len(seen) >= self.MAX_CANDIDATES:
+                    continue
+                seen.add(entry_id)
+                _, other_sig, other_size, other_namespace, other_guard = self._entries[entry_id]
+                if other_namespace != namespace or other_guard != guard:
+                    continue
+                # Jaccard similarity cannot exceed the ratio of the n-gram counts
+                if min(size, other_size) < self.threshold * max(size, other_size):
+                    continue
+                score = self.similarity(sig, other_sig)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (entry_id, score)
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(best[0])
+        return self._entries[best[0]][0], best[1]
+
+    def add(self, text: str, cache_key: str, namespace: str = ""):
+        """Index a translated source text under its cache key, in a namespace."""
+        if not self.enabled:
+            return
+        existing = self._ids_by_key.get(cache_key)
+        if existing is not None:
+            self._entries.move_to_end(existing)
+            return
+        folded = fold_text(text, self.variants)
+        if not folded:
+            return
+        sig, size = self.signature(folded)
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (cache_key, sig, size, namespace, "".join(_GUARD_RE.findall(folded)))
+        self._ids_by_key[cache_key] = entry_id
+        for key in self._band_keys(sig, namespace):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = entry_id
+            elif isinstance(bucket, int):
+                self._buckets[key] = [bucket, entry_id]
+            else:
+                bucket.append(entry_id)
+                if len(bucket) > self.MAX_BUCKET:
+                    del bucket[0]
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def discard(self, cache_key: str):
+        """Remove the entry for a cache key (e.g. after the cached result expired)."""
+        entry_id = self._ids_by_key.get(cache_key)
+        if entry_id is not None:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        cache_key, sig, _, namespace, _ = entry
+        self._ids_by_key.pop(cache_key, None)
+        for key in self._band_keys(sig, namespace):
+            bucket = self._buckets.get(key)
+            if bucket == entry_id:
+                del self._buckets[key]
+            elif isinstance(bucket, list) and entry_id in bucket:
+                bucket.remove(entry_id)
+                if len(bucket) == 1:
+                    self._buckets[key] = bucket[0]
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self._ids_by_key.clear()
+        self._buckets.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Return lookup counters and index size."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global near-duplicate index instance
+near_duplicate_index = NearDuplicateIndex(
+    enabled=settings.cache_enabled and settings.near_dup_enabled,
+    threshold=settings.near_dup_threshold,
+    max_entries=settings.near_dup_max_entries,
+    ngram=settings.near_dup_ngram,
+    num_perm=settings.near_dup_num_perm,
+    bands=settings.near_dup_bands,
+    variants=load_variant_map(settings.near_dup_variant_map) if settings.near_dup_variant_map else None,
+)
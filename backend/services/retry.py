@@ -0,0 +1,181 @@
+"""
+Retry policy for LLM operations.
+Per-error-class attempt limits, capped exponential backoff with full jitter,
+Retry-After support and a per-request deadline that retries never exceed.
+"""
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from config import settings
+from services.llm_router import is_retryable_error
+from utils import metrics
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Monotonic deadline of the current request (None = no deadline)
+deadline_var: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def set_deadline(timeout: Optional[float] = None) -> float:
+    """Set the request deadline to now + timeout, capped by RETRY_DEADLINE_SECONDS."""
+    budget = settings.retry_deadline_seconds
+    if timeout is not None and timeout > 0:
+        budget = min(budget, timeout)
+    deadline = time.monotonic() + budget
+    deadline_var.set(deadline)
+    return deadline
+
+
+def get_deadline() -> Optional[float]:
+    """Get the current request deadline."""
+    return deadline_var.get()
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before an LLM operation completes."""
+
+    pass
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read a Retry-After (or retry-after-ms) hint from an upstream error response."""
+    hint = getattr(error, "retry_after", None)
+    if isinstance(hint, (int, float)):
+        return float(hint)
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            when = parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Retry LLM operations by error class.
+
+    Classes: "rate_limit" (429, waits at least the Retry-After hint), "transport"
+    (timeouts, connection errors, 5xx) and "malformed" (unusable response, retried
+    at once so the caller can send a repair prompt). Each class has its own
+    attempt limit. No retry is started that could not finish before the deadline.
+    """
+
+    def __init__(
+        self,
+        transport_attempts: int = 3,
+        rate_limit_attempts: int = 4,
+        malformed_attempts: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.max_attempts = {
+            "transport": transport_attempts,
+            "rate_limit": rate_limit_attempts,
+            "malformed": malformed_attempts,
+        }
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def classify(self, error: BaseException, malformed: tuple[type, ...] = ()) -> Optional[str]:
+        """Return the retry class of an error, or None if it should not be retried."""
+        if malformed and isinstance(error, malformed):
+            return "malformed"
+        if getattr(error, "status_code", None) == 429:
+            return "rate_limit"
+        if is_retryable_error(error):
+            return "transport"
+        return None
+
+    def backoff(self, reason: str, retry: int, error: BaseException) -> float:
+        """Delay before retry number `retry` (1-based) of an error class."""
+        if reason == "malformed":
+            return 0.0
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+        hint = retry_after_seconds(error) if reason == "rate_limit" else None
+        return max(delay, hint) if hint is not None else delay
+
+    async def run(
+        self,
+        attempt: Callable[[int, Optional[BaseException]], Awaitable[T]],
+        operation: str,
+        malformed: tuple[type, ...] = (),
+    ) -> T:
+        """
+        Call attempt(number, previous_error) until it succeeds or retries are exhausted.
+
+        Args:
+            attempt: Coroutine function performing one try; receives the 1-based
+                attempt number and the previous attempt's error (None at first)
+            operation: Label for attempt metrics
+            malformed: Exception types meaning an unusable response (repair retry)
+
+        Raises:
+            The last attempt's error, or DeadlineExceededError
+        """
+        deadline = get_deadline()
+        failures: dict[str, int] = {}
+        previous: Optional[BaseException] = None
+        number = 0
+        try:
+            while True:
+                number += 1
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceededError("Request deadline exceeded")
+                try:
+                    if remaining is None:
+                        return await attempt(number, previous)
+                    return await asyncio.wait_for(attempt(number, previous), timeout=remaining)
+                except Exception as e:
+                    timed_out = isinstance(e, (TimeoutError, asyncio.TimeoutError))
+                    if timed_out and deadline is not None and time.monotonic() >= deadline:
+                        raise DeadlineExceededError("Request deadline exceeded")
+                    # Other timeouts (a provider's own, or the builtin TimeoutError) are transport errors
+                    reason = self.classify(e, malformed)
+                    if reason is None:
+                        raise
+                    failures[reason] = failures.get(reason, 0) + 1
+                    if failures[reason] >= self.max_attempts[reason]:
+                        raise
+                    delay = self.backoff(reason, failures[reason], e)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        logger.warning(f"Not retrying {operation} ({reason}): deadline too close")
+                        raise
+                    metrics.llm_retries.inc(operation=operation, reason=reason)
+                    logger.warning(
+                        f"Retrying {operation} after {reason} error in {delay:.2f}s "
+                        f"(attempt {number + 1}): {str(e)}"
+                    )
+                    previous = e
+                    if delay:
+                        await asyncio.sleep(delay)
+        finally:
+            metrics.llm_attempts.observe(number, operation=operation)
+
+
+# Global retry policy instance
+retry_policy = RetryPolicy(
+    transport_attempts=settings.retry_transport_attempts,
+    rate_limit_attempts=settings.retry_rate_limit_attempts,
+    malformed_attempts=settings.retry_malformed_attempts,
+    base_delay=settings.retry_base_delay,
+    max_delay=settings.retry_max_delay,
+)
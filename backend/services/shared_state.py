@@ -0,0 +1,112 @@
+"""
+State shared by worker processes in multi-worker mode (serve.py).
+A directory (SHARED_STATE_DIR) holds SQLite files for the persistent cache tier,
+translation memory and budget token buckets, and per-worker metric snapshots.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from config import settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def shared_path(name: str) -> str:
+    """Path of a file in the shared state directory, or "" when not running multi-worker."""
+    if not settings.shared_state_dir:
+        return ""
+    return os.path.join(settings.shared_state_dir, name)
+
+
+class SharedStateStore:
+    """SQLite-backed token buckets that every worker process updates atomically."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+        # Connections must not be shared across fork(); workers open their own
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def update_bucket(
+        self,
+        key: str,
+        capacity: float,
+        rate: float,
+        change: Callable[[float], Tuple[float, float]],
+    ) -> float:
+        """
+        Refill a bucket and apply change(tokens) -> (new tokens, result) in one transaction.
+
+        Returns the result of change.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+                tokens, result = change(tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+
+class SharedTokenBucket:
+    """Token bucket with the TokenBucket interface whose balance lives in the shared store."""
+
+    def __init__(self, store: SharedStateStore, key: str, capacity: float, rate: float):
+        self.store = store
+        self.key = key
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+
+    def _refill(self):
+        self.tokens = self.store.update_bucket(
+            self.key, self.capacity, self.rate, lambda tokens: (tokens, tokens)
+        )
+
+    def try_consume(self, amount: float) -> float:
+        """Consume amount if available and return 0, else return seconds until it would be."""
+        amount = min(amount, self.capacity)  # A single oversized call may drain a full bucket
+
+        def consume(tokens: float) -> Tuple[float, float]:
+            if tokens >= amount:
+                return tokens - amount, 0.0
+            needed = amount - tokens
+            return tokens, needed / self.rate if self.rate > 0 else float("inf")
+
+        return self.store.update_bucket(self.key, self.capacity, self.rate, consume)
+
+    def adjust(self, amount: float):
+        """Add (refund) or remove (charge) tokens; the balance may go negative."""
+        self.store.update_bucket(
+            self.key, self.capacity, self.rate, lambda tokens: (min(self.capacity, tokens + amount), 0.0)
+        )
+
+
+# Global shared state store (None unless SHARED_STATE_DIR is set)
+shared_state: Optional[SharedStateStore] = (
+    SharedStateStore(shared_path("state.sqlite")) if settings.shared_state_dir else None
+)
@@ -0,0 +1,84 @@
+"""
+Single-flight request coalescing.
+Concurrent callers with the same key share one in-flight upstream call.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One in-flight call and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key.
+
+    The first caller for a key starts the work as a separate task; later callers
+    await the same task. A result or exception is delivered to every waiter.
+    A waiter that is cancelled, or whose own deadline passes, only stops waiting;
+    the shared task is cancelled once no waiters remain, and its cancellation
+    propagates to all of them.
+
+    The task runs in the first caller's context (its client, deadline and
+    priority), so callers must only share a key when that context is
+    interchangeable for them.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]], deadline: Optional[float] = None) -> T:
+        """
+        Run fn() once per key among concurrent callers and return its result.
+
+        With a deadline (time.monotonic() value), this caller stops waiting and gets
+        TimeoutError when it passes, whatever deadline the shared task runs under.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = _Flight(task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced request onto in-flight call ({flight.waiters} waiting)")
+
+        flight.waiters += 1
+        try:
+            if deadline is None:
+                return await asyncio.shield(flight.task)
+            return await asyncio.wait_for(asyncio.shield(flight.task), max(0.0, deadline - time.monotonic()))
+        except (asyncio.CancelledError, TimeoutError):
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        """Return coalescing counters."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,74 @@
+"""
+Incremental parser for streamed LLM JSON responses.
+Extracts the "translation" string value from a partially received
+{"translation": ..., "keywords": [...]} object as text deltas arrive.
+"""
+import json
+import re
+
+_TRANSLATION_KEY_RE = re.compile(r'"translation"\s*:\s*"')
+_HEX = set("0123456789abcdefABCDEF")
+
+
+class IncrementalTranslationParser:
+    """
+    Feed raw response chunks and get back newly decoded translation text.
+
+    Escape sequences split across chunk boundaries (including surrogate pairs)
+    are held back until complete. The full buffer remains available for
+    strict parsing once the stream ends.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._value_start = -1  # Index of the first char of the translation value
+        self._pos = -1  # Next undecoded index inside the translation value
+        self.done = False  # Closing quote of the translation value seen
+
+    def feed(self, chunk: str) -> str:
+        """Append a chunk and return any newly decoded translation text."""
+        self.buffer += chunk
+        if self.done:
+            return ""
+
+        if self._value_start < 0:
+            match = _TRANSLATION_KEY_RE.search(self.buffer)
+            if not match:
+                return ""
+            self._value_start = self._pos = match.end()
+
+        end = self._scan_safe_end()
+        raw = self.buffer[self._pos:end]
+        self._pos = end
+        if end < len(self.buffer) and self.buffer[end] == '"':
+            self.done = True
+        return json.loads(f'"{raw}"', strict=False) if raw else ""
+
+    def _scan_safe_end(self) -> int:
+        """Find the end of the decodable part of the value (closing quote or incomplete escape)."""
+        buffer = self.buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                return i
+            if char != "\\":
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                return i
+            if buffer[i + 1] != "u":
+                i += 2
+                continue
+            # \uXXXX escape, possibly the high half of a surrogate pair
+            digits = buffer[i + 2:i + 6]
+            if len(digits) < 4 or not set(digits) <= _HEX:
+                return i
+            if 0xD800 <= int(digits, 16) <= 0xDBFF:
+                low = buffer[i + 6:i + 12]
+                if len(low) < 6:
+                    return i
+                i += 12
+            else:
+                i += 6
+        return i
@@ -0,0 +1,216 @@
+"""
+Translation memory of sentence pairs.
+SQLite-backed store of previously translated segments keyed by normalized source
+text, with TMX 1.4 import and export.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from contextvars import ContextVar
+from io import BytesIO
+from typing import Iterator, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from config import settings
+from services.cache import normalize_text
+from services.shared_state import shared_path
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (translation, keywords); keywords are empty for segments imported from TMX
+Segment = Tuple[str, list[str]]
+
+# (reused segments, total segments) of the current request, set by the translator
+segment_reuse_var: ContextVar[Optional[Tuple[int, int]]] = ContextVar("segment_reuse", default=None)
+
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def segment_key(source: str) -> str:
+    """Key a source segment by its normalized text."""
+    return hashlib.sha256(normalize_text(source).encode("utf-8")).hexdigest()
+
+
+def _lang_matches(lang: str, wanted: str) -> bool:
+    """Compare language tags by primary subtag (zh-CN matches zh, zh-TW, ...)."""
+    return lang.split("-")[0].lower() == wanted.split("-")[0].lower()
+
+
+def _seg_text(seg: ElementTree.Element) -> str:
+    """Text of a TMX <seg>, skipping inline markup content (native codes) but keeping tails."""
+    parts = [seg.text or ""]
+    for child in seg:
+        parts.append(child.tail or "")
+    return "".join(parts).strip()
+
+
+class TranslationMemory:
+    """Persistent sentence-pair store with counters for reuse reporting."""
+
+    LOOKUP_BATCH = 500  # Keys per SELECT ... IN (...)
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        path: str = "",
+        source_lang: str = "zh-CN",
+        target_lang: str = "en-US",
+    ):
+        self.enabled = enabled
+        self.path = path or ":memory:"
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self._lock = threading.Lock()
+        self._connect()
+        if path:
+            logger.info(f"Translation memory: {path}")
+            # Connections must not be shared across fork(); workers open their own
+            os.register_at_fork(after_in_child=self._connect)
+
+        self.reused = 0
+        self.translated = 0
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, source TEXT NOT NULL, target TEXT NOT NULL, "
+            "keywords TEXT NOT NULL, origin TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _lookup(self, sources: list[str]) -> dict[str, Segment]:
+        keys = {segment_key(source): source for source in sources}
+        found: dict[str, Segment] = {}
+        key_list = list(keys)
+        with self._lock:
+            for start in range(0, len(key_list), self.LOOKUP_BATCH):
+                batch = key_list[start:start + self.LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, target, keywords FROM segments WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, target, keywords in rows:
+                    found[keys[key]] = (target, json.loads(keywords))
+        return found
+
+    def _add(self, pairs: list[tuple[str, str, list[str]]], origin: str) -> int:
+        now = time.time()
+        rows = [
+            (segment_key(source), source, target, json.dumps(keywords, ensure_ascii=False), origin, now)
+            for source, target, keywords in pairs
+            if source.strip() and target.strip()
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    async def lookup(self, sources: list[str]) -> dict[str, Segment]:
+        """Return stored (translation, keywords) for the given source segments that are known."""
+        if not self.enabled or not sources:
+            return {}
+        return await asyncio.to_thread(self._lookup, sources)
+
+    async def add(self, pairs: list[tuple[str, str, list[str]]], origin: str = "llm") -> int:
+        """Store (source, translation, keywords) segment pairs, replacing existing ones."""
+        if not self.enabled or not pairs:
+            return 0
+        return await asyncio.to_thread(self._add, pairs, origin)
+
+    def record_reuse(self, reused: int, total: int):
+        """Count reused and freshly translated segments for one request."""
+        self.reused += reused
+        self.translated += total - reused
+
+    def import_tmx(self, data: bytes) -> dict:
+        """
+        Import translation units from TMX data.
+
+        Units with a <tuv> in the source language and one in the target language
+        (matched by primary language subtag) are stored; others are skipped.
+        """
+        imported = skipped = 0
+        pairs: list[tuple[str, str, list[str]]] = []
+        for _, element in ElementTree.iterparse(BytesIO(data), events=("end",)):
+            if element.tag != "tu":
+                continue
+            source = target = None
+            for tuv in element.iter("tuv"):
+                lang = tuv.get(_XML_LANG) or tuv.get("lang") or ""
+                seg = tuv.find("seg")
+                if seg is None:
+                    continue
+                if source is None and _lang_matches(lang, self.source_lang):
+                    source = _seg_text(seg)
+                elif target is None and _lang_matches(lang, self.target_lang):
+                    target = _seg_text(seg)
+            if source and target:
+                pairs.append((source, target, []))
+            else:
+                skipped += 1
+            element.clear()
+            if len(pairs) >= 1000:
+                imported += self._add(pairs, "tmx")
+                pairs = []
+        imported += self._add(pairs, "tmx")
+        logger.info(f"Imported {imported} TMX segments ({skipped} skipped)")
+        return {"imported": imported, "skipped": skipped}
+
+    def export_tmx(self) -> Iterator[str]:
+        """Yield the memory as a TMX 1.4 document."""
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n'
+        yield (
+            f'  <header creationtool="AI Translation Assistant" creationtoolversion="1.0.0" '
+            f'segtype="sentence" o-tmf="sqlite" adminlang="en" '
+            f'srclang={quoteattr(self.source_lang)} datatype="plaintext"/>\n  <body>\n'
+        )
+        with self._lock:
+            rows = self._conn.execute("SELECT source, target, origin FROM segments ORDER BY created_at").fetchall()
+        for source, target, origin in rows:
+            yield (
+                f"    <tu>\n"
+                f'      <prop type="x-origin">{escape(origin)}</prop>\n'
+                f"      <tuv xml:lang={quoteattr(self.source_lang)}><seg>{escape(source)}</seg></tuv>\n"
+                f"      <tuv xml:lang={quoteattr(self.target_lang)}><seg>{escape(target)}</seg></tuv>\n"
+                f"    </tu>\n"
+            )
+        yield "  </body>\n</tmx>\n"
+
+    def clear(self):
+        """Remove all segments and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.commit()
+        self.reused = self.translated = 0
+
+    def stats(self) -> dict:
+        """Return segment count and reuse counters."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        total = self.reused + self.translated
+        return {
+            "enabled": self.enabled,
+            "persistent": self.path != ":memory:",
+            "segments": count,
+            "reused": self.reused,
+            "translated": self.translated,
+            "reuse_ratio": round(self.reused / total, 4) if total else 0.0,
+        }
+
+
+# Global translation memory instance
+translation_memory = TranslationMemory(
+    enabled=settings.tm_enabled,
+    path=settings.tm_path or shared_path("tm.sqlite"),
+    source_lang=settings.tm_source_lang,
+    target_lang=settings.tm_target_lang,
+)
@@ -2,14 +2,39 @@
 Translation service - core business logic.
 Orchestrates prompt building, LLM calls, and response parsing.
 """
+import asyncio
+import hashlib
 import json
-from typing import Tuple
+import re
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional, Tuple, Union
 
+from config import settings
+from services.cache import translation_cache, make_cache_key
+from services.cascade import model_cascade
+from services.chunker import Chunk, chunk_text, estimate_tokens, merge_keywords, split_segments
+from services.glossary import GlossaryEntry, glossary
+from services.keywords import keyword_extractor, keyword_source_var
 from services.llm_client import llm_client
+from services.llm_router import answered_labels
+from services.near_duplicate import near_duplicate_index
+from services.singleflight import SingleFlight
+from services.stream_parser import IncrementalTranslationParser
+from services.translation_memory import segment_reuse_var, translation_memory
+from services.concurrency import OverloadedError, priority_var
+from services.json_repair import loads_tolerant
+from services.retry import get_deadline, retry_policy
+from services.usage import BudgetExceededError, get_client_id
+from utils import metrics
 from utils.logging import get_logger
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
+# Names of the backends that answered the LLM calls of the current translation
+answered_backends_var: ContextVar[Optional[list[str]]] = ContextVar("answered_backends", default=None)
+
 
 class TranslationError(Exception):
     """Custom exception for translation failures."""
@@ -17,89 +42,935 @@ class TranslationError(Exception):
     pass
 
 
+class MalformedResponseError(TranslationError):
+    """LLM response that could not be parsed or validated; keeps the raw content for a repair prompt."""
+
+    def __init__(self, message: str, content: str):
+        super().__init__(message)
+        self.content = content
+
+
+BatchItemResult = Union[Tuple[str, list[str]], TranslationError, BudgetExceededError, OverloadedError]
+
 class Translator:
     """Translation service with keyword extraction."""
 
+    # All fixed instructions live in the system prompts, so every request starts with the
+    # same bytes and providers can serve that prefix from their prompt cache
     SYSTEM_PROMPT = """You are a professional translation assistant.
 Your task is to translate Chinese text to English and extract key concepts.
 Always respond with valid JSON only, no additional text.
 JSON format: {"translation": "English text here", "keywords": ["word1", "word2", "word3"]}
-Extract 3-5 most important keywords from the Chinese text."""
+Extract 3-5 most important keywords from the Chinese text.
+The text to translate follows "Chinese text:" in the user message. Text after "Preceding context:" is for reference only; do not translate it.
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    BATCH_SYSTEM_PROMPT = """You are a professional translation assistant.
+Your task is to translate several numbered Chinese texts to English and extract key concepts for each.
+Always respond with valid JSON only, no additional text.
+JSON format: {"items": [{"index": 0, "translation": "English text here", "keywords": ["word1", "word2", "word3"]}]}
+Return exactly one item per input index. Extract 3-5 most important keywords from each Chinese text.
+The texts follow "Chinese texts:" in the user message as a JSON list of objects with keys "index" and "text".
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    # Consecutive unknown sentences of one text (translation memory runs), translated
+    # per sentence so that each sentence pair can be stored
+    PASSAGE_SYSTEM_PROMPT = """You are a professional translation assistant.
+Your task is to translate the numbered sentences of one Chinese passage to English and extract key concepts for each.
+Always respond with valid JSON only, no additional text.
+JSON format: {"items": [{"index": 0, "translation": "English sentence here", "keywords": ["word1", "word2", "word3"]}]}
+Return exactly one item per input index, translating that sentence only, in the context of the whole passage. Extract 3-5 most important keywords from each sentence.
+The sentences follow "Chinese texts:" in the user message as a JSON list of objects with keys "index" and "text", in passage order. Text after "Preceding context:" is for reference only; do not translate it.
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    # Used when keywords are extracted locally: the model returns only the translation
+    TRANSLATE_ONLY_SYSTEM_PROMPT = """You are a professional translation assistant.
+Your task is to translate Chinese text to English.
+Always respond with valid JSON only, no additional text.
+JSON format: {"translation": "English text here"}
+The text to translate follows "Chinese text:" in the user message. Text after "Preceding context:" is for reference only; do not translate it.
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    TRANSLATE_ONLY_BATCH_SYSTEM_PROMPT = """You are a professional translation assistant.
+Your task is to translate several numbered Chinese texts to English.
+Always respond with valid JSON only, no additional text.
+JSON format: {"items": [{"index": 0, "translation": "English text here"}]}
+Return exactly one item per input index.
+The texts follow "Chinese texts:" in the user message as a JSON list of objects with keys "index" and "text".
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    TRANSLATE_ONLY_PASSAGE_SYSTEM_PROMPT = """You are a professional translation assistant.
+Your task is to translate the numbered sentences of one Chinese passage to English.
+Always respond with valid JSON only, no additional text.
+JSON format: {"items": [{"index": 0, "translation": "English sentence here"}]}
+Return exactly one item per input index, translating that sentence only, in the context of the whole passage.
+The sentences follow "Chinese texts:" in the user message as a JSON list of objects with keys "index" and "text", in passage order. Text after "Preceding context:" is for reference only; do not translate it.
+Lines after "Glossary:" give required translations ("term = translation"); use them wherever those terms occur."""
+
+    def __init__(self):
+        # Results with LLM and with local keywords come from different prompts and are cached apart
+        self.prompt_versions = {source: self._compute_prompt_version(source) for source in ("llm", "local")}
+        self.inflight = SingleFlight()
+
+    @property
+    def prompt_version(self) -> str:
+        return self.prompt_versions[keyword_source_var.get()]
+
+    def _local_keywords(self) -> bool:
+        """Whether the current request's keywords are extracted locally instead of by the LLM."""
+        return keyword_source_var.get() == "local"
+
+    def _with_local_keywords(self, chinese_text: str, result: Tuple[str, list[str]]) -> Tuple[str, list[str]]:
+        """Replace the keywords of a result with locally extracted ones when the request asked for them."""
+        if not self._local_keywords():
+            return result
+        return result[0], keyword_extractor.extract(chinese_text)
+
+    def _compute_prompt_version(self, keyword_source: str = "llm") -> str:
+        """Hash the prompt template so cache entries are invalidated when prompts change."""
+        template = json.dumps(self._build_messages("{text}", keyword_source=keyword_source), ensure_ascii=False)
+        # Glossary edits change translations, so they invalidate cached results too
+        return hashlib.sha256((template + glossary.version).encode("utf-8")).hexdigest()[:16]
+
+    def _cache_key(self, chinese_text: str) -> str:
+        """Build the result cache key for the given input."""
+        return make_cache_key(
+            chinese_text, settings.llm_provider, settings.llm_model, self.prompt_version
+        )
 
-    def _build_messages(self, chinese_text: str) -> list[dict]:
-        """Build messages for LLM request."""
-        user_prompt = f"""Translate the following Chinese text to English and extract 3-5 keywords.
-Return only valid JSON with keys "translation" and "keywords".
+    def _from_primary(self, backends: list[Optional[str]]) -> bool:
+        """
+        Whether every answer came from the primary backend.
+
+        Cache keys name the primary provider and model, so answers of the cascade's
+        fast tier or of a failover backend are not cached under them.
+        """
+        primary = llm_client.tier_backend("strong").name
+        return all(backend is None or backend == primary for backend in backends)
+
+    async def _cached(self, chinese_text: str, cache_key: str) -> Optional[Tuple[str, list[str]]]:
+        """Look up an exact cached result, then one for a near-duplicate source text."""
+        cached = await translation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Only results of the current prompt version (keyword source, glossary) are reusable
+        match = near_duplicate_index.lookup(chinese_text, self.prompt_version)
+        if match is None:
+            return None
+        similar_key, similarity = match
+        cached = await translation_cache.get(similar_key, record_stats=False)
+        if cached is None:
+            near_duplicate_index.discard(similar_key)
+            return None
+        logger.info("Translation served from near-duplicate cache entry (similarity %.2f)", similarity)
+        return cached
+
+    async def _store(self, chinese_text: str, cache_key: str, result: Tuple[str, list[str]]):
+        """Cache a fresh result and index its source text for near-duplicate lookups."""
+        await translation_cache.set(cache_key, result)
+        if translation_cache.enabled:
+            near_duplicate_index.add(chinese_text, cache_key, self.prompt_version)
 
-Chinese text:
+    def _glossary_hit(self, chinese_text: str) -> Optional[Tuple[str, list[str]]]:
+        """Answer a short input that is a glossary term, with the term's keywords or its translation."""
+        entry: Optional[GlossaryEntry] = glossary.lookup(chinese_text)
+        if entry is None:
+            return None
+        logger.info("Translation served from glossary")
+        return entry.target, entry.keywords[:5] or [entry.target]
+
+    def _glossary_prompt(self, texts: list[str]) -> str:
+        """Required translations of the glossary terms found in the texts, as a prompt section."""
+        terms: dict[str, str] = {}
+        for text in texts:
+            for entry in glossary.find_terms(text, glossary.max_prompt_terms - len(terms)):
+                terms.setdefault(entry.source, entry.target)
+            if len(terms) >= glossary.max_prompt_terms:
+                break
+        if not terms:
+            return ""
+        lines = "\n".join(f"{source} = {target}" for source, target in terms.items())
+        return f"""Glossary:
+{lines}
+
+"""
+
+    def _build_messages(
+        self, chinese_text: str, context: Optional[str] = None, keyword_source: Optional[str] = None
+    ) -> list[dict]:
+        """Build messages for LLM request, optionally with preceding document context."""
+        user_prompt = f"""{self._glossary_prompt([chinese_text])}Chinese text:
 {chinese_text}"""
 
+        if context:
+            user_prompt = f"""Preceding context:
+{context}
+
+{user_prompt}"""
+
+        local = (keyword_source or keyword_source_var.get()) == "local"
         return [
-            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "system", "content": self.TRANSLATE_ONLY_SYSTEM_PROMPT if local else self.SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ]
 
-    def _parse_response(self, content: str) -> Tuple[str, list[str]]:
-        """Parse LLM response to extract translation and keywords."""
+    def _validate_result(self, data: dict, source: Optional[str] = None) -> Tuple[str, list[str]]:
+        """
+        Extract and validate translation and keywords from a parsed JSON object.
+
+        Keywords are not expected when they are extracted locally (an empty list is
+        returned). A keyword list with fewer than 3 usable items is completed from
+        the source text when it is given, KEYWORDS_FALLBACK is on and an IDF table
+        is loaded.
+        """
+        fallback = source is not None and settings.keywords_fallback and keyword_extractor.available
+        if not isinstance(data, dict):
+            raise ValueError("Response is not a JSON object")
+        translation = data.get("translation")
+        keywords = data.get("keywords", [])
+
+        if not isinstance(translation, str) or not translation.strip():
+            raise ValueError("Missing translation in response")
+        if self._local_keywords():
+            return translation.strip(), []
+        if isinstance(keywords, str):
+            # Keywords sent as one comma-separated string
+            keywords = re.split(r"[,，;；]", keywords)
+        if not isinstance(keywords, list):
+            if fallback:
+                keywords = []
+            else:
+                raise ValueError("Invalid keywords: must be a list")
+
+        # Keep distinct non-empty strings, at most 5
+        seen = set()
+        cleaned = []
+        for keyword in keywords:
+            if isinstance(keyword, str) and keyword.strip() and keyword.strip().casefold() not in seen:
+                seen.add(keyword.strip().casefold())
+                cleaned.append(keyword.strip())
+        if len(cleaned) < 3:
+            if not fallback:
+                raise ValueError(f"Invalid keywords: must have 3-5 items, got {len(cleaned)}")
+            logger.info("LLM returned %d usable keywords, completing them locally", len(cleaned))
+            cleaned = keyword_extractor.complete(cleaned, source)
+
+        return translation.strip(), cleaned[:5]
+
+    def _loads(self, content: str):
+        """Parse JSON from an LLM response, repairing common syntax problems locally."""
         try:
-            # Try to parse as JSON directly
-            data = json.loads(content)
-            translation = data.get("translation", "").strip()
-            keywords = data.get("keywords", [])
+            data, repaired = loads_tolerant(content)
+        except json.JSONDecodeError:
+            metrics.json_repairs.inc(outcome="failed")
+            raise
+        if repaired:
+            metrics.json_repairs.inc(outcome="repaired")
+            logger.info("Repaired malformed JSON response locally")
+        return data
 
-            if not translation:
-                raise ValueError("Missing translation in response")
-            if not keywords or len(keywords) < 3:
-                raise ValueError("Invalid keywords: must have 3-5 items")
+    def _parse_response(self, content: str, source: Optional[str] = None) -> Tuple[str, list[str]]:
+        """Parse LLM response to extract translation and keywords (completed from source if invalid)."""
+        with tracer.span("translator.parse", response_length=len(content)):
+            try:
+                data = self._loads(content)
+                return self._validate_result(data, source)
 
-            # Ensure 3-5 keywords
-            keywords = keywords[:5]
-            if len(keywords) < 3:
-                raise ValueError(f"Too few keywords: {len(keywords)}")
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse LLM response as JSON: {e}")
+                logger.debug("Raw response: %s", content)
+                raise MalformedResponseError(f"Invalid JSON response from LLM: {str(e)}", content)
+            except (KeyError, ValueError, AttributeError) as e:
+                logger.error(f"Invalid response structure: {e}")
+                raise MalformedResponseError(f"Invalid response structure: {str(e)}", content)
 
-            return translation, keywords
+    def _build_repair_messages(self, messages: list[dict], error: MalformedResponseError) -> list[dict]:
+        """Follow up an unusable response with a request to resend it as valid JSON."""
+        if self._local_keywords():
+            expected = """the JSON object {"translation": "..."}"""
+        else:
+            expected = """the JSON object {"translation": "...", "keywords": ["...", "...", "..."]} and 3-5 keywords"""
+        return messages + [
+            {"role": "assistant", "content": error.content[:4000] or "(empty response)"},
+            {
+                "role": "user",
+                "content": f"""That response could not be used: {error}
+Reply again with only {expected}, no other text.""",
+            },
+        ]
+
+    def _pack_batch(self, items: list[Tuple[int, str]]) -> list[list[Tuple[int, str]]]:
+        """
+        Greedily pack (index, text) items into groups for single LLM prompts.
+
+        A group is closed when adding the next item would exceed the token budget
+        or the per-group item limit. An item larger than the budget goes alone.
+        """
+        groups: list[list[Tuple[int, str]]] = []
+        current: list[Tuple[int, str]] = []
+        current_tokens = 0
+
+        for index, text in items:
+            tokens = estimate_tokens(text)
+            if current and (
+                current_tokens + tokens > settings.batch_token_budget
+                or len(current) >= settings.batch_group_max_items
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append((index, text))
+            current_tokens += tokens
+
+        if current:
+            groups.append(current)
+        return groups
+
+    def _build_batch_messages(
+        self, group: list[Tuple[int, str]], context: Optional[str] = None, passage: bool = False
+    ) -> list[dict]:
+        """
+        Build messages for a packed LLM request with indexed JSON input.
+
+        With passage, the texts are consecutive sentences of one passage, translated
+        in context of each other (and of the optional preceding context).
+        """
+        payload = json.dumps(
+            [{"index": index, "text": text} for index, text in group], ensure_ascii=False
+        )
+        user_prompt = f"""{self._glossary_prompt([text for _, text in group])}Chinese texts:
+{payload}"""
+
+        if context:
+            user_prompt = f"""Preceding context:
+{context}
+
+{user_prompt}"""
+
+        if passage:
+            system_prompt = (
+                self.TRANSLATE_ONLY_PASSAGE_SYSTEM_PROMPT if self._local_keywords() else self.PASSAGE_SYSTEM_PROMPT
+            )
+        else:
+            system_prompt = (
+                self.TRANSLATE_ONLY_BATCH_SYSTEM_PROMPT if self._local_keywords() else self.BATCH_SYSTEM_PROMPT
+            )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _parse_batch_response(
+        self, content: str, indices: list[int], texts: Optional[dict[int, str]] = None
+    ) -> dict[int, BatchItemResult]:
+        """Parse a packed batch response into per-index results or errors."""
+        try:
+            data = self._loads(content)
+            items = data.get("items") if isinstance(data, dict) else data
+            if not isinstance(items, list):
+                raise ValueError("Missing items list in response")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Failed to parse batch LLM response: {e}")
+            error = TranslationError(f"Invalid batch response from LLM: {str(e)}")
+            return {index: error for index in indices}
+
+        results: dict[int, BatchItemResult] = {}
+        for item in items:
+            if not isinstance(item, dict) or item.get("index") not in indices:
+                continue
+            try:
+                results[item["index"]] = self._validate_result(item, (texts or {}).get(item["index"]))
+            except (KeyError, ValueError, AttributeError) as e:
+                results[item["index"]] = TranslationError(f"Invalid item structure: {str(e)}")
+
+        for index in indices:
+            if index not in results:
+                results[index] = TranslationError("Item missing from batch response")
+        return results
+
+    async def _translate_group(
+        self,
+        group: list[Tuple[int, str]],
+        semaphore: asyncio.Semaphore,
+        read_cache: bool = True,
+        write_cache: bool = True,
+    ) -> dict[int, BatchItemResult]:
+        """Translate one packed group, falling back to single requests for failed items."""
+        if len(group) == 1:
+            index, text = group[0]
+            return {index: await self._translate_single_item(text, semaphore, read_cache, write_cache)}
+
+        indices = [index for index, _ in group]
+        texts = dict(group)
+        tier = model_cascade.route(list(texts.values()))
+        answered_by: Optional[str] = None
+        from_primary = False
+
+        async def attempt(number: int, previous: Optional[Exception]):
+            nonlocal answered_by
+            # Retries after a failed fast-tier call go to the strong model
+            call_tier = tier if previous is None else "strong"
+            response = await llm_client.chat(
+                messages, max_tokens=settings.batch_max_output_tokens, tier=call_tier
+            )
+            answered_by = call_tier
+            return response
+
+        async with semaphore:
+            try:
+                messages = self._build_batch_messages(group)
+                # Unparseable packed responses fall back to single requests below instead
+                response = await retry_policy.run(attempt, operation="batch")
+                from_primary = self._from_primary([response.backend])
+                start = time.perf_counter()
+                results = self._parse_batch_response(response.content, indices, texts)
+                metrics.parse_duration.observe(
+                    time.perf_counter() - start, provider=response.provider, model=response.model
+                )
+            except (BudgetExceededError, OverloadedError) as e:
+                return {index: e for index in indices}
+            except Exception as e:
+                logger.error(f"Batch group of {len(group)} failed: {str(e)}")
+                error = TranslationError(f"Translation service error: {str(e)}")
+                results = {index: error for index in indices}
+
+        for index, result in results.items():
+            if write_cache and from_primary and not isinstance(result, Exception):
+                await self._store(texts[index], self._cache_key(texts[index]), result)
+
+        # Retry items the packed prompt could not produce as individual requests
+        failed = [index for index, result in results.items() if isinstance(result, Exception)]
+        if failed and answered_by == "fast":
+            # The single retries go to the strong model
+            model_cascade.escalate([texts[index] for index in failed], "batch")
+        if failed:
+            logger.warning(f"Retrying {len(failed)} batch items individually")
+            retried = await asyncio.gather(
+                *(
+                    self._translate_single_item(texts[index], semaphore, read_cache, write_cache)
+                    for index in failed
+                )
+            )
+            results.update(zip(failed, retried))
+
+        return results
+
+    async def _translate_single_item(
+        self, text: str, semaphore: asyncio.Semaphore, read_cache: bool = True, write_cache: bool = True
+    ) -> BatchItemResult:
+        """Translate one batch item on its own, returning the error instead of raising."""
+        async with semaphore:
+            try:
+                return await self.translate(text, read_cache=read_cache, write_cache=write_cache)
+            except (TranslationError, BudgetExceededError, OverloadedError) as e:
+                return e
+
+    async def translate_batch(
+        self, texts: list[str], read_cache: bool = True, write_cache: bool = True
+    ) -> list[Optional[BatchItemResult]]:
+        """
+        Translate a list of Chinese texts, packing short items into shared LLM prompts.
+
+        Args:
+            texts: Input texts in Chinese
+            read_cache: Serve individual items from cache if present
+            write_cache: Store fresh item results in cache
+
+        Returns:
+            Per-item results in input order: a (translation, keywords) tuple, or the
+            TranslationError / BudgetExceededError / OverloadedError for that item
+        """
+        results: list[Optional[BatchItemResult]] = [None] * len(texts)
+        pending: list[Tuple[int, str]] = []
+
+        for index, text in enumerate(texts):
+            term = self._glossary_hit(text)
+            cached = await self._cached(text, self._cache_key(text)) if term is None and read_cache else None
+            if term is not None:
+                model_cascade.record("none", "glossary")
+                results[index] = term
+            elif cached is not None:
+                model_cascade.record("none", "cache")
+                results[index] = self._with_local_keywords(text, cached)
+            else:
+                pending.append((index, text))
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            logger.debug(f"Raw response: {content}")
-            raise TranslationError(f"Invalid JSON response from LLM: {str(e)}")
-        except (KeyError, ValueError) as e:
-            logger.error(f"Invalid response structure: {e}")
-            raise TranslationError(f"Invalid response structure: {str(e)}")
+        groups = self._pack_batch(pending)
+        logger.info(
+            "Batch of %d items: %d cached, %d packed into %d LLM requests",
+            len(texts),
+            len(texts) - len(pending),
+            len(pending),
+            len(groups),
+        )
 
-    async def translate(self, chinese_text: str) -> Tuple[str, list[str]]:
+        semaphore = asyncio.Semaphore(settings.batch_concurrency)
+        for group_results in await asyncio.gather(
+            *(self._translate_group(group, semaphore, read_cache, write_cache) for group in groups)
+        ):
+            for index, result in group_results.items():
+                if not isinstance(result, Exception):
+                    result = self._with_local_keywords(texts[index], result)
+                results[index] = result
+
+        return results
+
+    async def translate(
+        self, chinese_text: str, read_cache: bool = True, write_cache: bool = True
+    ) -> Tuple[str, list[str]]:
         """
         Translate Chinese text to English and extract keywords.
 
         Args:
             chinese_text: Input text in Chinese
+            read_cache: Serve the result from cache if present
+            write_cache: Store a fresh result in cache
 
         Returns:
             Tuple of (translation, keywords)
 
         Raises:
             TranslationError: If translation fails
+            BudgetExceededError: If the client is over its request/token budget
+            OverloadedError: If no upstream concurrency slot frees up in time
+        """
+        with tracer.span("translator.translate", text_length=len(chinese_text)) as span:
+            term = self._glossary_hit(chinese_text)
+            if glossary.enabled:
+                span.set_attribute("glossary.hit", term is not None)
+            if term is not None:
+                model_cascade.record("none", "glossary")
+                return term
+
+            cache_key = self._cache_key(chinese_text)
+            if read_cache:
+                cached = await self._cached(chinese_text, cache_key)
+                span.set_attribute("cache.hit", cached is not None)
+                if cached is not None:
+                    logger.info("Translation served from cache")
+                    model_cascade.record("none", "cache")
+                    return self._with_local_keywords(chinese_text, cached)
+
+            # Identical concurrent requests share one upstream call only within the same
+            # priority class, budget client and cache flags, so every coalesced caller
+            # was entitled to the call; it runs under the first caller's deadline, and
+            # every caller still stops waiting at its own deadline
+            flight_key = (
+                f"{priority_var.get()}:{get_client_id()}:{int(read_cache)}{int(write_cache)}:{cache_key}"
+            )
+            try:
+                if translation_memory.enabled:
+                    result, reuse = await self.inflight.do(
+                        flight_key,
+                        lambda: self._translate_with_memory(
+                            chinese_text, cache_key, read_cache, write_cache, settings.batch_concurrency
+                        ),
+                        deadline=get_deadline(),
+                    )
+                    segment_reuse_var.set(reuse)
+                    span.set_attributes(**{"tm.reused": reuse[0], "tm.segments": reuse[1]})
+                else:
+                    result = await self.inflight.do(
+                        flight_key,
+                        lambda: self._translate_uncached(chinese_text, cache_key, write_cache),
+                        deadline=get_deadline(),
+                    )
+            except TimeoutError:
+                raise TranslationError("Translation service error: Request deadline exceeded")
+            return self._with_local_keywords(chinese_text, result)
+
+    async def _translate_with_memory(
+        self,
+        chinese_text: str,
+        cache_key: str,
+        read_cache: bool,
+        write_cache: bool,
+        concurrency: int,
+    ) -> Tuple[Tuple[str, list[str]], Tuple[int, int]]:
+        """
+        Translate using the translation memory, sending only unknown sentences to the LLM.
+
+        Without any reusable sentence this is a single request for the whole text.
+
+        Returns:
+            ((translation, keywords), (reused segments, total segments))
+        """
+        segments = split_segments(chinese_text) or [(chinese_text.strip(), "")]
+        found = await translation_memory.lookup([sentence for sentence, _ in segments]) if read_cache else {}
+        answered: list[str] = []
+        answered_backends_var.set(answered)
+        translation, keywords, reused = await self._translate_runs(
+            chinese_text, segments, found, None, write_cache, concurrency
+        )
+        result = (translation, keywords)
+        if write_cache and cache_key and self._from_primary(answered):
+            await self._store(chinese_text, cache_key, result)
+
+        translation_memory.record_reuse(reused, len(segments))
+        logger.info("Translation memory reused %d/%d segments", reused, len(segments))
+        return result, (reused, len(segments))
+
+    async def _translate_runs(
+        self,
+        source: str,
+        segments: list[Tuple[str, str]],
+        found: dict[str, Tuple[str, list[str]]],
+        context: Optional[str],
+        write_cache: bool,
+        concurrency: int,
+    ) -> Tuple[str, list[str], int]:
+        """
+        Translate (sentence, separator) segments, reusing those found in the translation memory.
+
+        Each run of consecutive unknown sentences is one LLM request, with the
+        DOCUMENT_OVERLAP_SENTENCES sentences before it (or, for a run at the start,
+        the given context) as reference, so reuse never breaks a passage into
+        context-free sentences. A run of several sentences is sent as a passage
+        translated sentence by sentence, so every sentence can be added to the
+        memory; without reuse this is still a single request.
+
+        Returns:
+            Tuple of (translation, keywords, reused segment count)
+        """
+        runs: list[Tuple[int, int]] = []
+        position = 0
+        while position < len(segments):
+            if segments[position][0] in found:
+                position += 1
+                continue
+            end = position
+            while end < len(segments) and segments[end][0] not in found:
+                end += 1
+            runs.append((position, end))
+            position = end
+
+        overlap = settings.document_overlap_sentences
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def translate_run(start: int, end: int) -> list[Tuple[str, list[str]]]:
+            if (start, end) == (0, len(segments)):
+                text = source.strip()
+            else:
+                text = "".join(sentence + separator for sentence, separator in segments[start:end]).strip()
+            run_context = context
+            if start > 0:
+                preceding = segments[max(0, start - overlap):start] if overlap > 0 else []
+                run_context = "".join(sentence + separator for sentence, separator in preceding).strip() or None
+            async with semaphore:
+                if end - start > 1:
+                    sentences = [sentence for sentence, _ in segments[start:end]]
+                    results = await self._translate_passage(sentences, text, run_context)
+                    if results is not None:
+                        return results
+                return [await self._translate_uncached(text, "", False, context=run_context)]
+
+        # One result per sentence of a run, or a single one for the whole run
+        fresh = dict(zip(runs, await asyncio.gather(*(translate_run(start, end) for start, end in runs))))
+
+        parts: list[str] = []
+        keyword_lists: list[list[str]] = []
+        position = 0
+        for start, end in runs + [(len(segments), len(segments))]:
+            for sentence, separator in segments[position:start]:
+                translation, keywords = found[sentence]
+                parts.extend((translation, separator))
+                keyword_lists.append(keywords)
+            if start < end:
+                results = fresh[(start, end)]
+                separators = [separator for _, separator in segments[start:end]][-len(results):]
+                for (translation, keywords), separator in zip(results, separators):
+                    parts.extend((translation, separator))
+                    keyword_lists.append(keywords)
+            position = end
+
+        keywords = merge_keywords(keyword_lists)
+        if not runs and not self._local_keywords() and len(keywords) < 3:
+            # Fully reused from imported segments, which carry no keywords; the stored
+            # translations are kept and only the keywords are completed
+            if keyword_extractor.available:
+                keywords = merge_keywords([keywords, keyword_extractor.extract(source)])
+            else:
+                async with semaphore:
+                    _, fresh_keywords = await self._translate_uncached(source.strip(), "", False, context=context)
+                keywords = merge_keywords([keywords, fresh_keywords])
+
+        if write_cache:
+            additions = [
+                (sentence, translation, keywords)
+                for (start, end), results in fresh.items()
+                if len(results) == end - start
+                for (sentence, _), (translation, keywords) in zip(segments[start:end], results)
+            ]
+            if additions:
+                await translation_memory.add(additions)
+
+        reused = len(segments) - sum(end - start for start, end in runs)
+        return "".join(parts).strip(), keywords, reused
+
+    async def _translate_passage(
+        self, sentences: list[str], text: str, context: Optional[str] = None
+    ) -> Optional[list[Tuple[str, list[str]]]]:
         """
+        Translate consecutive sentences in one request, returning one result per sentence.
+
+        Returns None when the response has no usable item for every sentence; the
+        caller then translates the passage as plain text.
+        """
+        indices = list(range(len(sentences)))
+        texts = dict(enumerate(sentences))
+        tier = model_cascade.route(sentences)
+        answered_by: Optional[str] = None
+
+        async def attempt(number: int, previous: Optional[Exception]):
+            nonlocal answered_by
+            # Retries after a failed fast-tier call go to the strong model
+            call_tier = tier if previous is None else "strong"
+            response = await llm_client.chat(
+                messages, max_tokens=settings.batch_max_output_tokens, tier=call_tier
+            )
+            answered_by = call_tier
+            return response
+
         try:
-            messages = self._build_messages(chinese_text)
-            logger.info(f"Sending translation request for text length: {len(chinese_text)}")
+            with tracer.span("translator.build_prompt"):
+                messages = self._build_batch_messages(list(texts.items()), context=context, passage=True)
+            logger.info("Sending passage of %d sentences for translation", len(sentences))
+            response = await retry_policy.run(attempt, operation="passage")
+            start = time.perf_counter()
+            results = self._parse_batch_response(response.content, indices, texts)
+            metrics.parse_duration.observe(
+                time.perf_counter() - start, provider=response.provider, model=response.model
+            )
+        except (TranslationError, BudgetExceededError, OverloadedError):
+            raise
+        except Exception as e:
+            logger.error(f"Translation failed: {str(e)}")
+            raise TranslationError(f"Translation service error: {str(e)}")
+
+        if any(isinstance(result, Exception) for result in results.values()):
+            logger.warning("Passage response unusable, translating the %d sentences as plain text", len(sentences))
+            if answered_by == "fast":
+                # The plain request goes to the strong model
+                model_cascade.escalate([text], "passage")
+            return None
+
+        translation_answers = answered_backends_var.get()
+        if translation_answers is not None:
+            translation_answers.append(response.backend)
+        return [results[index] for index in indices]
+
+    async def _translate_uncached(
+        self,
+        chinese_text: str,
+        cache_key: str,
+        write_cache: bool,
+        context: Optional[str] = None,
+    ) -> Tuple[str, list[str]]:
+        """Call the LLM, parse the result and optionally store it in cache."""
+        try:
+            with tracer.span("translator.build_prompt"):
+                messages = self._build_messages(chinese_text, context=context)
+            logger.info("Sending translation request for text length: %d", len(chinese_text))
+            tier = model_cascade.route([chinese_text])
+            answered: list[Optional[str]] = []
 
-            response = await llm_client.chat(messages)
-            logger.debug(f"LLM response received: {response.content[:200]}...")
+            async def call(request: list[dict]) -> Tuple[str, list[str]]:
+                response = await llm_client.chat(request, tier=tier)
+                answered.append(response.backend)
+                # %.200s truncates only if the record is emitted
+                logger.debug("LLM response received: %.200s...", response.content)
 
-            translation, keywords = self._parse_response(response.content)
-            logger.info(
-                f"Translation successful. Keywords count: {len(keywords)}"
+                start = time.perf_counter()
+                try:
+                    return self._parse_response(response.content, chinese_text)
+                finally:
+                    metrics.parse_duration.observe(
+                        time.perf_counter() - start, provider=response.provider, model=response.model
+                    )
+
+            async def attempt(number: int, previous: Optional[Exception]) -> Tuple[str, list[str]]:
+                nonlocal tier
+                if previous is not None:
+                    # Retries after a failed fast-tier call go to the strong model
+                    tier = "strong"
+                if isinstance(previous, MalformedResponseError):
+                    return await call(self._build_repair_messages(messages, previous))
+                try:
+                    return await call(messages)
+                except MalformedResponseError:
+                    if tier != "fast":
+                        raise
+                # Escalate within the same attempt, so the strong model keeps its repair retries
+                model_cascade.escalate([chinese_text], "translate")
+                tier = "strong"
+                return await call(messages)
+
+            translation, keywords = await retry_policy.run(
+                attempt, operation="translate", malformed=(MalformedResponseError,)
             )
+            logger.info("Translation successful. Keywords count: %d", len(keywords))
+
+            # Only the answer that was returned decides; earlier failed attempts do not
+            translation_answers = answered_backends_var.get()
+            if translation_answers is not None:
+                translation_answers.append(answered[-1])
+            if write_cache and self._from_primary(answered[-1:]):
+                await self._store(chinese_text, cache_key, (translation, keywords))
 
             return translation, keywords
 
-        except TranslationError:
+        except (TranslationError, BudgetExceededError, OverloadedError):
             raise
         except Exception as e:
             logger.error(f"Translation failed: {str(e)}")
             raise TranslationError(f"Translation service error: {str(e)}")
 
 
+    async def _translate_chunk(
+        self,
+        chunk: Chunk,
+        semaphore: asyncio.Semaphore,
+        read_cache: bool,
+        write_cache: bool,
+        found: Optional[dict[str, Tuple[str, list[str]]]] = None,
+    ) -> Tuple[str, list[str]]:
+        """
+        Translate one document chunk, carrying its overlap context if any.
+
+        With found (translation memory lookups), known sentences of the chunk are
+        reused and only the unknown ones are sent to the LLM.
+        """
+        async with semaphore:
+            if found is not None:
+                translation, keywords, _ = await self._translate_runs(
+                    chunk.text, split_segments(chunk.text), found, chunk.context, write_cache, concurrency=1
+                )
+                return translation, keywords
+            if not chunk.context:
+                return await self.translate(
+                    chunk.text, read_cache=read_cache, write_cache=write_cache
+                )
+            # Context changes the prompt, so the result is not shared with the plain-text cache
+            return await self._translate_uncached(
+                chunk.text,
+                cache_key="",
+                write_cache=False,
+                context=chunk.context,
+            )
+
+    async def translate_document(
+        self, chinese_text: str, read_cache: bool = True, write_cache: bool = True
+    ) -> Tuple[str, list[str]]:
+        """
+        Translate a long document by chunking it on sentence/paragraph boundaries.
+
+        Chunks are translated in parallel under DOCUMENT_CONCURRENCY and reassembled
+        in order; per-chunk keywords are merged and ranked into a single list. With
+        the translation memory enabled, known sentences inside each chunk are reused.
+
+        Args:
+            chinese_text: Input text in Chinese
+            read_cache: Serve chunk results from cache if present
+            write_cache: Store fresh chunk results in cache
+
+        Returns:
+            Tuple of (translation, keywords)
+
+        Raises:
+            TranslationError: If any chunk fails to translate
+        """
+        chunks = chunk_text(
+            chinese_text,
+            token_budget=settings.document_chunk_tokens,
+            overlap_sentences=settings.document_overlap_sentences,
+        )
+        logger.info("Document of %d chars split into %d chunks", len(chinese_text), len(chunks))
+
+        found = None
+        if translation_memory.enabled:
+            sources = [sentence for chunk in chunks for sentence, _ in split_segments(chunk.text)]
+            found = await translation_memory.lookup(list(dict.fromkeys(sources))) if read_cache else {}
+
+        semaphore = asyncio.Semaphore(settings.document_concurrency)
+        results = await asyncio.gather(
+            *(self._translate_chunk(chunk, semaphore, read_cache, write_cache, found) for chunk in chunks)
+        )
+
+        if found is not None:
+            reused = sum(1 for source in sources if source in found)
+            translation_memory.record_reuse(reused, len(sources))
+            segment_reuse_var.set((reused, len(sources)))
+            logger.info("Translation memory reused %d/%d segments", reused, len(sources))
+
+        parts = []
+        for chunk, (translation, _) in zip(chunks, results):
+            parts.append(translation)
+            parts.append(chunk.separator)
+        translation = "".join(parts).strip()
+        keywords = merge_keywords([keywords for _, keywords in results])
+
+        return self._with_local_keywords(chinese_text, (translation, keywords))
+
+    async def translate_stream(
+        self, chinese_text: str, read_cache: bool = True, write_cache: bool = True
+    ) -> AsyncIterator[dict]:
+        """
+        Translate Chinese text, yielding translation deltas as the LLM streams them.
+
+        Yields {"type": "delta", "text": ...} events while the translation value is
+        being received, then a final {"type": "keywords", ...} event once the whole
+        JSON object has been validated.
+
+        Raises:
+            TranslationError: If the stream fails or the final JSON is invalid
+        """
+        cache_key = self._cache_key(chinese_text)
+        cached = self._glossary_hit(chinese_text)
+        if cached is not None:
+            model_cascade.record("none", "glossary")
+        elif read_cache:
+            cached = await self._cached(chinese_text, cache_key)
+            if cached is not None:
+                logger.info("Translation served from cache")
+                model_cascade.record("none", "cache")
+                cached = self._with_local_keywords(chinese_text, cached)
+        if cached is not None:
+            translation, keywords = cached
+            yield {"type": "delta", "text": translation}
+            yield {"type": "keywords", "translation": translation, "keywords": keywords}
+            return
+
+        parser = IncrementalTranslationParser()
+        tier = model_cascade.route([chinese_text])
+        answered: list[str] = []
+        try:
+            messages = self._build_messages(chinese_text)
+            logger.info("Streaming translation request for text length: %d", len(chinese_text))
+
+            async for chunk in llm_client.chat_stream(messages, tier=tier, answered=answered):
+                delta = parser.feed(chunk)
+                if delta:
+                    yield {"type": "delta", "text": delta}
+        except (BudgetExceededError, OverloadedError):
+            raise
+        except Exception as e:
+            logger.error(f"Streaming translation failed: {str(e)}")
+            raise TranslationError(f"Translation service error: {str(e)}")
+
+        start = time.perf_counter()
+        try:
+            translation, keywords = self._parse_response(parser.buffer, chinese_text)
+        except MalformedResponseError:
+            if tier == "fast":
+                # Deltas were already sent, so only the next request for this text is escalated
+                model_cascade.escalate([chinese_text], "stream")
+            raise
+        finally:
+            metrics.parse_duration.observe(time.perf_counter() - start, **answered_labels())
+        if write_cache and self._from_primary(answered):
+            await self._store(chinese_text, cache_key, (translation, keywords))
+        translation, keywords = self._with_local_keywords(chinese_text, (translation, keywords))
+        yield {"type": "keywords", "translation": translation, "keywords": keywords}
+
 # Global translator instance
 translator = Translator()
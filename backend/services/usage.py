@@ -0,0 +1,259 @@
+"""
+Token usage accounting and per-client budget enforcement.
+Aggregates prompt/completion (and prompt-cached) tokens per client, model and minute, and enforces
+requests-per-minute / tokens-per-minute budgets with token buckets.
+"""
+import asyncio
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextvars import ContextVar
+from typing import Optional
+
+from config import settings
+from services.shared_state import SharedTokenBucket, shared_state
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Context variable for the calling client's key
+client_id_var: ContextVar[str] = ContextVar("client_id", default="anonymous")
+
+
+def set_client_id(client_id: Optional[str]) -> str:
+    """Set client key for current context."""
+    client_id = (client_id or "").strip() or "anonymous"
+    client_id_var.set(client_id)
+    return client_id
+
+
+def get_client_id() -> str:
+    """Get current client key."""
+    return client_id_var.get()
+
+
+class BudgetExceededError(Exception):
+    """Raised when a client exceeds its request or token budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate tokens/second up to capacity."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, amount: float) -> float:
+        """Consume amount if available and return 0, else return seconds until it would be."""
+        self._refill()
+        amount = min(amount, self.capacity)  # A single oversized call may drain a full bucket
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        needed = amount - self.tokens
+        return needed / self.rate if self.rate > 0 else float("inf")
+
+    def adjust(self, amount: float):
+        """Add (refund) or remove (charge) tokens; the balance may go negative."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def _bucket(client_id: str, kind: str, per_minute: int):
+    """Bucket for one client budget, shared by all workers in multi-worker mode."""
+    if not per_minute:
+        return None
+    if shared_state is not None:
+        return SharedTokenBucket(shared_state, f"{kind}:{client_id}", per_minute, per_minute / 60)
+    return TokenBucket(per_minute, per_minute / 60)
+
+
+class _ClientBudget:
+    """Request and token buckets for one client."""
+
+    def __init__(self, client_id: str, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = _bucket(client_id, "requests", requests_per_minute)
+        self.tokens = _bucket(client_id, "tokens", tokens_per_minute)
+
+
+class UsageTracker:
+    """Per-client/per-model token accounting with minute windows and budget checks."""
+
+    MAX_CLIENTS = 10000  # Least recently seen clients beyond this lose their buckets
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        window_minutes: int = 60,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_minutes = window_minutes
+
+        self._budgets: OrderedDict[str, _ClientBudget] = OrderedDict()
+        # (client, model) -> {"requests", "prompt_tokens", "completion_tokens", "cached_prompt_tokens"}
+        self.totals: dict[tuple[str, str], dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0}
+        )
+        # [minute, client, model, prompt_tokens, completion_tokens, requests, cached_prompt_tokens] records
+        self._minutes: deque[list] = deque()
+        self.rejected = 0
+
+    @property
+    def enforcing(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    def _budget(self, client_id: str) -> _ClientBudget:
+        budget = self._budgets.get(client_id)
+        if budget is None:
+            budget = _ClientBudget(client_id, self.requests_per_minute, self.tokens_per_minute)
+            self._budgets[client_id] = budget
+            while len(self._budgets) > self.MAX_CLIENTS:
+                self._budgets.popitem(last=False)
+        else:
+            self._budgets.move_to_end(client_id)
+        return budget
+
+    async def _run(self, fn, *args):
+        """Run a bucket update; shared buckets wait on an SQLite lock, so off the event loop."""
+        if shared_state is not None:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def reserve(self, client_id: str, estimated_tokens: int):
+        """
+        Admit one upstream call for client_id or raise BudgetExceededError.
+
+        Consumes one request and reserves estimated_tokens; settle() later
+        corrects the reservation with the actual usage.
+        """
+        if not self.enforcing:
+            return
+        await self._run(self._reserve, self._budget(client_id), client_id, estimated_tokens)
+
+    def _reserve(self, budget: _ClientBudget, client_id: str, estimated_tokens: int):
+        if budget.requests is not None:
+            wait = budget.requests.try_consume(1)
+            if wait:
+                self.rejected += 1
+                raise BudgetExceededError(f"Request budget exceeded for client {client_id}", wait)
+
+        if budget.tokens is not None:
+            wait = budget.tokens.try_consume(estimated_tokens)
+            if wait:
+                if budget.requests is not None:
+                    budget.requests.adjust(1)
+                self.rejected += 1
+                raise BudgetExceededError(f"Token budget exceeded for client {client_id}", wait)
+
+    async def settle(self, client_id: str, estimated_tokens: int, actual_tokens: int):
+        """Correct a reservation once the actual token usage is known."""
+        if self.tokens_per_minute:
+            await self._run(self._budget(client_id).tokens.adjust, estimated_tokens - actual_tokens)
+
+    def record(
+        self,
+        client_id: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_prompt_tokens: int = 0,
+    ):
+        """
+        Add one call's usage to the totals and the current minute window.
+
+        cached_prompt_tokens is the part of prompt_tokens served from the provider's prompt cache.
+        """
+        totals = self.totals[(client_id, model)]
+        totals["requests"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        totals["cached_prompt_tokens"] += cached_prompt_tokens
+
+        minute = int(time.time() // 60)
+        last = self._minutes[-1] if self._minutes else None
+        if last and last[0] == minute and last[1] == client_id and last[2] == model:
+            last[3] += prompt_tokens
+            last[4] += completion_tokens
+            last[5] += 1
+            last[6] += cached_prompt_tokens
+        else:
+            self._minutes.append(
+                [minute, client_id, model, prompt_tokens, completion_tokens, 1, cached_prompt_tokens]
+            )
+        while self._minutes and self._minutes[0][0] <= minute - self.window_minutes:
+            self._minutes.popleft()
+
+    def snapshot(self, client_id: Optional[str] = None) -> dict:
+        """Return totals, per-minute windows and remaining budget, optionally for one client."""
+        minute = int(time.time() // 60)
+        clients: dict[str, dict] = {}
+        models: dict[str, dict] = defaultdict(
+            lambda: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0}
+        )
+
+        def entry(client: str) -> dict:
+            if client not in clients:
+                clients[client] = {
+                    "models": {},
+                    "last_minute": {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0},
+                    "window": {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0},
+                }
+            return clients[client]
+
+        for (client, model), totals in self.totals.items():
+            if client_id is None or client == client_id:
+                entry(client)["models"][model] = dict(totals)
+                for key, value in totals.items():
+                    models[model][key] += value
+
+        for record_minute, client, _, prompt, completion, requests, cached in self._minutes:
+            if client_id is not None and client != client_id:
+                continue
+            periods = ["window"] + (["last_minute"] if record_minute == minute else [])
+            for period in periods:
+                stats = entry(client)[period]
+                stats["requests"] += requests
+                stats["prompt_tokens"] += prompt
+                stats["completion_tokens"] += completion
+                stats["cached_prompt_tokens"] += cached
+
+        for client, data in clients.items():
+            budget = self._budgets.get(client)
+            if budget is not None:
+                if budget.requests is not None:
+                    budget.requests._refill()
+                    data["requests_remaining"] = int(budget.requests.tokens)
+                if budget.tokens is not None:
+                    budget.tokens._refill()
+                    data["tokens_remaining"] = int(budget.tokens.tokens)
+
+        return {
+            "limits": {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+            },
+            "window_minutes": self.window_minutes,
+            "rejected": self.rejected,
+            "models": dict(models),
+            "clients": clients,
+        }
+
+
+# Global usage tracker instance
+usage_tracker = UsageTracker(
+    requests_per_minute=settings.budget_requests_per_minute,
+    tokens_per_minute=settings.budget_tokens_per_minute,
+    window_minutes=settings.usage_window_minutes,
+)
@@ -0,0 +1,25 @@
+"""
+Test configuration.
+Settings are read when modules are imported, so the mock provider and a quiet,
+worker-free setup are selected here, before any application module is loaded.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.update(
+    LLM_PROVIDER="mock",
+    LLM_MODEL="mock-model",
+    MOCK_LATENCY_MS="1",
+    MOCK_LATENCY_STDDEV_MS="0",
+    MOCK_LATENCY_DISTRIBUTION="fixed",
+    LOG_LEVEL="WARNING",
+    JOBS_ENABLED="false",
+    TM_PATH="",
+    TRACING_SAMPLE_RATE="0",
+    LOOP_LAG_INTERVAL="0",
+    ADMIN_TOKEN="test-admin-token",
+    KEYWORDS_IDF_PATH=str(Path(__file__).resolve().parent / "data" / "idf.txt"),
+)
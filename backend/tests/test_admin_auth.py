@@ -0,0 +1,32 @@
+"""Admin endpoints require the ADMIN_TOKEN bearer token."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "method,path",
+    [("delete", "/api/admin/cache"), ("delete", "/api/admin/tm"), ("get", "/api/admin/tm/export")],
+)
+def test_admin_requires_token(client, method, path):
+    assert client.request(method, path).status_code == 401
+    wrong = client.request(method, path, headers={"Authorization": "Bearer wrong"})
+    assert wrong.status_code == 401
+    assert wrong.json()["detail"]["error"]["code"] == "UNAUTHORIZED"
+
+
+def test_admin_import_rejected_without_token(client):
+    response = client.post("/api/admin/tm/import", content=b"<tmx/>")
+    assert response.status_code == 401
+
+
+def test_admin_with_token(client):
+    response = client.get("/api/admin/cache", headers={"Authorization": "Bearer test-admin-token"})
+    assert response.status_code == 200
@@ -0,0 +1,71 @@
+"""Cache-Control directives apply to every item of /translate/batch, including single-request fallbacks."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from services.cache import translation_cache
+from services.llm_client import llm_client
+from services.translator import translator
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def chat_calls(monkeypatch):
+    """Count upstream chat calls."""
+    calls = []
+    chat = llm_client.chat
+
+    async def counting_chat(*args, **kwargs):
+        calls.append(kwargs.get("tier"))
+        return await chat(*args, **kwargs)
+
+    monkeypatch.setattr(llm_client, "chat", counting_chat)
+    return calls
+
+
+@pytest.fixture
+def packed_failure(monkeypatch):
+    """Make every packed prompt fail so each item falls back to a single request."""
+
+    def fail(content, indices, texts):
+        raise ValueError("unusable packed response")
+
+    monkeypatch.setattr(translator, "_parse_batch_response", fail)
+
+
+def _cached(client: TestClient, text: str):
+    return client.portal.call(translation_cache.get, translator._cache_key(text))
+
+
+def test_batch_no_store_writes_nothing(client, chat_calls):
+    texts = ["批量请求不应写入缓存。", "第二条也不应写入。"]
+    response = client.post("/api/translate/batch", json={"texts": texts}, headers={"Cache-Control": "no-store"})
+    assert response.status_code == 200
+    assert all(item["translation"] for item in response.json()["results"])
+    assert chat_calls
+    assert [_cached(client, text) for text in texts] == [None, None]
+
+
+def test_batch_no_store_fallback_writes_nothing(client, packed_failure):
+    texts = ["回退请求不应写入缓存。", "回退的第二条。"]
+    response = client.post("/api/translate/batch", json={"texts": texts}, headers={"Cache-Control": "no-store"})
+    assert response.status_code == 200
+    assert all(item["translation"] for item in response.json()["results"])
+    assert [_cached(client, text) for text in texts] == [None, None]
+
+
+def test_batch_no_cache_fallback_skips_lookup(client, chat_calls, packed_failure):
+    texts = ["回退请求不应读取缓存。", "回退读取的第二条。"]
+    assert client.post("/api/translate/batch", json={"texts": texts}).status_code == 200
+    assert all(_cached(client, text) is not None for text in texts)
+
+    chat_calls.clear()
+    response = client.post("/api/translate/batch", json={"texts": texts}, headers={"Cache-Control": "no-cache"})
+    assert response.status_code == 200
+    # One failed packed call, then one single request per item instead of cache hits
+    assert len(chat_calls) == 1 + len(texts)
@@ -0,0 +1,69 @@
+"""Only answers of the primary backend are cached, since cache keys name the primary model."""
+import asyncio
+
+import pytest
+
+from services.cache import translation_cache
+from services.llm_client import llm_client
+from services.translation_memory import translation_memory
+from services.translator import translator
+
+
+@pytest.fixture(params=["mock", "fast:mock"])
+def backend(request, monkeypatch):
+    """Report every chat answer as coming from the given backend."""
+    chat = llm_client.chat
+    router = llm_client._router("strong")
+    chat_stream = router.chat_stream
+
+    async def relabeled_chat(*args, **kwargs):
+        response = await chat(*args, **kwargs)
+        response.backend = request.param
+        return response
+
+    async def relabeled_stream(messages, max_tokens=None, answered=None):
+        async for delta in chat_stream(messages, max_tokens=max_tokens):
+            if answered is not None and not answered:
+                answered.append(request.param)
+            yield delta
+
+    monkeypatch.setattr(llm_client, "chat", relabeled_chat)
+    monkeypatch.setattr(router, "chat_stream", relabeled_stream)
+    return request.param
+
+
+def _cached(text: str):
+    return asyncio.run(translation_cache.get(translator._cache_key(text)))
+
+
+def _expected(backend: str) -> bool:
+    return backend == llm_client.tier_backend("strong").name
+
+
+def test_single_request(backend):
+    text = f"单条请求只缓存主模型的回答({backend})。"
+    asyncio.run(translator.translate(text, read_cache=False))
+    assert (_cached(text) is not None) == _expected(backend)
+
+
+def test_single_request_with_translation_memory(backend, monkeypatch):
+    monkeypatch.setattr(translation_memory, "enabled", True)
+    text = f"翻译记忆开启时同样如此({backend})。第二句。"
+    asyncio.run(translator.translate(text, read_cache=False))
+    assert (_cached(text) is not None) == _expected(backend)
+
+
+def test_batch(backend):
+    texts = [f"批量第一条({backend})。", f"批量第二条({backend})。"]
+    asyncio.run(translator.translate_batch(texts, read_cache=False))
+    assert [_cached(text) is not None for text in texts] == [_expected(backend)] * 2
+
+
+def test_stream(backend):
+    text = f"流式请求只缓存主模型的回答({backend})。"
+
+    async def consume():
+        return [event async for event in translator.translate_stream(text, read_cache=False)]
+
+    asyncio.run(consume())
+    assert (_cached(text) is not None) == _expected(backend)
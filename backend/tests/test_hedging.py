@@ -0,0 +1,51 @@
+"""Hedged calls take their own concurrency slot, and are skipped when none is free."""
+import asyncio
+
+from config import settings
+from services.concurrency import AdaptiveLimiter
+from services.hedging import HedgePolicy
+from services.llm_client import LLMResponse, llm_client
+
+
+class _SlowThenFastRouter:
+    """The first call is slow, later ones answer at once; records limiter occupancy per call."""
+
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.in_flight_seen: list[int] = []
+
+    async def chat(self, messages, max_tokens=None, attempted=None, avoid=None):
+        first = not self.in_flight_seen
+        self.in_flight_seen.append(self.limiter.in_flight)
+        await asyncio.sleep(0.3 if first else 0)
+        return LLMResponse("slow" if first else "hedge")
+
+
+def _run(monkeypatch, limit: int):
+    limiter = AdaptiveLimiter(initial_limit=limit, latency_tolerance=0)
+    router = _SlowThenFastRouter(limiter)
+    hedging = HedgePolicy(min_delay=0.02)
+    monkeypatch.setattr(settings, "hedge_enabled", True)
+    monkeypatch.setattr(settings, "limiter_enabled", True)
+    monkeypatch.setattr(llm_client, "limiter", limiter)
+    monkeypatch.setattr(llm_client, "hedging", hedging)
+    monkeypatch.setattr(llm_client, "_router", lambda tier: router)
+    response = asyncio.run(llm_client.chat([{"role": "user", "content": "你好"}]))
+    return response, router, hedging, limiter
+
+
+def test_hedge_takes_its_own_slot(monkeypatch):
+    response, router, hedging, limiter = _run(monkeypatch, limit=2)
+    assert response.content == "hedge"
+    assert hedging.hedges_fired == 1
+    assert router.in_flight_seen == [1, 2]
+    assert limiter.in_flight == 0
+
+
+def test_hedge_skipped_without_free_slot(monkeypatch):
+    response, router, hedging, limiter = _run(monkeypatch, limit=1)
+    assert response.content == "slow"
+    assert hedging.hedges_fired == 0
+    assert hedging.hedges_skipped == 1
+    assert router.in_flight_seen == [1]
+    assert limiter.in_flight == 0
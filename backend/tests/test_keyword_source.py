@@ -0,0 +1,44 @@
+"""Results produced with local keywords are never served to requests expecting LLM keywords."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from services.near_duplicate import near_duplicate_index
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(near_duplicate_index, "enabled", True)
+    with TestClient(app) as client:
+        yield client
+
+
+def _stream_keywords(client: TestClient, body: dict) -> list[str]:
+    response = client.post("/api/translate/stream", json=body)
+    assert response.status_code == 200
+    for block in response.text.split("\n\n"):
+        if block.startswith("event: keywords"):
+            return json.loads(block.split("data: ", 1)[1])["keywords"]
+    raise AssertionError(f"No keywords event in {response.text!r}")
+
+
+def test_local_then_llm_single(client):
+    text = "人工智能正在改变我们的工作方式。"
+    local = client.post("/api/translate", json={"text": text, "keyword_source": "local"})
+    assert local.status_code == 200
+
+    response = client.post("/api/translate", json={"text": text, "keyword_source": "llm"})
+    assert response.status_code == 200, response.text
+    assert len(response.json()["keywords"]) >= 3
+
+
+def test_local_then_llm_batch_and_stream(client):
+    text = "机器学习依赖大量高质量的训练数据。"
+    assert client.post("/api/translate/batch", json={"texts": [text], "keyword_source": "local"}).status_code == 200
+
+    response = client.post("/api/translate/batch", json={"texts": [text], "keyword_source": "llm"})
+    assert response.status_code == 200
+    assert len(response.json()["results"][0]["keywords"]) >= 3
+    assert len(_stream_keywords(client, {"text": text, "keyword_source": "llm"})) >= 3
@@ -0,0 +1,40 @@
+"""Local keyword extraction returns dictionary words, and is refused without an IDF table."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from services.keywords import KeywordExtractor, keyword_extractor
+
+
+def test_extract_returns_words_not_bigrams():
+    keywords = keyword_extractor.extract("深度学习模型")
+    assert keywords[:2] == ["深度学习", "模型"]
+    assert not {"度学", "习模"} & set(keywords)
+
+
+def test_extract_mixed_text_keeps_terms():
+    keywords = keyword_extractor.extract("机器学习依赖大量高质量的训练数据。")
+    assert "机器学习" in keywords
+    assert "高质量" in keywords
+    assert all(keyword in keyword_extractor.idf for keyword in keywords)
+
+
+def test_no_idf_table_is_unavailable():
+    assert keyword_extractor.available
+    assert not KeywordExtractor().available
+
+
+@pytest.mark.parametrize(
+    "path,body",
+    [
+        ("/api/translate", {"text": "深度学习模型", "keyword_source": "local"}),
+        ("/api/translate/batch", {"texts": ["深度学习模型"], "keyword_source": "local"}),
+        ("/api/translate/stream", {"text": "深度学习模型", "keyword_source": "local"}),
+    ],
+)
+def test_local_keywords_refused_without_idf(monkeypatch, path, body):
+    monkeypatch.setattr(keyword_extractor, "idf", {})
+    with TestClient(app) as client:
+        response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"]["code"] == "KEYWORDS_UNAVAILABLE"
@@ -0,0 +1,60 @@
+"""Log sampling is per request, and flushing waits for the writer without polling."""
+import logging
+import time
+
+from utils import logging as log_utils
+from utils.logging import InfoSampler, RequestIdFilter
+
+if log_utils._handler is None:
+    log_utils.setup_logging("WARNING")
+
+
+def _record(request_id: str, level: int = logging.INFO) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, __file__, 1, "message", None, None)
+    record.request_id = request_id
+    return record
+
+
+def test_sampling_keeps_or_drops_whole_requests():
+    sampler = InfoSampler(0.5)
+    decisions = {
+        request_id: {sampler.filter(_record(request_id)) for _ in range(5)}
+        for request_id in (f"request-{i}" for i in range(200))
+    }
+    assert all(len(kept) == 1 for kept in decisions.values())
+    assert {True, False} == {kept.pop() for kept in decisions.values()}
+    assert sampler.filter(_record("request-0", logging.WARNING))
+
+
+def test_records_outside_a_request_are_sampled_one_by_one():
+    sampler = InfoSampler(0.5)
+    request_id_filter = RequestIdFilter()
+    kept = set()
+    for _ in range(200):
+        records = [_record(None), _record(None)]
+        for record in records:
+            request_id_filter.filter(record)
+        assert [record.request_id for record in records] == ["N/A", "N/A"]
+        kept.add(tuple(sampler.filter(record) for record in records))
+    assert {(True, False), (False, True)} & kept
+
+
+def test_flush_waits_for_queued_records():
+    logger = logging.getLogger("tests.flush")
+    for i in range(100):
+        logger.warning("record %d", i)
+    log_utils.flush_logging(timeout=5)
+    assert log_utils._handler.queue.unfinished_tasks == 0
+
+
+def test_flush_returns_at_timeout_when_writer_is_behind():
+    log_queue = log_utils._handler.queue
+    with log_queue.mutex:
+        log_queue.unfinished_tasks += 1
+    try:
+        start = time.monotonic()
+        log_utils.flush_logging(timeout=0.1)
+        assert 0.1 <= time.monotonic() - start < 1
+    finally:
+        with log_queue.mutex:
+            log_queue.unfinished_tasks -= 1
@@ -0,0 +1,28 @@
+"""Near-duplicate matches never change numbers or negation."""
+from services.near_duplicate import NearDuplicateIndex
+
+
+def _index(*texts: str) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(threshold=0.5)
+    for i, text in enumerate(texts):
+        index.add(text, f"key-{i}")
+    return index
+
+
+def test_formatting_differences_match():
+    index = _index("请在三个工作日内完成付款,逾期将收取滞纳金。")
+    assert index.lookup("请在三个工作日内完成付款。逾期将收取滞纳金!")[0] == "key-0"
+
+
+def test_different_numbers_do_not_match():
+    index = _index("订单将在3个工作日内发货,请耐心等待通知。")
+    assert index.lookup("订单将在5个工作日内发货,请耐心等待通知。") is None
+    index = _index("请在三个工作日内完成付款,逾期将收取滞纳金。")
+    assert index.lookup("请在五个工作日内完成付款,逾期将收取滞纳金。") is None
+
+
+def test_negation_does_not_match():
+    index = _index("该功能可以在离线模式下正常使用并同步数据。")
+    assert index.lookup("该功能不可以在离线模式下正常使用并同步数据。") is None
+    index = _index("系统检测到设备已经连接到网络,可以继续操作。")
+    assert index.lookup("系统检测到设备没有连接到网络,可以继续操作。") is None
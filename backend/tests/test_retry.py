@@ -0,0 +1,50 @@
+"""Retry layering: one upstream request per RetryPolicy attempt, and timeouts are retried."""
+import asyncio
+
+import httpx
+import pytest
+
+from services import llm_client as llm_client_module
+from services.llm_client import ClaudeProvider, OpenAIProvider
+from services.llm_router import Backend, ProviderRouter
+from services.retry import RetryPolicy
+
+MESSAGES = [{"role": "system", "content": "system"}, {"role": "user", "content": "你好"}]
+
+
+@pytest.mark.parametrize("provider_class", [OpenAIProvider, ClaudeProvider])
+def test_failing_upstream_is_called_once_per_attempt(monkeypatch, provider_class):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(500, json={"error": {"type": "api_error", "message": "upstream down"}})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llm_client_module, "get_http_client", lambda: http_client)
+    provider = provider_class(api_key="sk-test", model="test-model", timeout=5)
+    router = ProviderRouter([Backend("test", provider, "test")], max_attempts=1, failure_threshold=100)
+    policy = RetryPolicy(transport_attempts=3, base_delay=0.0)
+
+    with pytest.raises(Exception) as error:
+        asyncio.run(policy.run(lambda number, previous: router.chat(MESSAGES), operation="test"))
+
+    assert getattr(error.value, "status_code", None) == 500
+    assert provider.client.max_retries == 0
+    assert len(requests) == 3
+
+
+@pytest.mark.parametrize("error", [TimeoutError("read timed out"), asyncio.TimeoutError()])
+def test_timeout_is_retried_as_transport_error(error):
+    policy = RetryPolicy(transport_attempts=3, base_delay=0.0)
+    calls = []
+
+    async def attempt(number, previous):
+        calls.append(previous)
+        if number == 1:
+            raise error
+        return "ok"
+
+    assert policy.classify(error) == "transport"
+    assert asyncio.run(policy.run(attempt, operation="test")) == "ok"
+    assert calls == [None, error]
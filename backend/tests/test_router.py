@@ -0,0 +1,87 @@
+"""Router configuration is validated and backend selection never fails on degenerate weights."""
+import pytest
+from pydantic import ValidationError
+
+from config import BackendConfig, Settings
+from services.llm_router import Backend, ProviderRouter
+
+
+class _Provider:
+    model = "mock-model"
+
+    def warmup(self):
+        pass
+
+
+def _backend(name: str, weight: float) -> Backend:
+    return Backend(name, _Provider(), "mock", weight=weight)
+
+
+def test_zero_weights_fall_back_to_uniform_choice():
+    router = ProviderRouter([_backend("a", 0.0), _backend("b", 0.0)])
+    chosen = {router.candidates()[0].name for _ in range(50)}
+    assert chosen == {"a", "b"}
+
+
+def test_max_attempts_must_be_positive():
+    with pytest.raises(ValueError):
+        ProviderRouter([_backend("a", 1.0)], max_attempts=0)
+
+
+@pytest.mark.parametrize("weight", [0, -1])
+def test_config_rejects_non_positive_weights(weight):
+    with pytest.raises(ValidationError):
+        BackendConfig(name="b", provider="mock", api_key="", model="m", weight=weight)
+    with pytest.raises(ValidationError):
+        Settings(llm_provider="mock", llm_weight=weight)
+
+
+def test_config_rejects_zero_attempts():
+    with pytest.raises(ValidationError):
+        Settings(llm_provider="mock", router_max_attempts=0)
+
+
+class _Unavailable(Exception):
+    status_code = 503
+
+
+class _DownProvider(_Provider):
+    model = "down-model"
+
+    async def chat(self, messages, max_tokens=None):
+        raise _Unavailable("service unavailable")
+
+
+class _BackupProvider(_Provider):
+    model = "backup-model"
+
+    async def chat(self, messages, max_tokens=None):
+        from services.llm_client import LLMResponse
+
+        return LLMResponse('{"translation": "Failover works.", "keywords": ["failover", "backup", "works"]}')
+
+
+def test_request_metrics_are_labelled_by_the_answering_backend(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import app
+    from services.llm_client import llm_client
+
+    router = ProviderRouter(
+        [Backend("down", _DownProvider(), "openai"), Backend("backup", _BackupProvider(), "deepseek")]
+    )
+    monkeypatch.setattr(router, "candidates", lambda avoid=None: list(router.backends))
+    monkeypatch.setattr(llm_client, "router", router)
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/translate", json={"text": "故障转移后的指标标签。"}, headers={"Cache-Control": "no-store"}
+        )
+        assert response.status_code == 200, response.text
+        exposition = client.get("/metrics").text
+
+    durations = [
+        line
+        for line in exposition.splitlines()
+        if line.startswith("translate_request_duration_seconds_count") and 'path="/api/translate"' in line
+    ]
+    assert any('provider="deepseek"' in line and 'model="backup-model"' in line for line in durations)
@@ -0,0 +1,72 @@
+"""Coalesced callers keep their own deadline, and priority classes, clients and cache flags never share a call."""
+import asyncio
+import time
+
+import pytest
+
+from services.concurrency import priority_var
+from services.singleflight import SingleFlight
+from services.translator import translator
+from services.usage import get_client_id, set_client_id
+
+
+def test_follower_stops_at_its_own_deadline():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("key", slow))
+        await asyncio.sleep(0)
+        with pytest.raises(TimeoutError):
+            await flights.do("key", slow, deadline=time.monotonic() + 0.01)
+        return await leader, flights.coalesced
+
+    assert asyncio.run(scenario()) == ("done", 1)
+
+
+def test_priority_classes_are_not_coalesced(monkeypatch):
+    calls = []
+
+    async def fake_translate(chinese_text, cache_key, write_cache, context=None):
+        calls.append(priority_var.get())
+        await asyncio.sleep(0.05)
+        return "Shared text.", ["shared", "text", "call"]
+
+    monkeypatch.setattr(translator, "_translate_uncached", fake_translate)
+
+    async def translate(priority: str):
+        priority_var.set(priority)
+        return await translator.translate("优先级不同的请求不合并。", read_cache=False, write_cache=False)
+
+    async def scenario():
+        return await asyncio.gather(translate("interactive"), translate("interactive"), translate("background"))
+
+    asyncio.run(scenario())
+    assert sorted(calls) == ["background", "interactive"]
+
+
+def test_clients_and_cache_flags_are_not_coalesced(monkeypatch):
+    calls = []
+
+    async def fake_translate(chinese_text, cache_key, write_cache, context=None):
+        calls.append(get_client_id())
+        await asyncio.sleep(0.05)
+        return "Shared text.", ["shared", "text", "call"]
+
+    monkeypatch.setattr(translator, "_translate_uncached", fake_translate)
+
+    async def translate(client_id: str, write_cache: bool):
+        set_client_id(client_id)
+        return await translator.translate("不同客户端的请求不合并。", read_cache=False, write_cache=write_cache)
+
+    async def scenario():
+        return await asyncio.gather(
+            translate("alice", False), translate("alice", False), translate("bob", False), translate("alice", True)
+        )
+
+    asyncio.run(scenario())
+    # One call per client, plus one for the caller that may write the cache
+    assert sorted(calls) == ["alice", "alice", "bob"]
@@ -0,0 +1,99 @@
+"""Streaming LLM calls settle their budget reservation, and rejected streams get a real 429 or 503."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import services.llm_client as llm_client_module
+from app import app
+from services.concurrency import OverloadedError
+from services.llm_client import llm_client
+from services.usage import BudgetExceededError, UsageTracker
+
+MESSAGES = [{"role": "user", "content": "Chinese text: 你好,欢迎使用翻译助手。"}]
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """A budget-enforcing tracker that records every settle() call."""
+    tracker = UsageTracker(tokens_per_minute=100000)
+    tracker.settled = []
+    settle = tracker.settle
+
+    async def recording_settle(client_id, estimated_tokens, actual_tokens):
+        tracker.settled.append((estimated_tokens, actual_tokens))
+        await settle(client_id, estimated_tokens, actual_tokens)
+
+    monkeypatch.setattr(tracker, "settle", recording_settle)
+    monkeypatch.setattr(llm_client_module, "usage_tracker", tracker)
+    return tracker
+
+
+def test_completed_stream_is_settled_with_streamed_usage(tracker):
+    async def consume():
+        return [delta async for delta in llm_client.chat_stream(MESSAGES)]
+
+    deltas = asyncio.run(consume())
+    assert deltas
+    [(estimated, actual)] = tracker.settled
+    assert 0 < actual
+    assert sum(totals["requests"] for totals in tracker.totals.values()) == 1
+
+
+def test_cancelled_stream_is_settled(tracker):
+    async def consume_one():
+        stream = llm_client.chat_stream(MESSAGES)
+        await anext(stream)
+        await stream.aclose()
+
+    asyncio.run(consume_one())
+    assert len(tracker.settled) == 1
+
+
+def test_failed_stream_is_refunded(tracker, monkeypatch):
+    async def failing_stream(messages, max_tokens=None, answered=None):
+        raise RuntimeError("upstream down")
+        yield ""
+
+    monkeypatch.setattr(llm_client._router("strong"), "chat_stream", failing_stream)
+
+    async def consume():
+        return [delta async for delta in llm_client.chat_stream(MESSAGES)]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(consume())
+    [(estimated, actual)] = tracker.settled
+    assert actual == 0
+    assert not tracker.totals
+
+
+def test_stream_over_budget_is_429(monkeypatch):
+    async def reject(client_id, estimated_tokens):
+        raise BudgetExceededError("Token budget exceeded", 12.5)
+
+    monkeypatch.setattr(llm_client_module.usage_tracker, "reserve", reject)
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/translate/stream",
+            json={"text": "预算用完时流式请求应返回429。"},
+            headers={"Cache-Control": "no-store"},
+        )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "13"
+    assert response.json()["detail"]["error"]["code"] == "RATE_LIMITED"
+
+
+def test_stream_without_concurrency_slot_is_503(monkeypatch):
+    async def reject():
+        raise OverloadedError("Upstream concurrency queue is full", 2.5)
+
+    monkeypatch.setattr(llm_client.limiter, "acquire", reject)
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/translate/stream",
+            json={"text": "并发已满时流式请求应返回503。"},
+            headers={"Cache-Control": "no-store"},
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json()["detail"]["error"]["code"] == "OVERLOADED"
@@ -0,0 +1,95 @@
+"""Translation memory reuse keeps the plain request and document chunking paths intact."""
+import asyncio
+import json
+
+import pytest
+
+from services.llm_client import llm_client
+from services.translation_memory import segment_reuse_var, translation_memory
+from services.translator import translator
+
+
+def _prompt(messages: list[dict]) -> tuple[list[str], str]:
+    """(texts to translate, preceding context) of a single or passage prompt."""
+    user_prompt = messages[-1]["content"]
+    context = None
+    if user_prompt.startswith("Preceding context:\n"):
+        context = user_prompt.split("\n", 1)[1].split("\n\n", 1)[0]
+    if "Chinese texts:\n" in user_prompt:
+        items = json.loads(user_prompt.split("Chinese texts:\n", 1)[1])
+        return [item["text"] for item in items], context
+    return [user_prompt.rsplit("Chinese text:\n", 1)[1]], context
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record (texts, context) of every LLM call; the mock provider answers them."""
+    recorded: list[tuple[list[str], str]] = []
+    chat = llm_client.chat
+
+    async def recording_chat(messages, *args, **kwargs):
+        recorded.append(_prompt(messages))
+        return await chat(messages, *args, **kwargs)
+
+    monkeypatch.setattr(translation_memory, "enabled", True)
+    monkeypatch.setattr(llm_client, "chat", recording_chat)
+    translation_memory.clear()
+    yield recorded
+    translation_memory.clear()
+
+
+def _translate_document(text: str):
+    async def run():
+        result = await translator.translate_document(text, read_cache=True, write_cache=True)
+        return result, segment_reuse_var.get()
+
+    return asyncio.run(run())
+
+
+def test_single_request_without_hits_is_one_call(calls):
+    text = "第一句话。第二句话。第三句话。"
+    asyncio.run(translator.translate(text, read_cache=False))
+
+    assert calls == [(["第一句话。", "第二句话。", "第三句话。"], None)]
+    assert translation_memory.stats()["segments"] == 3
+
+
+def test_partial_hit_translates_the_rest_as_one_run_with_context(calls):
+    asyncio.run(translation_memory.add([("甲句。", "First.", ["first"])]))
+    translation, _ = asyncio.run(translator.translate("甲句。乙句。丙句!", write_cache=False))
+
+    assert calls == [(["乙句。", "丙句!"], "甲句。")]
+    assert translation.startswith("First. Mock translation")
+
+
+def test_document_sentences_are_reused_by_another_document(calls):
+    (first, _), reuse = _translate_document("文档甲的开头。共同的第一句。共同的第二句。共同的第三句。")
+    assert reuse == (0, 4)
+    assert translation_memory.stats()["segments"] == 4
+
+    calls.clear()
+    (second, _), reuse = _translate_document("文档乙的开头。共同的第一句。共同的第二句。共同的第三句。")
+    assert reuse == (3, 4)
+    assert calls == [(["文档乙的开头。"], None)]
+    # Only the first sentence's translation differs
+    assert second.split("). ", 1)[1] == first.split("). ", 1)[1]
+
+
+def test_unusable_passage_falls_back_to_one_plain_call(calls, monkeypatch):
+    def unusable(content, indices, texts=None):
+        return {index: ValueError("missing") for index in indices}
+
+    monkeypatch.setattr(translator, "_parse_batch_response", unusable)
+    text = "回退的第一句。回退的第二句。"
+    asyncio.run(translator.translate(text, read_cache=False))
+
+    assert calls == [(["回退的第一句。", "回退的第二句。"], None), ([text], None)]
+    assert translation_memory.stats()["segments"] == 0
+
+
+def test_document_hard_splits_oversized_sentence(calls):
+    text = "长" * 5001
+    asyncio.run(translator.translate_document(text))
+
+    assert len(calls) > 1
+    assert "".join(texts[0] for texts, _ in calls) == text
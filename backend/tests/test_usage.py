@@ -0,0 +1,55 @@
+"""Shared budget buckets are updated off the event loop, since their SQLite lock can block."""
+import asyncio
+import threading
+
+import pytest
+
+import services.usage as usage_module
+from services.shared_state import SharedStateStore
+from services.usage import BudgetExceededError, UsageTracker
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """A multi-worker state store that records the thread of every bucket update."""
+    store = SharedStateStore(str(tmp_path / "state.sqlite"))
+    store.threads = []
+    update_bucket = store.update_bucket
+
+    def recording_update(*args):
+        store.threads.append(threading.get_ident())
+        return update_bucket(*args)
+
+    monkeypatch.setattr(store, "update_bucket", recording_update)
+    monkeypatch.setattr(usage_module, "shared_state", store)
+    return store
+
+
+def test_shared_buckets_are_updated_off_the_event_loop(store):
+    tracker = UsageTracker(requests_per_minute=2, tokens_per_minute=1000)
+
+    async def run():
+        await tracker.reserve("client", 100)
+        await tracker.settle("client", 100, 40)
+        await tracker.reserve("client", 100)
+        with pytest.raises(BudgetExceededError):
+            await tracker.reserve("client", 100)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert store.threads
+    assert loop_thread not in store.threads
+    assert tracker.rejected == 1
+
+
+def test_local_buckets_stay_on_the_event_loop():
+    tracker = UsageTracker(tokens_per_minute=100)
+
+    async def run():
+        await tracker.reserve("client", 80)
+        with pytest.raises(BudgetExceededError):
+            await tracker.reserve("client", 80)
+        await tracker.settle("client", 80, 0)
+        await tracker.reserve("client", 80)
+
+    asyncio.run(run())
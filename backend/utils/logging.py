@@ -1,16 +1,30 @@
 """
 Logging utilities for structured logging with request tracking.
+Records are handed to a bounded queue and formatted and written by a background
+thread, so a slow stdout never blocks the event loop.
 """
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
 import time
+import zlib
+from collections import deque
 from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 import uuid
 
 # Context variable for request ID tracking
 request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
 
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s"
+
+# Standard LogRecord attributes; anything else was passed via extra= and goes into JSON output
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
 
 class RequestIdFilter(logging.Filter):
     """Add request ID to log records."""
@@ -20,17 +34,156 @@ class RequestIdFilter(logging.Filter):
         return True
 
 
-def setup_logging(log_level: str = "INFO"):
-    """Configure structured logging for the application."""
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format="%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
+class InfoSampler(logging.Filter):
+    """
+    Keep the INFO-and-below records of a fraction of requests; warnings and errors always pass.
+
+    Sampling is per request, not per record: the decision hashes the request ID,
+    so a request keeps all of its lines or none. Records logged outside a request
+    are sampled one by one.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.threshold = int(max(0.0, min(1.0, rate)) * 0xFFFFFFFF)
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.threshold >= 0xFFFFFFFF:
+            return True
+        key = getattr(record, "request_id", None)
+        if not key or key == "N/A":
+            # Outside a request (RequestIdFilter sets "N/A"): decide per record
+            key = f"{record.created}:{id(record)}"
+        return zlib.crc32(key.encode()) <= self.threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request_id, message and extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "N/A"),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enqueue records without formatting them; drop (and count) when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread; only tracebacks are rendered here,
+        # while the frames they reference are still intact
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[_NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_hooks_registered = False
+
+
+def _restart_writer():
+    """Give a forked worker its own queue and writer thread (threads do not survive fork)."""
+    if _handler is None or _listener is None:
+        return
+    fresh: queue.Queue = queue.Queue(maxsize=_handler.queue.maxsize)
+    _handler.queue = fresh
+    _listener.queue = fresh
+    _listener._thread = None
+    _listener.start()
+
 
-    # Add request ID filter to root logger
-    for handler in logging.root.handlers:
-        handler.addFilter(RequestIdFilter())
+def setup_logging(
+    log_level: str = "INFO",
+    log_format: str = "json",
+    queue_size: int = 10000,
+    info_sample_rate: float = 1.0,
+):
+    """
+    Configure structured logging for the application.
+
+    Records carry the request ID, are sampled (INFO and below) at info_sample_rate,
+    and are written as JSON lines (or text) by a background thread.
+    """
+    global _handler, _listener, _hooks_registered
+    stop_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    # Handler filters run in the logging call's thread, where the request ID context is set
+    _handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _handler.addFilter(RequestIdFilter())
+    if info_sample_rate < 1.0:
+        _handler.addFilter(InfoSampler(info_sample_rate))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(getattr(logging, log_level.upper()))
+
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+    if not _hooks_registered:
+        atexit.register(stop_logging)
+        os.register_at_fork(after_in_child=_restart_writer)
+        _hooks_registered = True
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        try:
+            _listener.stop()
+        except queue.Full:
+            pass  # The writer is hopelessly behind; exit without flushing
+    _listener = None
+
+
+def flush_logging(timeout: float = 2.0):
+    """
+    Wait up to timeout seconds for the writer to drain the queue (before a worker exits).
+
+    Blocks the calling thread; from the event loop, run it with asyncio.to_thread.
+    """
+    if _handler is None or _listener is None:
+        return
+    log_queue = _handler.queue
+    # queue.join() with a timeout: the writer calls task_done() for every record
+    with log_queue.all_tasks_done:
+        log_queue.all_tasks_done.wait_for(lambda: not log_queue.unfinished_tasks, timeout)
+
+
+def log_stats() -> dict:
+    """Records waiting for the writer and records dropped because the queue was full."""
+    if _handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped}
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -52,22 +205,52 @@ def get_request_id() -> Optional[str]:
 
 
 class Timer:
-    """Simple timer for measuring operation duration."""
+    """Simple timer for measuring operation duration (monotonic clock)."""
 
     def __init__(self):
         self.start_time = None
         self.end_time = None
 
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
 
     def __exit__(self, *args):
-        self.end_time = time.time()
+        self.end_time = time.perf_counter()
 
     @property
     def elapsed(self) -> float:
         """Get elapsed time in seconds."""
-        if self.start_time and self.end_time:
+        if self.start_time is not None and self.end_time is not None:
             return self.end_time - self.start_time
         return 0.0
+
+
+class LatencyWindow:
+    """Bounded window of recent latency samples with percentile summary."""
+
+    def __init__(self, maxlen: int = 1000):
+        self.samples: deque[float] = deque(maxlen=maxlen)
+        self.count = 0
+
+    def record(self, seconds: float):
+        """Record one latency sample in seconds."""
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> dict:
+        """Return count and p50/p95/p99 (ms) over the window."""
+        ordered = sorted(self.samples)
+
+        def percentile(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "window": len(ordered),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
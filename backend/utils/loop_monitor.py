@@ -0,0 +1,60 @@
+"""
+Event loop lag monitor.
+Sleeps for a fixed interval and records how late each wake-up was, which
+exposes blocking work on the event loop.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from config import settings
+from utils import metrics
+from utils.logging import get_logger, LatencyWindow
+
+logger = get_logger(__name__)
+
+
+class LoopLagMonitor:
+    """Background task sampling event loop lag into a histogram and a recent window."""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.lags = LatencyWindow()
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.lags.record(lag)
+            self.max_lag = max(self.max_lag, lag)
+            metrics.event_loop_lag.observe(lag)
+
+    def start(self):
+        """Start sampling on the running loop (no-op when disabled or already running)."""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Return recent lag percentiles and the maximum lag seen."""
+        return {
+            "interval_ms": round(self.interval * 1000, 1),
+            "max_ms": round(self.max_lag * 1000, 1),
+            "lag": self.lags.summary(),
+        }
+
+
+# Global loop lag monitor instance
+loop_monitor = LoopLagMonitor(interval=settings.loop_lag_interval)
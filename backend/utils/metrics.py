@@ -0,0 +1,407 @@
+"""
+Prometheus-style metrics: labeled counters, gauges and histograms rendered in
+the text exposition format, plus the application's standard metrics.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+from typing import Callable, Iterable, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) tuples at scrape time
+Collector = Callable[[], Iterable[tuple[str, str, str, list[tuple[dict, float]]]]]
+
+# A collected family: (name, type, help, [(sample name, labels, value), ...])
+Family = tuple[str, str, str, list[tuple[str, dict, float]]]
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labeled metrics."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Return (sample name, labels, value) tuples."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = value
+
+    def samples(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    child[0][i] += 1
+                    break
+            child[1] += value
+            child[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, [list(c[0]), c[1], c[2]]) for key, c in self._children.items()]
+        result = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                result.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            result.append((f"{self.name}_sum", labels, total))
+            result.append((f"{self.name}_count", labels, count))
+        return result
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors and renders the exposition text."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector):
+        """Register a function that reports values owned by other components."""
+        self._collectors.append(collector)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: Optional[tuple[float, ...]] = None,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def collect(self) -> list[Family]:
+        """Return the current samples of all metrics and collectors."""
+        families: list[Family] = [
+            (metric.name, metric.type, metric.documentation, metric.samples()) for metric in self._metrics
+        ]
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                families.append(
+                    (name, metric_type, documentation, [(name, labels, value) for labels, value in samples])
+                )
+        return families
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        return render_families(self.collect())
+
+
+def render_families(families: Iterable[Family]) -> str:
+    """Render collected families in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for name, metric_type, documentation, samples in families:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SnapshotExporter:
+    """
+    Metrics of several worker processes, merged at scrape time.
+
+    Each worker writes its samples to <directory>/<pid>.json every interval
+    seconds and before answering a scrape. Counters and histograms are summed
+    over all snapshots, including those of exited workers, so totals do not go
+    backwards when a worker is replaced; gauges are summed over live workers.
+    """
+
+    def __init__(self, registry: Registry, directory: str, interval: float = 1.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self):
+        """Write this worker's snapshot atomically."""
+        pid = os.getpid()
+        path = os.path.join(self.directory, f"{pid}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"pid": pid, "families": self.registry.collect()}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def collect(self) -> list[Family]:
+        """Merge the snapshots of all workers."""
+        self.write()
+        merged: dict[str, tuple[str, str, dict]] = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(snapshot["pid"])
+            for name, metric_type, documentation, samples in snapshot["families"]:
+                if metric_type == "gauge" and not alive:
+                    continue
+                values = merged.setdefault(name, (metric_type, documentation, {}))[2]
+                for sample_name, labels, value in samples:
+                    key = (sample_name, tuple(labels.items()))
+                    values[key] = values.get(key, 0.0) + value
+        return [
+            (name, metric_type, documentation, [(s, dict(labels), v) for (s, labels), v in values.items()])
+            for name, (metric_type, documentation, values) in merged.items()
+        ]
+
+    def render(self) -> str:
+        """Render the merged metrics of all workers."""
+        return render_families(self.collect())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+
+    def start(self):
+        """Start writing snapshots periodically."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer and leave a final snapshot behind."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.write()
+
+
+# Global registry and standard application metrics
+registry = Registry()
+
+request_duration = registry.histogram(
+    "translate_request_duration_seconds",
+    "Total HTTP request time, including FastAPI validation and serialization",
+    ("method", "path", "status", "provider", "model"),
+)
+requests_in_flight = registry.gauge(
+    "translate_requests_in_flight",
+    "HTTP requests currently being processed",
+    ("provider", "model"),
+)
+errors_total = registry.counter(
+    "translate_errors_total",
+    "Translation API errors by error code",
+    ("code", "provider", "model"),
+)
+llm_call_duration = registry.histogram(
+    "llm_call_duration_seconds",
+    "Upstream LLM call time per backend",
+    ("provider", "model", "outcome"),
+)
+llm_in_flight = registry.gauge(
+    "llm_requests_in_flight",
+    "Upstream LLM calls currently in flight",
+    ("provider", "model"),
+)
+llm_tokens_total = registry.counter(
+    "llm_tokens_total",
+    "Tokens reported in upstream usage data",
+    ("provider", "model", "type"),
+)
+parse_duration = registry.histogram(
+    "llm_parse_duration_seconds",
+    "Time spent parsing and validating LLM responses",
+    ("provider", "model"),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+llm_attempts = registry.histogram(
+    "llm_attempts_per_request",
+    "LLM calls made per translation operation, including retries",
+    ("operation",),
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+llm_retries = registry.counter(
+    "llm_retries_total",
+    "LLM call retries by operation and error class",
+    ("operation", "reason"),
+)
+json_repairs = registry.counter(
+    "llm_json_repairs_total",
+    "LLM responses that failed strict JSON parsing, by local repair outcome",
+    ("outcome",),
+)
+jobs_submitted = registry.counter(
+    "translation_jobs_submitted_total",
+    "Asynchronous translation jobs submitted, by kind",
+    ("kind",),
+)
+jobs_finished = registry.counter(
+    "translation_jobs_finished_total",
+    "Asynchronous translation jobs that reached a final status",
+    ("status",),
+)
+job_items = registry.counter(
+    "translation_job_items_total",
+    "Texts processed by job workers, by result",
+    ("result",),
+)
+glossary_lookup_duration = registry.histogram(
+    "glossary_lookup_duration_seconds",
+    "Glossary lookups: exact match of a short input or term scan of a longer one",
+    ("kind",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+route_decisions = registry.counter(
+    "llm_route_decisions_total",
+    "Model cascade routing decisions by tier (none = answered without an LLM call) and reason",
+    ("tier", "reason"),
+)
+tier_duration = registry.histogram(
+    "llm_tier_duration_seconds",
+    "Successful LLM call time per cascade tier, including failover and hedging",
+    ("tier",),
+)
+cascade_escalations = registry.counter(
+    "llm_cascade_escalations_total",
+    "Fast-tier answers that failed validation and were escalated to the strong model",
+    ("operation",),
+)
+keyword_extraction_duration = registry.histogram(
+    "keyword_extraction_duration_seconds",
+    "Local keyword extraction time",
+    ("method",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+stream_ttfb = registry.histogram(
+    "translate_stream_ttfb_seconds",
+    "Time to first translation byte on the streaming endpoint",
+    ("provider", "model"),
+)
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wake-up and when it actually ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
@@ -0,0 +1,347 @@
+"""
+Lightweight request tracing with OpenTelemetry-compatible spans.
+Spans share the trace ID of the request ID in request_id_var, are head-sampled per
+trace, and are exported in OTLP/JSON to a local file or an OTLP/HTTP collector by a
+background thread.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import httpx
+
+from config import settings
+from utils.logging import get_logger, get_request_id
+
+logger = get_logger(__name__)
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# When the current request's body started arriving (set by the metrics middleware)
+request_start_var: ContextVar[Optional[int]] = ContextVar("request_start_ns", default=None)
+
+
+class Span:
+    """One timed operation; attributes follow OpenTelemetry semantic conventions where they exist."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str, kind: int, start_ns: int, attributes: dict):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error is not None else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stand-in for unsampled traces: every operation is a no-op."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Innermost open span of the current context (NOOP_SPAN inside an unsampled trace)
+current_span_var: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _trace_id() -> str:
+    """Trace ID for a new root span: the request ID's 128 bits when it is a UUID."""
+    request_id = get_request_id()
+    if request_id:
+        try:
+            return uuid.UUID(request_id).hex
+        except ValueError:
+            return uuid.uuid5(uuid.NAMESPACE_OID, request_id).hex
+    return os.urandom(16).hex()
+
+
+class _SpanScope:
+    """Context manager making a span current and ending it on exit."""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self.token = current_span_var.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        current_span_var.reset(self.token)
+        if self.span is not NOOP_SPAN:
+            if exc is not None and self.span.error is None:
+                self.span.error = f"{exc_type.__name__}: {exc}"
+            self.tracer.end(self.span)
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class SpanExporter:
+    """Batches finished spans on a background thread and writes them as OTLP/JSON."""
+
+    SERVICE_NAME = "ai-translation-assistant"
+    BATCH_SIZE = 512
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, kind: str = "file", path: str = "traces.jsonl", endpoint: str = "", max_queue: int = 10000):
+        self.kind = kind
+        self.path = path
+        self.endpoint = endpoint
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.exported = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Threads do not survive fork(); a worker starts its own on its first span
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _payload(self, spans: list[Span]) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [{"key": "service.name", "value": {"stringValue": self.SERVICE_NAME}}]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "translation"}, "spans": [span.to_otlp() for span in spans]}
+                    ],
+                }
+            ]
+        }
+
+    def _write(self, spans: list[Span]):
+        body = json.dumps(self._payload(spans), ensure_ascii=False)
+        if self.kind == "otlp":
+            response = httpx.post(
+                self.endpoint, content=body, headers={"Content-Type": "application/json"}, timeout=5.0
+            )
+            response.raise_for_status()
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(body + "\n")
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(spans) < self.BATCH_SIZE:
+                try:
+                    spans.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(spans)
+                self.exported += len(spans)
+            except Exception as e:
+                self.dropped += len(spans)
+                logger.warning(f"Span export failed: {str(e)}")
+            for _ in spans:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 2.0):
+        """Wait up to timeout seconds for queued spans to be written."""
+        deadline = time.monotonic() + timeout
+        while self._thread is not None and self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+class Tracer:
+    """
+    Creates spans for sampled traces.
+
+    The sampling decision is made once per trace from its trace ID (like
+    OpenTelemetry's TraceIdRatioBased sampler), so a trace is either recorded
+    whole or costs one ContextVar lookup per span.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[SpanExporter] = None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.exporter = exporter
+        self._threshold = int(self.sample_rate * (1 << 64))
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 and self.exporter is not None
+
+    def _sampled(self, trace_id: str) -> bool:
+        return int(trace_id[16:], 16) < self._threshold
+
+    def span(self, name: str, kind: int = KIND_INTERNAL, start_ns: Optional[int] = None, **attributes: Any):
+        """Context manager for a child of the current span, or a new root when there is none."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        parent = current_span_var.get()
+        if parent is NOOP_SPAN:
+            return _NULL_SCOPE
+        if parent is None:
+            trace_id = _trace_id()
+            if not self._sampled(trace_id):
+                return _SpanScope(self, NOOP_SPAN)
+            request_id = get_request_id()
+            if request_id:
+                attributes["request_id"] = request_id
+            span = Span(name, trace_id, "", kind, start_ns or time.time_ns(), attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind, start_ns or time.time_ns(), attributes)
+        return _SpanScope(self, span)
+
+    def request_span(self, name: str, **attributes: Any):
+        """
+        Root span for an API request, starting when the request arrived.
+
+        The time before the handler ran (body read and Pydantic validation) is
+        recorded as a "request.validate" child span.
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        started = request_start_var.get()
+        scope = self.span(name, kind=KIND_SERVER, start_ns=started, **attributes)
+        if started is not None and isinstance(scope, _SpanScope) and scope.span is not NOOP_SPAN:
+            validate = Span("request.validate", scope.span.trace_id, scope.span.span_id, KIND_INTERNAL, started, {})
+            self.end(validate)
+        return scope
+
+    def end(self, span: Span):
+        span.end_ns = time.time_ns()
+        self.exporter.export(span)
+
+    def child(self, parent, name: str, start_ns: int, end_ns: int, **attributes: Any):
+        """Record an already finished child of parent (e.g. from timestamps taken earlier)."""
+        if parent is None or parent is NOOP_SPAN or not self.enabled:
+            return
+        span = Span(name, parent.trace_id, parent.span_id, KIND_INTERNAL, start_ns, attributes)
+        span.end_ns = end_ns
+        self.exporter.export(span)
+
+    # httpcore trace steps recorded as child spans of the LLM call
+    TRANSPORT_STEPS = {
+        "connect_tcp": "http.connect",
+        "start_tls": "http.tls",
+        "send_request_body": "http.send_request",
+        "receive_response_headers": "http.wait_first_byte",
+        "receive_response_body": "http.read_body",
+    }
+
+    def transport_trace(self, parent: Span):
+        """httpcore "trace" request extension turning connection/transfer phases into spans."""
+        started: dict[str, int] = {}
+
+        async def trace(event: str, info: dict):
+            prefix, _, phase = event.rpartition(".")
+            step = prefix.partition(".")[2]
+            if step not in self.TRANSPORT_STEPS:
+                return
+            if phase == "started":
+                started[step] = time.time_ns()
+            elif step in started:
+                self.child(parent, self.TRANSPORT_STEPS[step], started.pop(step), time.time_ns())
+
+        return trace
+
+    def stats(self) -> dict:
+        exporter = self.exporter
+        return {
+            "sample_rate": self.sample_rate,
+            "exporter": exporter.kind if exporter else None,
+            "exported": exporter.exported if exporter else 0,
+            "dropped": exporter.dropped if exporter else 0,
+        }
+
+
+# Global tracer instance (a no-op unless TRACING_SAMPLE_RATE > 0)
+tracer = Tracer(
+    sample_rate=settings.tracing_sample_rate,
+    exporter=SpanExporter(
+        kind=settings.tracing_exporter,
+        path=settings.tracing_file,
+        endpoint=settings.tracing_otlp_endpoint,
+    )
+    if settings.tracing_sample_rate > 0
+    else None,
+)